@@ -6,6 +6,9 @@ load_dotenv()
 AI_PROVIDER = os.getenv("AI_PROVIDER", "openai")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
+# Point the provider clients elsewhere, e.g. at benchmarks/mock_llm.py (empty = official API)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")
+ANTHROPIC_BASE_URL = os.getenv("ANTHROPIC_BASE_URL", "")
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "8000"))
 
@@ -14,6 +17,18 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*")
 RAPIDAPI_PROXY_SECRET = os.getenv("RAPIDAPI_PROXY_SECRET", "")
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY", "")  # enables /admin endpoints
+
+# Logging: json | text, written by a background thread from a bounded queue
+# (0 = write synchronously); records that do not fit are dropped, never waited on
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json" if ENVIRONMENT == "production" else "text")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Share of requests whose info-level lines are kept, by API key or tier, e.g. "mega:0.1"
+LOG_SAMPLE_RATES: dict[str, float] = {}
+for entry in os.getenv("LOG_SAMPLE_RATES", "").split(","):
+    if ":" in entry:
+        name, rate = entry.rsplit(":", 1)
+        LOG_SAMPLE_RATES[name.strip()] = float(rate)
 
 TIER_LIMITS = {
     "free": 50,
@@ -31,3 +46,103 @@ for entry in _raw_keys.split(","):
         API_KEYS[key.strip()] = tier.strip()
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_INPUT_TOKENS = int(os.getenv("MAX_INPUT_TOKENS", "4000"))  # resume text sent to the LLM
+
+# Parse result cache (in-process LRU in front of Redis)
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", str(60 * 60 * 24 * 7)))  # 7 days
+RESULT_CACHE_LRU_SIZE = int(os.getenv("RESULT_CACHE_LRU_SIZE", "512"))
+
+# Near-duplicate index (MinHash per API key in Redis, kept for RESULT_CACHE_TTL)
+SIMILARITY_ENABLED = os.getenv("SIMILARITY_ENABLED", "true").lower() == "true"
+SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", "0.8"))  # estimated share of common text
+# Partial re-parses resend whole sections, up to this share of the resume; more means a full parse
+SIMILARITY_MAX_CHANGED = float(os.getenv("SIMILARITY_MAX_CHANGED", "0.8"))
+
+# Text extraction process pool (0 workers = extract inline)
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "2"))
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "30"))
+EXTRACTION_MAX_QUEUE = int(os.getenv("EXTRACTION_MAX_QUEUE", "16"))
+EXTRACTION_MAX_TASKS_PER_CHILD = int(os.getenv("EXTRACTION_MAX_TASKS_PER_CHILD", "50"))
+
+# OCR of PDF pages without embedded text (Tesseract), in its own low-priority
+# process pool (0 workers = no OCR)
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "1"))
+OCR_MIN_CHARS = int(os.getenv("OCR_MIN_CHARS", "40"))  # pages with less embedded text are OCRed
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "10"))  # per document
+OCR_TIMEOUT = float(os.getenv("OCR_TIMEOUT", "60"))  # per document
+OCR_MAX_QUEUE = int(os.getenv("OCR_MAX_QUEUE", "32"))  # pages; documents beyond it skip OCR
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+OCR_MEMORY_LIMIT_MB = int(os.getenv("OCR_MEMORY_LIMIT_MB", "1024"))  # per OCR worker, 0 = no limit
+
+# DOCX text extraction
+DOCX_ENGINE = os.getenv("DOCX_ENGINE", "xml")  # xml | python-docx (always the fallback)
+
+# PDF text extraction
+PDF_ENGINE = os.getenv("PDF_ENGINE", "pdfium")  # pdfium | pypdf2 (always the fallback)
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "30"))  # 0 = no cap
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "4"))  # page ranges run in parallel in the pool
+
+# /parse?split=true: one PDF holding many resumes
+SPLIT_MAX_PAGES = int(os.getenv("SPLIT_MAX_PAGES", "200"))  # 0 = no cap
+SPLIT_MAX_CANDIDATES = int(os.getenv("SPLIT_MAX_CANDIDATES", "50"))
+
+# Batch parsing
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "100"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))  # per API worker
+BATCH_PER_KEY_CONCURRENCY = int(os.getenv("BATCH_PER_KEY_CONCURRENCY", "4"))
+BATCH_MAX_BODY_SIZE = int(os.getenv("BATCH_MAX_BODY_SIZE", str(100 * 1024 * 1024)))  # matches nginx
+
+# Asynchronous jobs (POST /jobs, consumed by worker.py)
+JOB_TTL = int(os.getenv("JOB_TTL", str(60 * 60 * 24)))  # 1 day
+JOB_STREAM_MAXLEN = int(os.getenv("JOB_STREAM_MAXLEN", "100000"))
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "8"))
+JOB_CLAIM_IDLE_MS = int(os.getenv("JOB_CLAIM_IDLE_MS", str(5 * 60 * 1000)))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))  # crashed attempts before a job is failed
+WEBHOOK_TIMEOUT = float(os.getenv("WEBHOOK_TIMEOUT", "10"))
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+
+# Requests each worker leases from Redis at a time (0 = one Redis call per request)
+RATE_LIMIT_LEASE_SIZE = int(os.getenv("RATE_LIMIT_LEASE_SIZE", "0"))
+RATE_LIMIT_LEASE_TIERS = [t.strip() for t in os.getenv("RATE_LIMIT_LEASE_TIERS", "mega").split(",") if t.strip()]
+
+# Per-key parse stats (tokens, providers, latency) are buffered per process and
+# written to Redis every USAGE_FLUSH_INTERVAL seconds
+USAGE_FLUSH_INTERVAL = float(os.getenv("USAGE_FLUSH_INTERVAL", "5"))
+USAGE_LATENCY_BUCKETS = tuple(
+    float(b) for b in os.getenv("USAGE_LATENCY_BUCKETS", "1,2,5,10,30,60").split(",") if b.strip()
+)
+
+# LLM provider timeouts, hedging and circuit breaking
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "45"))
+ANTHROPIC_TIMEOUT = float(os.getenv("ANTHROPIC_TIMEOUT", "45"))
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "15"))  # until enough latency samples
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "2"))
+CIRCUIT_BREAKER_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "5"))
+CIRCUIT_BREAKER_COOLDOWN = float(os.getenv("CIRCUIT_BREAKER_COOLDOWN", "30"))
+
+# HTTP connection pool shared by the provider clients (per API process)
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "64"))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "32"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+LLM_POOL_TIMEOUT = float(os.getenv("LLM_POOL_TIMEOUT", "5"))  # wait for a free connection
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "false").lower() == "true"  # needs the h2 package
+# SDK retries per provider call (with backoff) before falling back to the other provider
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+
+# LLM admission control: in-flight calls per API process and across the cluster
+# (Redis-coordinated, 0 = unlimited), queued by tier with a bounded wait
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "16"))
+LLM_CLUSTER_MAX_IN_FLIGHT = int(os.getenv("LLM_CLUSTER_MAX_IN_FLIGHT", "0"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "64"))
+LLM_MAX_WAIT = float(os.getenv("LLM_MAX_WAIT", "10"))
+# Largest share of the in-flight slots each tier may hold (tiers not listed: all of them)
+LLM_TIER_SHARES: dict[str, float] = {}
+for entry in os.getenv("LLM_TIER_SHARES", "free:0.25,pro:0.5").split(","):
+    if ":" in entry:
+        tier, share = entry.rsplit(":", 1)
+        LLM_TIER_SHARES[tier.strip()] = float(share)
@@ -1,10 +1,26 @@
+import copy
+import json
 import logging
+import queue
+import random
 import sys
 import contextvars
+from logging.handlers import QueueHandler, QueueListener
 
-from app.config import LOG_LEVEL, ENVIRONMENT
+from app.config import LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE, LOG_SAMPLE_RATES
+from app.metrics import LOG_RECORDS_DROPPED
 
 request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
+# Fields describing the current request (provider, tokens, ...), added to its access log line.
+# Set by the request id middleware; code handling the request adds to it.
+request_fields_var: contextvars.ContextVar[dict | None] = contextvars.ContextVar("request_fields", default=None)
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed in `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+_listener: QueueListener | None = None
 
 
 class RequestIdFilter(logging.Filter):
@@ -13,16 +29,95 @@ class RequestIdFilter(logging.Filter):
         return True
 
 
+class SamplingFilter(logging.Filter):
+    """Drop below-warning records of requests that were not sampled."""
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        fields = request_fields_var.get()
+        return fields is None or not fields.get("_unsampled")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any `extra` fields."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "name": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Hand records to the listener thread without ever blocking the caller."""
+
+    def prepare(self, record):
+        # Resolve arguments and tracebacks now, while they are still valid, but
+        # leave formatting to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+def annotate_request(**fields):
+    """Add fields to the current request's access log line (no-op outside requests)."""
+    current = request_fields_var.get()
+    if current is not None:
+        current.update(fields)
+
+
+def sample_request(api_key: str, tier: str):
+    """Decide once per request whether its info-level lines are written."""
+    rate = LOG_SAMPLE_RATES.get(api_key, LOG_SAMPLE_RATES.get(tier, 1.0))
+    if rate < 1.0:
+        annotate_request(sample_rate=rate, _unsampled=random.random() >= rate)
+
+
 def setup_logging():
+    global _listener
     level = getattr(logging, LOG_LEVEL.upper(), logging.INFO)
 
-    if ENVIRONMENT == "production":
-        fmt = '{"time":"%(asctime)s","level":"%(levelname)s","name":"%(name)s","request_id":"%(request_id)s","msg":"%(message)s"}'
-    else:
-        fmt = "%(asctime)s [%(levelname)s] %(name)s - %(message)s"
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+    shutdown_logging()
+    if LOG_QUEUE_SIZE > 0:
+        log_queue = queue.Queue(LOG_QUEUE_SIZE)
+        _listener = QueueListener(log_queue, handler)
+        _listener.start()
+        handler = DroppingQueueHandler(log_queue)
+
+    # Filters run in the logging caller, where the request context is still set
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(SamplingFilter())
+    logging.basicConfig(level=level, handlers=[handler], force=True)
 
-    logging.basicConfig(level=level, format=fmt, stream=sys.stdout, force=True)
 
-    rid_filter = RequestIdFilter()
-    for handler in logging.root.handlers:
-        handler.addFilter(rid_filter)
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,17 +1,67 @@
-import uuid
+import asyncio
+import json
+import tempfile
 import logging
 from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Literal
 
-from fastapi import FastAPI, UploadFile, File, Depends, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, Query, Depends, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
 
-from app.models.schemas import ParseResponse, ParsedResume, HealthResponse, UsageResponse
-from app.services.document_parser import extract_text
-from app.services.ai_extractor import extract_resume_data, init_ai_clients
-from app.middleware.auth import get_api_key, check_rate_limit, get_usage_without_increment, init_redis, close_redis
-from app.config import MAX_FILE_SIZE, CORS_ORIGINS, ENVIRONMENT
-from app.logging_config import setup_logging, request_id_var
+from app.models.schemas import (
+    ParseResponse,
+    HealthResponse,
+    UsageResponse,
+    BulkUsageResponse,
+    BatchItemResponse,
+    BatchParseResponse,
+    JobResponse,
+    CandidateResponse,
+    SplitParseResponse,
+)
+from app.services.extraction_pool import (
+    extract_text_async,
+    init_extraction_pool,
+    shutdown_extraction_pool,
+    ExtractionQueueFull,
+)
+from app.services.ocr import init_ocr_pool, shutdown_ocr_pool
+from app.services.admission import Overloaded, tier_slots
+from app.services.ai_extractor import start_ai_clients, close_ai_clients, preload_provider_sdks
+from app.services.document_parser import (
+    PDF_TYPE,
+    DOCX_TYPE,
+    TXT_TYPE,
+    SNIFF_BYTES,
+    PAGE_BREAK,
+    sniff_content_type,
+    preload_parsers,
+)
+from app.services.pipeline import parse_text
+from app.services.batch import expand_zip, llm_slot
+from app.services.splitter import split_candidates
+from app.services.streaming import stream_parse
+from app.services.text_compactor import preload_tokenizer
+from app.services.jobs import enqueue_job, get_job, resolve_webhook, QueueUnavailable, WebhookRejected
+from app.services.usage import get_usage, start_usage_flusher, stop_usage_flusher
+from app.middleware.auth import get_api_key, require_admin, check_rate_limit, init_redis, close_redis
+from app.middleware.body_limit import BodySizeLimitMiddleware, MULTIPART_OVERHEAD
+from app.middleware.request_id import RequestIdMiddleware
+from app.config import (
+    MAX_FILE_SIZE,
+    CORS_ORIGINS,
+    ENVIRONMENT,
+    BATCH_MAX_ITEMS,
+    BATCH_MAX_BODY_SIZE,
+    EXTRACTION_WORKERS,
+    SPLIT_MAX_CANDIDATES,
+    API_KEYS,
+)
+from app.logging_config import setup_logging, shutdown_logging, annotate_request
+from app.metrics import stage_timer, render_metrics, mark_process_dead
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +71,32 @@ async def lifespan(app: FastAPI):
     setup_logging()
     logger.info("Starting Resume Parser API")
     await init_redis()
-    init_ai_clients()
+    start_ai_clients()
+    # May download the encoding, so off the event loop and before any request
+    await asyncio.to_thread(preload_tokenizer)
+    init_extraction_pool()
+    init_ocr_pool()
+    start_usage_flusher()
     yield
+    shutdown_extraction_pool()
+    shutdown_ocr_pool()
+    await close_ai_clients()
+    await stop_usage_flusher()
     await close_redis()
+    mark_process_dead()
     logger.info("Shutdown complete")
+    shutdown_logging()
+
+
+def preload():
+    """Import the provider SDKs and parsers up front.
+
+    Called by gunicorn (see gunicorn.conf.py) before it forks the workers, so
+    they share these pages copy-on-write instead of each importing them on
+    first use.
+    """
+    preload_provider_sdks()
+    preload_parsers()
 
 
 app = FastAPI(
@@ -34,6 +106,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 origins = [o.strip() for o in CORS_ORIGINS.split(",")] if CORS_ORIGINS != "*" else ["*"]
@@ -43,19 +116,21 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestIdMiddleware)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_size=MAX_FILE_SIZE + MULTIPART_OVERHEAD,
+    path_limits={"/parse/batch": BATCH_MAX_BODY_SIZE},
+)
 
 
-class RequestIdMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        rid = request.headers.get("X-Request-ID", str(uuid.uuid4()))
-        request_id_var.set(rid)
-        logger.info(f"{request.method} {request.url.path}")
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = rid
-        return response
-
-
-app.add_middleware(RequestIdMiddleware)
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return ORJSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy. Retry shortly."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 
 @app.get("/", response_model=HealthResponse)
@@ -63,95 +138,421 @@ async def health():
     return HealthResponse(status="ok", version="1.0.0", environment=ENVIRONMENT)
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/usage", response_model=UsageResponse)
-async def get_usage(api_key: str = Depends(get_api_key)):
-    usage = await get_usage_without_increment(api_key)
-    return UsageResponse(**usage)
+async def get_key_usage(api_key: str = Depends(get_api_key)):
+    """This month's request count and parse stats (tokens, providers, latency)."""
+    usage = await get_usage([api_key])
+    return UsageResponse(**usage[api_key])
+
+
+@app.get("/admin/usage", response_model=BulkUsageResponse, dependencies=[Depends(require_admin)])
+async def get_bulk_usage(keys: list[str] = Query(default=[], description="API keys; all configured keys if omitted")):
+    """Usage of many API keys in one call. Requires the X-Admin-Key header."""
+    usage = await get_usage(keys or list(API_KEYS))
+    return BulkUsageResponse(usage=usage)
+
+
+ZIP_TYPES = ("application/zip", "application/x-zip-compressed")
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _resolve_content_type(content_type: str | None, filename: str, head: bytes) -> str:
+    """Pick a parser for a file, trusting its first bytes over its label.
+
+    Raises ValueError for unsupported types and for PDF/DOCX files whose
+    content does not match.
+    """
+    sniffed = sniff_content_type(head)
+    if sniffed:
+        return sniffed
+
+    if content_type in (PDF_TYPE, DOCX_TYPE, TXT_TYPE):
+        declared = content_type
+    elif filename.endswith(".pdf"):
+        declared = PDF_TYPE
+    elif filename.endswith(".docx"):
+        declared = DOCX_TYPE
+    elif filename.endswith(".txt"):
+        declared = TXT_TYPE
+    else:
+        raise ValueError(f"Unsupported file type: {content_type}. Accepted: PDF, DOCX, TXT")
+
+    if declared != TXT_TYPE:
+        raise ValueError("File content does not match its type. Accepted: PDF, DOCX, TXT")
+    return declared
+
+
+async def _check_upload(file: UploadFile) -> str:
+    """Validate an upload from its size and first bytes; return its content type."""
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise HTTPException(status_code=413, detail="File too large. Max 10MB.")
+    head = await file.read(SNIFF_BYTES)
+    if not head:
+        raise HTTPException(status_code=400, detail="Empty file.")
+    await file.seek(0)
+    try:
+        return _resolve_content_type(file.content_type, file.filename or "", head)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _read_limited(file: UploadFile, limit: int) -> bytes | None:
+    """Read an upload in chunks; None once it turns out to be over `limit`."""
+    if file.size is not None and file.size > limit:
+        return None
+    chunks, total = [], 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        total += len(chunk)
+        if total > limit:
+            return None
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _read_upload(file: UploadFile) -> tuple[bytes, str]:
+    content_type = await _check_upload(file)
+    with stage_timer("upload", content_type):
+        file_bytes = await _read_limited(file, MAX_FILE_SIZE)
+    if file_bytes is None:
+        raise HTTPException(status_code=413, detail="File too large. Max 10MB.")
+    return file_bytes, content_type
+
+
+@asynccontextmanager
+async def _spooled_upload(file: UploadFile):
+    """Copy an upload to a temporary file chunk by chunk; yield (path, content_type).
+
+    Extraction then reads the document from disk, so a request never holds
+    more than one chunk of it in memory and only the path crosses into the
+    extraction pool. The file is removed on exit.
+    """
+    content_type = await _check_upload(file)
+    with tempfile.NamedTemporaryFile(prefix="upload-") as spool:
+        with stage_timer("upload", content_type):
+            total = 0
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                total += len(chunk)
+                if total > MAX_FILE_SIZE:
+                    raise HTTPException(status_code=413, detail="File too large. Max 10MB.")
+                spool.write(chunk)
+            spool.flush()
+        yield Path(spool.name), content_type
+
+
+ParseMode = Literal["full", "fast"]
+_MODE_DESCRIPTION = "`fast` returns only contact details and skills found locally, without calling the LLM"
+_REUSE_DESCRIPTION = (
+    "When this API key parsed a near-duplicate of this resume before, reuse that result and "
+    "only re-read the sections that changed"
+)
+_SPLIT_DESCRIPTION = (
+    "Treat the file as several concatenated resumes (e.g. a career fair PDF): each one is "
+    "parsed separately and counts as one request"
+)
 
 
-@app.post("/parse", response_model=ParseResponse)
+@app.post("/parse", response_model=ParseResponse | SplitParseResponse)
 async def parse_resume(
+    response: Response,
     file: UploadFile = File(..., description="Resume file (PDF, DOCX, or TXT)"),
+    mode: ParseMode = Query("full", description=_MODE_DESCRIPTION),
+    split: bool = Query(False, description=_SPLIT_DESCRIPTION),
+    reuse_similar: bool = Query(False, description=_REUSE_DESCRIPTION),
     api_key: str = Depends(get_api_key),
 ):
-    await check_rate_limit(api_key)
+    usage = await check_rate_limit(api_key)
 
-    content_type = file.content_type
-    filename = file.filename or ""
-    if content_type not in (
-        "application/pdf",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        "text/plain",
-    ):
-        if filename.endswith(".pdf"):
-            content_type = "application/pdf"
-        elif filename.endswith(".docx"):
-            content_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        elif filename.endswith(".txt"):
-            content_type = "text/plain"
-        else:
+    async with _spooled_upload(file) as (path, content_type):
+        try:
+            raw_text = await extract_text_async(path, content_type, whole_document=split)
+        except ExtractionQueueFull:
             raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported file type: {content_type}. Accepted: PDF, DOCX, TXT",
+                status_code=503,
+                detail="Server is busy processing documents. Retry shortly.",
+                headers={"Retry-After": "5"},
             )
-
-    file_bytes = await file.read()
-    if len(file_bytes) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="File too large. Max 10MB.")
-    if len(file_bytes) == 0:
-        raise HTTPException(status_code=400, detail="Empty file.")
-
-    try:
-        raw_text = extract_text(file_bytes, content_type)
-    except Exception as e:
-        logger.exception("Failed to extract text from file")
-        return ParseResponse(success=False, error=f"Failed to extract text: {str(e)}")
+        except Exception as e:
+            logger.exception("Failed to extract text from file")
+            return ParseResponse(success=False, error=f"Failed to extract text: {str(e)}")
 
     if not raw_text.strip():
         return ParseResponse(success=False, error="No text could be extracted from the file.")
 
-    if len(raw_text) > 15000:
-        raw_text = raw_text[:15000]
-
-    try:
-        parsed_data, tokens_used = await extract_resume_data(raw_text)
-    except Exception as e:
-        logger.exception("AI extraction failed")
-        return ParseResponse(success=False, error=f"AI extraction failed: {str(e)}")
-
-    try:
-        resume = ParsedResume(**parsed_data, raw_text=raw_text[:2000])
-    except Exception:
-        logger.warning("Failed to validate parsed data, returning partial result")
-        resume = ParsedResume(raw_text=raw_text[:2000])
-
-    return ParseResponse(success=True, data=resume, tokens_used=tokens_used)
+    if split:
+        return await _parse_candidates(raw_text, content_type, mode, api_key, usage["tier"])
+
+    result = await parse_text(
+        raw_text, content_type, mode=mode, tier=usage["tier"], api_key=api_key, reuse_similar=reuse_similar
+    )
+    if mode == "full":
+        response.headers["X-Cache"] = "HIT" if result.cached else "MISS"
+    return result
+
+
+async def _parse_candidates(text: str, content_type: str, mode: str, api_key: str, tier: str) -> SplitParseResponse:
+    """Parse every resume in a multi-resume document concurrently."""
+    candidates = split_candidates(text)
+    truncated = len(candidates) > SPLIT_MAX_CANDIDATES
+    if truncated:
+        logger.info(f"Document holds {len(candidates)} resumes, parsing the first {SPLIT_MAX_CANDIDATES}")
+        candidates = candidates[:SPLIT_MAX_CANDIDATES]
+    # The upload itself was charged as one request
+    if len(candidates) > 1:
+        await check_rate_limit(api_key, cost=len(candidates) - 1)
+
+    # Candidates beyond the tier's LLM slots would only time out in the
+    # admission queue, so they wait here instead, however long the document
+    fan_out = asyncio.Semaphore(tier_slots(tier))
+
+    async def parse_candidate(candidate: str) -> ParseResponse:
+        try:
+            async with fan_out, llm_slot(api_key):
+                return await parse_text(candidate, content_type, mode=mode, tier=tier, api_key=api_key)
+        except Overloaded as e:
+            return ParseResponse(success=False, error=f"Server is busy. Retry in {e.retry_after}s.")
+
+    results = await asyncio.gather(*(parse_candidate(candidate) for candidate in candidates))
+    items = [
+        CandidateResponse(**dict(result), index=index, pages=candidate.count(PAGE_BREAK) + 1)
+        for index, (candidate, result) in enumerate(zip(candidates, results))
+    ]
+    tokens_used = sum(item.tokens_used or 0 for item in items)
+    annotate_request(items=len(items), tokens=tokens_used)
+    return SplitParseResponse(
+        success=any(item.success for item in items),
+        candidates=items,
+        tokens_used=tokens_used,
+        truncated=truncated,
+    )
 
 
 @app.post("/parse/text", response_model=ParseResponse)
 async def parse_resume_text(
     text: str,
+    response: Response,
+    mode: ParseMode = Query("full", description=_MODE_DESCRIPTION),
+    reuse_similar: bool = Query(False, description=_REUSE_DESCRIPTION),
     api_key: str = Depends(get_api_key),
 ):
     """Parse resume from plain text (no file upload needed)."""
-    await check_rate_limit(api_key)
+    usage = await check_rate_limit(api_key)
 
     if not text.strip():
         raise HTTPException(status_code=400, detail="Empty text.")
 
-    if len(text) > 15000:
-        text = text[:15000]
+    result = await parse_text(text, mode=mode, tier=usage["tier"], api_key=api_key, reuse_similar=reuse_similar)
+    if mode == "full":
+        response.headers["X-Cache"] = "HIT" if result.cached else "MISS"
+    return result
 
-    try:
-        parsed_data, tokens_used = await extract_resume_data(text)
-    except Exception as e:
-        logger.exception("AI extraction failed")
-        return ParseResponse(success=False, error=f"AI extraction failed: {str(e)}")
+
+@app.post("/parse/stream")
+async def parse_resume_stream(
+    request: Request,
+    file: UploadFile | None = File(None, description="Resume file (PDF, DOCX, or TXT)"),
+    text: str | None = Form(None, description="Resume as plain text, instead of a file"),
+    api_key: str = Depends(get_api_key),
+):
+    """Stream resume fields as they are extracted.
+
+    Responds with Server-Sent Events by default, or NDJSON when the client sends
+    `Accept: application/x-ndjson`. Each event is named after a ParsedResume field;
+    list fields (skills, experience, ...) arrive one element per event. The stream
+    ends with a `done` event carrying `tokens_used`, or an `error` event.
+    """
+    has_text = bool(text and text.strip())
+    if (file is not None) == has_text:
+        raise HTTPException(status_code=400, detail="Provide either a file or text.")
+
+    usage = await check_rate_limit(api_key)
+
+    if file is not None:
+        try:
+            async with _spooled_upload(file) as (path, content_type):
+                text = await extract_text_async(path, content_type)
+        except HTTPException:
+            raise
+        except ExtractionQueueFull:
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy processing documents. Retry shortly.",
+                headers={"Retry-After": "5"},
+            )
+        except Exception as e:
+            logger.exception("Failed to extract text from file")
+            events = _single_event("error", {"error": f"Failed to extract text: {str(e)}"})
+        else:
+            if text.strip():
+                events = stream_parse(text, usage["tier"], api_key, content_type)
+            else:
+                events = _single_event("error", {"error": "No text could be extracted from the file."})
+    else:
+        events = stream_parse(text, usage["tier"], api_key)
+
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        media_type = "application/x-ndjson"
+        body = (json.dumps({"event": name, "data": data}) + "\n" async for name, data in events)
+    else:
+        media_type = "text/event-stream"
+        body = (f"event: {name}\ndata: {json.dumps(data)}\n\n" async for name, data in events)
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _single_event(name: str, data: dict):
+    yield name, data
+
+
+@app.post("/parse/batch", response_model=BatchParseResponse)
+async def parse_resume_batch(
+    files: list[UploadFile] = File(default=[], description="Resume files (PDF, DOCX, TXT) or zip archives"),
+    texts: list[str] = Form(default=[], description="Resumes as plain text"),
+    api_key: str = Depends(get_api_key),
+):
+    """Parse many resumes in one call. Errors are reported per item."""
+    # File contents are None for uploads over the size limit, which are not read
+    documents: list[tuple[str, bytes | None, str | None]] = []
+    rejected: list[tuple[str, str]] = []
+    # Bytes held for the whole batch once zips are inflated
+    inflated = 0
+    for upload in files:
+        filename = upload.filename or ""
+        if upload.content_type in ZIP_TYPES or filename.lower().endswith(".zip"):
+            zip_bytes = await _read_limited(upload, BATCH_MAX_BODY_SIZE)
+            if zip_bytes is None:
+                rejected.append((filename, "Zip archive too large."))
+                continue
+            try:
+                members = expand_zip(zip_bytes, max(0, BATCH_MAX_BODY_SIZE - inflated))
+            except ValueError as e:
+                rejected.append((filename, str(e)))
+                continue
+            inflated += sum(len(data) for _, data in members)
+            documents.extend((name, data, None) for name, data in members)
+        else:
+            content = await _read_limited(upload, MAX_FILE_SIZE)
+            inflated += len(content or b"")
+            documents.append((filename, content, upload.content_type))
+
+    item_count = len(documents) + len(rejected) + len(texts)
+    if item_count == 0:
+        raise HTTPException(status_code=400, detail="No files or texts provided.")
+    if item_count > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Too many items. Max {BATCH_MAX_ITEMS} per batch.")
+
+    usage = await check_rate_limit(api_key, cost=len(documents) + len(texts))
+
+    # Keep this batch from monopolising the shared extraction queue
+    extraction_slots = asyncio.Semaphore(max(1, EXTRACTION_WORKERS))
+
+    async def parse_document(filename: str, file_bytes: bytes | None, declared_type: str | None) -> ParseResponse:
+        if file_bytes is None or len(file_bytes) > MAX_FILE_SIZE:
+            return ParseResponse(success=False, error="File too large. Max 10MB.")
+        if len(file_bytes) == 0:
+            return ParseResponse(success=False, error="Empty file.")
+        try:
+            content_type = _resolve_content_type(declared_type, filename, file_bytes[:SNIFF_BYTES])
+        except ValueError as e:
+            return ParseResponse(success=False, error=str(e))
+
+        try:
+            async with extraction_slots:
+                raw_text = await extract_text_async(file_bytes, content_type)
+        except Exception as e:
+            logger.exception(f"Failed to extract text from batch item {filename}")
+            return ParseResponse(success=False, error=f"Failed to extract text: {str(e)}")
+
+        if not raw_text.strip():
+            return ParseResponse(success=False, error="No text could be extracted from the file.")
+        return await parse_item(raw_text, content_type)
+
+    async def parse_plain_text(text: str) -> ParseResponse:
+        if not text.strip():
+            return ParseResponse(success=False, error="Empty text.")
+        return await parse_item(text, "text/plain")
+
+    async def parse_item(text: str, content_type: str) -> ParseResponse:
+        try:
+            async with llm_slot(api_key):
+                return await parse_text(text, content_type, tier=usage["tier"], api_key=api_key)
+        except Overloaded as e:
+            return ParseResponse(success=False, error=f"Server is busy. Retry in {e.retry_after}s.")
+
+    results = await asyncio.gather(
+        *(parse_document(*document) for document in documents),
+        *(parse_plain_text(text) for text in texts),
+    )
+    names = [name for name, _, _ in documents] + [None] * len(texts)
+
+    items = [
+        BatchItemResponse(**dict(result), index=index, filename=name)
+        for index, (name, result) in enumerate(zip(names, results))
+    ]
+    items += [
+        BatchItemResponse(success=False, error=error, index=len(items) + offset, filename=name)
+        for offset, (name, error) in enumerate(rejected)
+    ]
+    tokens_used = sum(item.tokens_used or 0 for item in items)
+    annotate_request(items=len(items), tokens=tokens_used)
+    return BatchParseResponse(
+        success=any(item.success for item in items),
+        results=items,
+        tokens_used=tokens_used,
+    )
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(
+    file: UploadFile | None = File(None, description="Resume file (PDF, DOCX, or TXT)"),
+    text: str | None = Form(None, description="Resume as plain text, instead of a file"),
+    webhook_url: str | None = Form(None, description="URL to POST the result to when the job finishes"),
+    api_key: str = Depends(get_api_key),
+):
+    """Queue a resume for background parsing and return immediately."""
+    has_text = bool(text and text.strip())
+    if (file is not None) == has_text:
+        raise HTTPException(status_code=400, detail="Provide either a file or text.")
+    if webhook_url:
+        try:
+            await resolve_webhook(webhook_url)
+        except WebhookRejected as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    await check_rate_limit(api_key)
 
     try:
-        resume = ParsedResume(**parsed_data, raw_text=text[:2000])
-    except Exception:
-        logger.warning("Failed to validate parsed data, returning partial result")
-        resume = ParsedResume(raw_text=text[:2000])
+        if file is not None:
+            file_bytes, content_type = await _read_upload(file)
+            job = await enqueue_job(
+                api_key,
+                file_bytes=file_bytes,
+                content_type=content_type,
+                filename=file.filename,
+                webhook_url=webhook_url,
+            )
+        else:
+            job = await enqueue_job(api_key, text=text, webhook_url=webhook_url)
+    except QueueUnavailable:
+        raise HTTPException(status_code=503, detail="Job queue unavailable.", headers={"Retry-After": "30"})
 
-    return ParseResponse(success=True, data=resume, tokens_used=tokens_used)
+    return JobResponse(**job)
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job_status(job_id: str, api_key: str = Depends(get_api_key)):
+    try:
+        job = await get_job(job_id, api_key)
+    except QueueUnavailable:
+        raise HTTPException(status_code=503, detail="Job queue unavailable.", headers={"Retry-After": "30"})
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return JobResponse(**job)
@@ -0,0 +1,165 @@
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR (an empty directory,
+# cleared on container start) so every worker writes its samples there and
+# /metrics aggregates them regardless of which worker serves the scrape.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+_CONTENT_TYPE_LABELS = {
+    "application/pdf": "pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "text/plain": "txt",
+}
+
+# Stage durations of the current request, for its Server-Timing header
+request_stages: contextvars.ContextVar[list[tuple[str, float]] | None] = contextvars.ContextVar(
+    "request_stages", default=None
+)
+
+STAGE_SECONDS = Histogram(
+    "resume_parser_stage_seconds",
+    "Time spent in each parse pipeline stage",
+    ["stage", "content_type", "provider", "outcome"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 45, 60),
+)
+LLM_TOKENS = Counter(
+    "resume_parser_llm_tokens_total",
+    "LLM tokens consumed",
+    ["provider", "kind"],
+)
+LLM_FALLBACKS = Counter(
+    "resume_parser_llm_fallbacks_total",
+    "Requests that moved on from the primary provider",
+    ["provider", "reason"],
+)
+LLM_IN_FLIGHT = Gauge(
+    "resume_parser_llm_requests_in_flight",
+    "LLM provider calls currently in progress",
+    ["provider"],
+    multiprocess_mode="livesum",
+)
+LLM_HTTP_ACTIVE = Gauge(
+    "resume_parser_llm_http_active_requests",
+    "Provider HTTP requests holding a pooled connection",
+    multiprocess_mode="livesum",
+)
+LLM_HTTP_POOL_SIZE = Gauge(
+    "resume_parser_llm_http_pool_max_connections",
+    "Connection limit of the provider HTTP pool per process",
+    multiprocess_mode="liveall",
+)
+LLM_HTTP_CONNECTIONS_OPENED = Counter(
+    "resume_parser_llm_http_connections_opened_total",
+    "New provider connections (TCP and TLS handshakes)",
+    ["host"],
+)
+LLM_HTTP_POOL_TIMEOUTS = Counter(
+    "resume_parser_llm_http_pool_timeouts_total",
+    "Provider requests that gave up waiting for a pooled connection",
+)
+LLM_QUEUED = Gauge(
+    "resume_parser_llm_queued",
+    "Requests waiting for an LLM admission slot",
+    multiprocess_mode="livesum",
+)
+LLM_CONCURRENCY_LIMIT = Gauge(
+    "resume_parser_llm_concurrency_limit",
+    "Current adaptive limit on in-flight LLM calls per process",
+    multiprocess_mode="liveall",
+)
+LLM_REJECTIONS = Counter(
+    "resume_parser_llm_rejections_total",
+    "Requests shed by LLM admission control",
+    ["tier", "reason"],
+)
+CACHE_LOOKUPS = Counter(
+    "resume_parser_cache_lookups_total",
+    "Parse result cache lookups",
+    ["result"],
+)
+OCR_PAGES = Counter(
+    "resume_parser_ocr_pages_total",
+    "PDF pages without embedded text, by OCR outcome",
+    ["outcome"],
+)
+SIMILAR_LOOKUPS = Counter(
+    "resume_parser_similar_lookups_total",
+    "Near-duplicate index lookups",
+    ["result"],
+)
+PARTIAL_REPARSES = Counter(
+    "resume_parser_partial_reparses_total",
+    "Parses that reused a similar earlier result and re-read only changed sections",
+)
+REDIS_ERRORS = Counter(
+    "resume_parser_redis_errors_total",
+    "Redis operations that failed",
+    ["operation"],
+)
+LOG_RECORDS_DROPPED = Counter(
+    "resume_parser_log_records_dropped_total",
+    "Log records dropped because the log queue was full",
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "resume_parser_http_requests_in_flight",
+    "HTTP requests currently being served",
+    multiprocess_mode="livesum",
+)
+
+
+def content_type_label(content_type: str | None) -> str:
+    return _CONTENT_TYPE_LABELS.get(content_type, "other")
+
+
+@contextmanager
+def stage_timer(stage: str, content_type: str | None = None):
+    """Time a pipeline stage; callers may adjust the yielded labels.
+
+    The outcome defaults to "ok", or "error" if the block raises without
+    having set a more specific outcome.
+    """
+    labels = {"content_type": content_type, "provider": "none", "outcome": "ok"}
+    started = time.perf_counter()
+    try:
+        yield labels
+    except BaseException:
+        if labels["outcome"] == "ok":
+            labels["outcome"] = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.labels(
+            stage=stage,
+            content_type=content_type_label(labels["content_type"]),
+            provider=labels["provider"],
+            outcome=labels["outcome"],
+        ).observe(elapsed)
+        stages = request_stages.get()
+        if stages is not None:
+            stages.append((stage, elapsed))
+
+
+def render_metrics() -> bytes:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead():
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
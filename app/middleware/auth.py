@@ -1,15 +1,50 @@
+import asyncio
 import logging
+import secrets
 from datetime import datetime, timezone
 
 from fastapi import Request, HTTPException
 from redis.asyncio import Redis
 
-from app.config import API_KEYS, TIER_LIMITS, REDIS_URL, RAPIDAPI_PROXY_SECRET
+from app.logging_config import sample_request
+from app.metrics import REDIS_ERRORS
+from app.config import (
+    API_KEYS,
+    TIER_LIMITS,
+    REDIS_URL,
+    RAPIDAPI_PROXY_SECRET,
+    RATE_LIMIT_LEASE_SIZE,
+    RATE_LIMIT_LEASE_TIERS,
+    ADMIN_API_KEY,
+)
 
 logger = logging.getLogger(__name__)
 
 _redis: Redis | None = None
 
+USAGE_TTL = 60 * 60 * 24 * 35  # 35 days
+
+# Grant between ARGV[2] and ARGV[1] requests without taking the counter past the
+# limit in ARGV[3], creating it with a TTL of ARGV[4] seconds. Returns
+# {granted, count}; granted is 0 when not even the minimum fits.
+_RESERVE_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local grant = math.min(tonumber(ARGV[1]), tonumber(ARGV[3]) - current)
+if grant < tonumber(ARGV[2]) then
+  return {0, current}
+end
+local count = redis.call('INCRBY', KEYS[1], grant)
+if count == grant then
+  redis.call('EXPIRE', KEYS[1], ARGV[4])
+end
+return {grant, count}
+"""
+_reserve_script = None
+
+# Quota leased from Redis and served locally: redis_key -> [remaining, count_at_lease]
+_leases: dict[str, list[int]] = {}
+_lease_lock = asyncio.Lock()
+
 
 async def init_redis():
     global _redis
@@ -25,6 +60,7 @@ async def init_redis():
 async def close_redis():
     global _redis
     if _redis:
+        await release_leases()
         await _redis.close()
         logger.info("Redis connection closed")
 
@@ -48,18 +84,82 @@ def get_api_key(request: Request) -> str:
         proxy_secret = request.headers.get("X-RapidAPI-Proxy-Secret")
         if proxy_secret == RAPIDAPI_PROXY_SECRET:
             user = request.headers.get("X-RapidAPI-User", "rapidapi-user")
+            api_key = f"rapidapi:{user}"
+            sample_request(api_key, API_KEYS.get(api_key, "free"))
             logger.info(f"RapidAPI request from user: {user}")
-            return f"rapidapi:{user}"
+            return api_key
 
     api_key = request.headers.get("X-API-Key") or request.query_params.get("api_key")
     if not api_key:
         raise HTTPException(status_code=401, detail="Missing API key. Include X-API-Key header.")
     if api_key not in API_KEYS:
         raise HTTPException(status_code=403, detail="Invalid API key.")
+    sample_request(api_key, API_KEYS[api_key])
     return api_key
 
 
-async def check_rate_limit(api_key: str) -> dict:
+def require_admin(request: Request):
+    """Allow only requests carrying ADMIN_API_KEY in X-Admin-Key; 404 when it is unset."""
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(request.headers.get("X-Admin-Key", ""), ADMIN_API_KEY):
+        raise HTTPException(status_code=403, detail="Invalid admin key.")
+
+
+async def _reserve(redis_key: str, want: int, minimum: int, limit: int) -> tuple[int, int]:
+    global _reserve_script
+    if _reserve_script is None or _reserve_script.registered_client is not _redis:
+        _reserve_script = _redis.register_script(_RESERVE_SCRIPT)
+    granted, count = await _reserve_script(keys=[redis_key], args=[want, minimum, limit, USAGE_TTL])
+    return int(granted), int(count)
+
+
+async def _take_from_lease(redis_key: str, cost: int, limit: int) -> tuple[int, int]:
+    """Serve `cost` requests from this worker's lease, refilling it from Redis.
+
+    Leased quota is counted in Redis as soon as it is granted, so the shared
+    counter never exceeds the limit; unused quota goes back on shutdown.
+    """
+    lease = _leases.get(redis_key)
+    if not lease or lease[0] < cost:
+        async with _lease_lock:
+            lease = _leases.get(redis_key)
+            if not lease or lease[0] < cost:
+                leftover = lease[0] if lease else 0
+                granted, count = await _reserve(
+                    redis_key, max(RATE_LIMIT_LEASE_SIZE, cost) - leftover, cost - leftover, limit
+                )
+                if not granted:
+                    return 0, count
+                # Drop leases left over from previous months
+                month = redis_key.rsplit(":", 1)[1]
+                for key in [key for key in _leases if not key.endswith(month)]:
+                    del _leases[key]
+                lease = _leases[redis_key] = [leftover + granted, count]
+
+    lease[0] -= cost
+    return cost, lease[1] - lease[0]
+
+
+async def release_leases():
+    """Return unused leased quota to Redis."""
+    leases = [(key, lease[0]) for key, lease in _leases.items() if lease[0] > 0]
+    _leases.clear()
+    if not leases or not _redis:
+        return
+    try:
+        async with _redis.pipeline(transaction=False) as pipe:
+            for key, remaining in leases:
+                pipe.decrby(key, remaining)
+            await pipe.execute()
+        logger.info(f"Released {len(leases)} rate limit leases")
+    except Exception:
+        logger.error("Redis error while releasing rate limit leases")
+        REDIS_ERRORS.labels(operation="release_leases").inc()
+
+
+async def check_rate_limit(api_key: str, cost: int = 1) -> dict:
+    """Atomically check and charge `cost` requests against the monthly quota."""
     tier = API_KEYS.get(api_key, "free")
     limit = TIER_LIMITS.get(tier, 50)
     month_key = _get_month_key()
@@ -75,29 +175,27 @@ async def check_rate_limit(api_key: str) -> dict:
         }
 
     try:
-        current = await _redis.get(redis_key)
-        current_count = int(current) if current else 0
+        if RATE_LIMIT_LEASE_SIZE > 0 and tier in RATE_LIMIT_LEASE_TIERS:
+            granted, count = await _take_from_lease(redis_key, cost, limit)
+        else:
+            granted, count = await _reserve(redis_key, cost, cost, limit)
 
-        if current_count >= limit:
+        if not granted:
             raise HTTPException(
                 status_code=429,
                 detail={
                     "error": "Rate limit exceeded",
                     "tier": tier,
                     "limit": limit,
-                    "used": current_count,
+                    "used": count,
                     "resets_at": _get_month_end(),
                     "upgrade": "Contact us to upgrade your plan.",
                 },
             )
 
-        new_count = await _redis.incr(redis_key)
-        if new_count == 1:
-            await _redis.expire(redis_key, 60 * 60 * 24 * 35)  # 35-day TTL
-
         return {
             "tier": tier,
-            "requests_used": new_count,
+            "requests_used": count,
             "requests_limit": limit,
             "resets_at": _get_month_end(),
         }
@@ -105,38 +203,10 @@ async def check_rate_limit(api_key: str) -> dict:
         raise
     except Exception:
         logger.error("Redis error during rate limit check, allowing request")
+        REDIS_ERRORS.labels(operation="rate_limit").inc()
         return {
             "tier": tier,
             "requests_used": -1,
             "requests_limit": limit,
             "resets_at": _get_month_end(),
         }
-
-
-async def get_usage_without_increment(api_key: str) -> dict:
-    tier = API_KEYS.get(api_key, "free")
-    limit = TIER_LIMITS.get(tier, 50)
-    month_key = _get_month_key()
-    redis_key = f"usage:{api_key}:{month_key}"
-
-    if not _redis:
-        return {
-            "tier": tier,
-            "requests_used": -1,
-            "requests_limit": limit,
-            "resets_at": _get_month_end(),
-        }
-
-    try:
-        current = await _redis.get(redis_key)
-        current_count = int(current) if current else 0
-    except Exception:
-        logger.error("Redis error during usage check")
-        current_count = -1
-
-    return {
-        "tier": tier,
-        "requests_used": current_count,
-        "requests_limit": limit,
-        "resets_at": _get_month_end(),
-    }
@@ -0,0 +1,63 @@
+import json
+
+from fastapi import HTTPException
+
+# Room for multipart boundaries, part headers and small form fields
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class BodySizeLimitMiddleware:
+    """Reject request bodies over the limit before they are buffered.
+
+    A declared Content-Length over the limit is refused before any of the body
+    is read; otherwise the body is counted as it streams in, and reading stops
+    with a 413 as soon as the limit is crossed. `path_limits` overrides the
+    default for exact paths.
+    """
+
+    def __init__(self, app, max_size: int, path_limits: dict[str, int] | None = None):
+        self.app = app
+        self.max_size = max_size
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.path_limits.get(scope["path"], self.max_size)
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await _send_too_large(send, limit)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=_too_large_detail(limit))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def _too_large_detail(limit: int) -> str:
+    return f"Request body too large. Max {limit // (1024 * 1024)}MB."
+
+
+async def _send_too_large(send, limit: int):
+    body = json.dumps({"detail": _too_large_detail(limit)}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"connection", b"close"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
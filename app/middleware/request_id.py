@@ -0,0 +1,98 @@
+import logging
+import time
+import uuid
+
+from app.logging_config import request_fields_var, request_id_var
+from app.metrics import REQUESTS_IN_FLIGHT, request_stages
+
+logger = logging.getLogger("app.access")
+
+# Longest client-supplied X-Request-ID echoed back; anything else gets a fresh one
+MAX_REQUEST_ID_LENGTH = 128
+
+
+class RequestIdMiddleware:
+    """Tag each request with an id, time it and write one access log line.
+
+    Pure ASGI, so responses (streaming ones included) pass straight through
+    and the request context variables are visible to the handler. Responses
+    carry X-Request-ID and a Server-Timing header with the time spent in each
+    pipeline stage so far, plus `app` for the whole handler up to the headers.
+    The access line carries the stage timings and whatever the handler added
+    with annotate_request().
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rid = _client_request_id(scope) or str(uuid.uuid4())
+        rid_token = request_id_var.set(rid)
+        stages: list[tuple[str, float]] = []
+        stages_token = request_stages.set(stages)
+        fields: dict = {}
+        fields_token = request_fields_var.set(fields)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_headers(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = time.perf_counter() - started
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", rid.encode("latin-1")))
+                headers.append((b"server-timing", _server_timing(stages, elapsed).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            if logger.isEnabledFor(logging.INFO):
+                _log_access(scope, status, time.perf_counter() - started, stages, fields)
+            request_fields_var.reset(fields_token)
+            request_stages.reset(stages_token)
+            request_id_var.reset(rid_token)
+
+
+def _log_access(scope, status: int, elapsed: float, stages: list[tuple[str, float]], fields: dict):
+    duration_ms = elapsed * 1000
+    extra = {
+        "method": scope["method"],
+        "path": scope["path"],
+        "status": status,
+        "duration_ms": round(duration_ms, 1),
+        "stages": {stage: round(seconds * 1000, 1) for stage, seconds in _stage_totals(stages).items()},
+        **fields,
+    }
+    logger.info("%s %s %d %.1fms", scope["method"], scope["path"], status, duration_ms, extra=extra)
+
+
+def _client_request_id(scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name == b"x-request-id":
+            rid = value.decode("latin-1")
+            if 0 < len(rid) <= MAX_REQUEST_ID_LENGTH and rid.isprintable():
+                return rid
+            return None
+    return None
+
+
+def _stage_totals(stages: list[tuple[str, float]]) -> dict[str, float]:
+    totals: dict[str, float] = {}
+    for stage, seconds in stages:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return totals
+
+
+def _server_timing(stages: list[tuple[str, float]], elapsed: float) -> str:
+    totals = _stage_totals(stages)
+    totals["app"] = elapsed
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in totals.items())
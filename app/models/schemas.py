@@ -1,8 +1,14 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 
 
-class ContactInfo(BaseModel):
+class ResumeModel(BaseModel):
+    """Base for parsed resume parts: LLMs often return years and GPAs as numbers."""
+
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+
+class ContactInfo(ResumeModel):
     name: Optional[str] = None
     email: Optional[str] = None
     phone: Optional[str] = None
@@ -12,7 +18,7 @@ class ContactInfo(BaseModel):
     website: Optional[str] = None
 
 
-class Experience(BaseModel):
+class Experience(ResumeModel):
     company: Optional[str] = None
     title: Optional[str] = None
     start_date: Optional[str] = None
@@ -20,7 +26,7 @@ class Experience(BaseModel):
     description: Optional[str] = None
 
 
-class Education(BaseModel):
+class Education(ResumeModel):
     institution: Optional[str] = None
     degree: Optional[str] = None
     field: Optional[str] = None
@@ -29,18 +35,18 @@ class Education(BaseModel):
     gpa: Optional[str] = None
 
 
-class Certification(BaseModel):
+class Certification(ResumeModel):
     name: Optional[str] = None
     issuer: Optional[str] = None
     date: Optional[str] = None
 
 
-class Language(BaseModel):
+class Language(ResumeModel):
     name: str
     proficiency: Optional[str] = None
 
 
-class ParsedResume(BaseModel):
+class ParsedResume(ResumeModel):
     contact: ContactInfo = Field(default_factory=ContactInfo)
     summary: Optional[str] = None
     skills: list[str] = Field(default_factory=list)
@@ -51,11 +57,75 @@ class ParsedResume(BaseModel):
     raw_text: Optional[str] = None
 
 
+class TokenUsage(BaseModel):
+    provider: Optional[str] = None
+    input_tokens: int = 0  # uncached input
+    cached_input_tokens: int = 0  # input served from the provider's prompt cache
+    cache_creation_input_tokens: int = 0  # input written to the prompt cache
+    output_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.cached_input_tokens + self.cache_creation_input_tokens + self.output_tokens
+
+
+class CompactionStats(BaseModel):
+    original_chars: int
+    compacted_chars: int
+    compacted_tokens: int
+    truncated: bool = False
+
+
+class SimilarResume(BaseModel):
+    resume_id: str  # of the earlier resume
+    similarity: float  # estimated share of text in common, 0-1
+    # Sections re-read by the LLM when the earlier result was reused (reuse_similar)
+    reparsed_sections: Optional[list[str]] = None
+
+
 class ParseResponse(BaseModel):
     success: bool
     data: Optional[ParsedResume] = None
     error: Optional[str] = None
     tokens_used: Optional[int] = None
+    token_usage: Optional[TokenUsage] = None
+    cached: bool = False
+    compaction: Optional[CompactionStats] = None
+    resume_id: Optional[str] = None  # identifies this resume text in later similar_to hints
+    similar_to: Optional[SimilarResume] = None
+
+
+class BatchItemResponse(ParseResponse):
+    index: int
+    filename: Optional[str] = None
+
+
+class BatchParseResponse(BaseModel):
+    success: bool
+    results: list[BatchItemResponse]
+    tokens_used: int = 0
+
+
+class CandidateResponse(ParseResponse):
+    index: int
+    pages: int
+
+
+class SplitParseResponse(BaseModel):
+    success: bool
+    candidates: list[CandidateResponse]
+    tokens_used: int = 0
+    truncated: bool = False  # more resumes than SPLIT_MAX_CANDIDATES were found
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    filename: Optional[str] = None
+    result: Optional[ParseResponse] = None
 
 
 class HealthResponse(BaseModel):
@@ -64,8 +134,24 @@ class HealthResponse(BaseModel):
     environment: Optional[str] = None
 
 
+class UsageStats(BaseModel):
+    parses: int = 0
+    failed: int = 0
+    cached: int = 0
+    tokens_used: int = 0
+    token_usage: dict[str, int] = Field(default_factory=dict)  # by TokenUsage field
+    providers: dict[str, int] = Field(default_factory=dict)  # parses per provider
+    latency_buckets: dict[str, int] = Field(default_factory=dict)  # parses per "le_<seconds>"
+    latency_avg_ms: Optional[int] = None
+
+
 class UsageResponse(BaseModel):
     tier: str
     requests_used: int
     requests_limit: int
     resets_at: str
+    stats: Optional[UsageStats] = None
+
+
+class BulkUsageResponse(BaseModel):
+    usage: dict[str, UsageResponse]
@@ -0,0 +1,298 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+
+from app.config import (
+    TIER_LIMITS,
+    OPENAI_TIMEOUT,
+    ANTHROPIC_TIMEOUT,
+    LLM_MAX_IN_FLIGHT,
+    LLM_CLUSTER_MAX_IN_FLIGHT,
+    LLM_MAX_QUEUE,
+    LLM_MAX_WAIT,
+    LLM_TIER_SHARES,
+)
+from app.metrics import LLM_QUEUED, LLM_CONCURRENCY_LIMIT, LLM_REJECTIONS, REDIS_ERRORS, stage_timer
+from app.middleware import auth
+
+logger = logging.getLogger(__name__)
+
+# Never adapt the limit below this, so traffic keeps probing the provider
+MIN_IN_FLIGHT = 1
+# Shrink the limit when fewer than this share of the provider's requests remain
+LOW_REMAINING_SHARE = 0.1
+
+CLUSTER_KEY = "llm:in_flight"
+# Cluster slots expire on their own if a worker dies holding one; with hedging
+# a call may wait on both providers in turn.
+CLUSTER_LEASE = 2 * max(OPENAI_TIMEOUT, ANTHROPIC_TIMEOUT) + 5
+CLUSTER_POLL_INTERVAL = 0.05
+
+# Drop expired slots, then take one if fewer than ARGV[3] are held.
+# KEYS[1] = sorted set of slot tokens scored by expiry; ARGV = now, expiry, limit, token
+_ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[3]) then
+  redis.call('ZADD', KEYS[1], ARGV[2], ARGV[4])
+  redis.call('EXPIRE', KEYS[1], math.ceil(ARGV[2] - ARGV[1]))
+  return 1
+end
+return 0
+"""
+_acquire_script = None
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot get an LLM slot in time; maps to 503."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"LLM capacity exhausted ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def tier_priority(tier: str) -> int:
+    """Lower is served first: tiers with larger quotas go ahead."""
+    return -TIER_LIMITS.get(tier, 0)
+
+
+def _tier_rank(tier: str) -> int:
+    """0 for the best tier, 1 for the next and so on; unknown tiers come last."""
+    return sum(1 for limit in TIER_LIMITS.values() if -limit < tier_priority(tier))
+
+
+class AdmissionController:
+    """Per-process cap on in-flight LLM calls with a tier-priority wait queue.
+
+    Waiters are served best tier first, then first come first served. No tier
+    may hold more than its LLM_TIER_SHARES share of the slots. When the queue is
+    full a newcomer displaces the lowest-priority waiter, or is rejected if
+    there is none below it. The limit adapts to provider feedback: it halves on
+    a 429 and grows by one slot per `limit` successful calls (AIMD).
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, max_wait: float):
+        self.max_limit = max(MIN_IN_FLIGHT, max_in_flight)
+        self.limit = self.max_limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.tier_in_flight: Counter[str] = Counter()
+        self._waiters: list[tuple[int, int, str, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._successes = 0
+        self._throttled_until = 0.0
+        LLM_CONCURRENCY_LIMIT.set(self.limit)
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(max(self.max_wait, self._throttled_until - time.monotonic())))
+
+    def tier_cap(self, tier: str) -> int:
+        """Slots `tier` may hold at the current limit."""
+        return max(1, math.floor(self.limit * LLM_TIER_SHARES.get(tier, 1.0)))
+
+    def _can_start(self, tier: str) -> bool:
+        return self.in_flight < self.limit and self.tier_in_flight[tier] < self.tier_cap(tier)
+
+    def _start(self, tier: str):
+        self.in_flight += 1
+        self.tier_in_flight[tier] += 1
+
+    def release(self, tier: str):
+        self.in_flight -= 1
+        self.tier_in_flight[tier] -= 1
+        self._wake()
+
+    def _wake(self):
+        skipped = []
+        while self._waiters and self.in_flight < self.limit:
+            entry = heapq.heappop(self._waiters)
+            _, _, tier, future = entry
+            if future.done():
+                continue
+            if not self._can_start(tier):
+                skipped.append(entry)
+                continue
+            self._start(tier)
+            future.set_result(None)
+        for entry in skipped:
+            heapq.heappush(self._waiters, entry)
+
+    def _reject(self, tier: str, reason: str) -> Overloaded:
+        LLM_REJECTIONS.labels(tier=tier, reason=reason).inc()
+        return Overloaded(reason, self.retry_after())
+
+    async def acquire(self, tier: str):
+        # Anyone still queued was unable to start at the last release, so a
+        # newcomer that can start now jumps no one it should not
+        if self._can_start(tier):
+            self._start(tier)
+            return
+
+        priority = tier_priority(tier)
+        if self.queued >= self.max_queue:
+            live = [entry for entry in self._waiters if not entry[3].done()]
+            # With LLM_MAX_QUEUE=0 there is never anyone to displace
+            worst = max(live, default=None)
+            if worst is None or worst[0] <= priority:
+                raise self._reject(tier, "queue_full")
+            worst[3].set_exception(self._reject(worst[2], "displaced"))
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), tier, future))
+        LLM_QUEUED.inc()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            if future.done() and not future.exception():
+                return  # the slot arrived just as the wait ran out
+            future.cancel()
+            raise self._reject(tier, "timeout")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and not future.exception():
+                self.release(tier)
+            future.cancel()
+            raise
+        finally:
+            LLM_QUEUED.dec()
+
+    def observe_response(self, status_code: int, remaining: int | None, limit: int | None, retry_after: float | None):
+        """Adapt the limit to a provider response and its rate-limit headers."""
+        now = time.monotonic()
+        if status_code == 429:
+            self._throttled_until = now + (1.0 if retry_after is None else retry_after)
+            self._set_limit(self.limit // 2, "provider returned 429")
+        elif remaining is not None and limit and remaining < limit * LOW_REMAINING_SHARE:
+            self._set_limit(self.limit - 1, f"{remaining}/{limit} provider requests left")
+        elif status_code < 400 and now >= self._throttled_until and self.limit < self.max_limit:
+            self._successes += 1
+            if self._successes >= self.limit:
+                self._set_limit(self.limit + 1, "provider has headroom")
+
+    def _set_limit(self, limit: int, reason: str):
+        limit = min(self.max_limit, max(MIN_IN_FLIGHT, limit))
+        self._successes = 0
+        if limit == self.limit:
+            return
+        logger.info(f"LLM concurrency limit {self.limit} -> {limit}: {reason}")
+        self.limit = limit
+        LLM_CONCURRENCY_LIMIT.set(limit)
+        self._wake()
+
+
+controller = AdmissionController(LLM_MAX_IN_FLIGHT, LLM_MAX_QUEUE, LLM_MAX_WAIT)
+
+
+async def _acquire_cluster_slot(tier: str, deadline: float) -> str | None:
+    """Take a Redis-coordinated slot, polling until the deadline.
+
+    Returns the slot token, or None when Redis is unavailable (fail open, like
+    rate limiting). Better tiers poll more often.
+    """
+    global _acquire_script
+    redis = auth._redis
+    if not redis or LLM_CLUSTER_MAX_IN_FLIGHT <= 0:
+        return None
+    if _acquire_script is None or _acquire_script.registered_client is not redis:
+        _acquire_script = redis.register_script(_ACQUIRE_SCRIPT)
+
+    token = uuid.uuid4().hex
+    interval = CLUSTER_POLL_INTERVAL * (1 + _tier_rank(tier))
+    while True:
+        now = time.time()
+        try:
+            acquired = await _acquire_script(
+                keys=[CLUSTER_KEY], args=[now, now + CLUSTER_LEASE, LLM_CLUSTER_MAX_IN_FLIGHT, token]
+            )
+        except Exception:
+            logger.error("Redis error while acquiring a cluster LLM slot, skipping the cluster limit")
+            REDIS_ERRORS.labels(operation="llm_admission").inc()
+            return None
+        if acquired:
+            return token
+        if time.monotonic() + interval > deadline:
+            raise controller._reject(tier, "cluster_full")
+        await asyncio.sleep(interval)
+
+
+async def _release_cluster_slot(token: str):
+    try:
+        await auth._redis.zrem(CLUSTER_KEY, token)
+    except Exception:
+        REDIS_ERRORS.labels(operation="llm_admission").inc()
+
+
+def tier_slots(tier: str) -> int:
+    """LLM calls `tier` may currently have in flight in this process."""
+    return controller.tier_cap(tier)
+
+
+@asynccontextmanager
+async def admit(tier: str, content_type: str | None = None):
+    """Hold an LLM slot, locally and cluster-wide, for the duration of the block.
+
+    Raises Overloaded if no slot frees up within LLM_MAX_WAIT.
+    """
+    deadline = time.monotonic() + controller.max_wait
+    with stage_timer("llm_queue", content_type) as stage:
+        try:
+            await controller.acquire(tier)
+        except Overloaded:
+            stage["outcome"] = "rejected"
+            raise
+        try:
+            token = await _acquire_cluster_slot(tier, deadline)
+        except BaseException as e:
+            controller.release(tier)
+            if isinstance(e, Overloaded):
+                stage["outcome"] = "rejected"
+            raise
+
+    try:
+        yield
+    finally:
+        controller.release(tier)
+        if token:
+            await _release_cluster_slot(token)
+
+
+# (limit, remaining) request headers per provider
+_RATE_LIMIT_HEADERS = (
+    ("x-ratelimit-limit-requests", "x-ratelimit-remaining-requests"),
+    ("anthropic-ratelimit-requests-limit", "anthropic-ratelimit-requests-remaining"),
+)
+
+
+def _header_int(headers, name: str) -> int | None:
+    value = headers.get(name)
+    return int(value) if value and value.isdigit() else None
+
+
+async def rate_limit_hook(response):
+    """httpx response hook feeding provider rate-limit headers to the controller.
+
+    The provider HTTP client is shared, so the headers present decide which
+    provider answered.
+    """
+    remaining = limit = None
+    for limit_header, remaining_header in _RATE_LIMIT_HEADERS:
+        if remaining_header in response.headers:
+            remaining = _header_int(response.headers, remaining_header)
+            limit = _header_int(response.headers, limit_header)
+            break
+    retry_after = response.headers.get("retry-after")
+    try:
+        retry_after = float(retry_after) if retry_after else None
+    except ValueError:
+        retry_after = None
+    controller.observe_response(response.status_code, remaining, limit, retry_after)
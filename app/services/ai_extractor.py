@@ -1,16 +1,46 @@
+import asyncio
 import json
 import logging
+import time
+from typing import AsyncIterator
 
-from openai import AsyncOpenAI
-
-from app.config import AI_PROVIDER, OPENAI_API_KEY, ANTHROPIC_API_KEY
+from app.config import (
+    AI_PROVIDER,
+    OPENAI_API_KEY,
+    ANTHROPIC_API_KEY,
+    OPENAI_BASE_URL,
+    ANTHROPIC_BASE_URL,
+    OPENAI_TIMEOUT,
+    ANTHROPIC_TIMEOUT,
+    HEDGE_ENABLED,
+    HEDGE_PERCENTILE,
+    HEDGE_DEFAULT_DELAY,
+    HEDGE_MIN_DELAY,
+    LLM_MAX_RETRIES,
+)
+from app.metrics import LLM_TOKENS, LLM_FALLBACKS, LLM_IN_FLIGHT
+from app.models.schemas import TokenUsage
+from app.services.provider_health import CircuitOpen, provider_stats
 
 logger = logging.getLogger(__name__)
 
-_openai_client: AsyncOpenAI | None = None
-_anthropic_client = None  # AsyncAnthropic | None, imported lazily
+OPENAI_MODEL = "gpt-4o-mini"
+ANTHROPIC_MODEL = "claude-haiku-4-5-20251001"
+
+# Bump whenever EXTRACTION_PROMPT or the expected output shape changes so that
+# cached results produced by an older prompt are no longer served.
+PROMPT_VERSION = "2"
+
+# Provider SDKs are imported lazily, and only for configured providers
+_openai_client = None  # AsyncOpenAI | None
+_anthropic_client = None  # AsyncAnthropic | None
+_http_client = None  # httpx.AsyncClient | None, shared by both providers
+_init_task: asyncio.Task | None = None
 
-EXTRACTION_PROMPT = """You are a resume/CV parser. Extract structured data from the following resume text.
+# Static instructions, sent as the first (system) block of every request so that
+# provider-side prompt caching can reuse them. The resume itself always follows
+# in the user message; nothing request-specific may be added here.
+EXTRACTION_PROMPT = """You are a precise resume/CV parser. Extract structured data from the resume text in the user message.
 
 Return a valid JSON object with this exact structure (use null for missing fields):
 {
@@ -60,82 +90,331 @@ Return a valid JSON object with this exact structure (use null for missing field
 }
 
 IMPORTANT: Return ONLY the JSON object. No markdown, no explanation, no extra text.
-
-Resume text:
 """
 
 
 def init_ai_clients():
-    global _openai_client, _anthropic_client
+    global _openai_client, _anthropic_client, _http_client
+    if not OPENAI_API_KEY and not ANTHROPIC_API_KEY:
+        logger.error("No AI provider configured! Set OPENAI_API_KEY or ANTHROPIC_API_KEY")
+        return
+    from app.services.llm_http import create_llm_http_client, provider_timeout
+    # One keep-alive pool for both providers; its response hook tunes LLM admission control
+    _http_client = create_llm_http_client()
     if OPENAI_API_KEY:
-        _openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+        from openai import AsyncOpenAI
+        _openai_client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            base_url=OPENAI_BASE_URL or None,
+            http_client=_http_client,
+            timeout=provider_timeout(OPENAI_TIMEOUT),
+            max_retries=LLM_MAX_RETRIES,
+        )
         logger.info("OpenAI client initialized")
     if ANTHROPIC_API_KEY:
         from anthropic import AsyncAnthropic
-        _anthropic_client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+        _anthropic_client = AsyncAnthropic(
+            api_key=ANTHROPIC_API_KEY,
+            base_url=ANTHROPIC_BASE_URL or None,
+            http_client=_http_client,
+            timeout=provider_timeout(ANTHROPIC_TIMEOUT),
+            max_retries=LLM_MAX_RETRIES,
+        )
         logger.info("Anthropic client initialized")
-    if not _openai_client and not _anthropic_client:
-        logger.error("No AI provider configured! Set OPENAI_API_KEY or ANTHROPIC_API_KEY")
 
 
-async def extract_with_openai(text: str) -> tuple[dict, int]:
-    response = await _openai_client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a precise resume parser. Return only valid JSON."},
-            {"role": "user", "content": EXTRACTION_PROMPT + text},
+def start_ai_clients():
+    """Create the clients in a thread so the server answers while the SDKs import.
+
+    LLM calls made before the clients exist wait for them.
+    """
+    global _init_task
+    _init_task = asyncio.create_task(asyncio.to_thread(init_ai_clients))
+
+
+async def _clients_ready():
+    if _init_task is not None and not _init_task.done():
+        await asyncio.shield(_init_task)
+
+
+async def close_ai_clients():
+    """Close pooled provider connections on shutdown."""
+    global _http_client
+    await _clients_ready()
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def preload_provider_sdks():
+    """Import the configured provider SDKs without creating clients.
+
+    Clients own connection pools, so they are still created per process by
+    init_ai_clients(); this only lets forked workers share the imported code.
+    """
+    if OPENAI_API_KEY:
+        import openai  # noqa: F401
+    if ANTHROPIC_API_KEY:
+        import anthropic  # noqa: F401
+
+
+def cache_namespace() -> str:
+    """Identify the prompt/provider/model combination that produces results."""
+    model = ANTHROPIC_MODEL if AI_PROVIDER == "anthropic" else OPENAI_MODEL
+    return f"v{PROMPT_VERSION}:{AI_PROVIDER}:{model}"
+
+
+def _openai_request(text: str) -> dict:
+    return {
+        "model": OPENAI_MODEL,
+        # Automatic prefix caching applies to the identical leading system message
+        "messages": [
+            {"role": "system", "content": EXTRACTION_PROMPT},
+            {"role": "user", "content": "Resume text:\n" + text},
         ],
-        temperature=0.1,
-        max_tokens=4000,
-        response_format={"type": "json_object"},
-    )
-    content = response.choices[0].message.content
-    tokens = response.usage.total_tokens if response.usage else 0
-    logger.info(f"OpenAI extraction: {tokens} tokens used")
-    return json.loads(content), tokens
+        "temperature": 0.1,
+        "max_tokens": 4000,
+        "response_format": {"type": "json_object"},
+    }
 
 
-async def extract_with_anthropic(text: str) -> tuple[dict, int]:
-    response = await _anthropic_client.messages.create(
-        model="claude-haiku-4-5-20251001",
-        max_tokens=4000,
-        messages=[
-            {"role": "user", "content": EXTRACTION_PROMPT + text},
+def _anthropic_request(text: str) -> dict:
+    return {
+        "model": ANTHROPIC_MODEL,
+        "max_tokens": 4000,
+        "system": [
+            {"type": "text", "text": EXTRACTION_PROMPT, "cache_control": {"type": "ephemeral"}},
         ],
-        temperature=0.1,
+        "messages": [
+            {"role": "user", "content": "Resume text:\n" + text},
+        ],
+        "temperature": 0.1,
+    }
+
+
+def _openai_usage(usage) -> TokenUsage:
+    if not usage:
+        return TokenUsage(provider="openai")
+    details = usage.prompt_tokens_details
+    cached = (details.cached_tokens or 0) if details else 0
+    return TokenUsage(
+        provider="openai",
+        input_tokens=usage.prompt_tokens - cached,
+        cached_input_tokens=cached,
+        output_tokens=usage.completion_tokens,
     )
+
+
+def _anthropic_usage(usage) -> TokenUsage:
+    return TokenUsage(
+        provider="anthropic",
+        input_tokens=usage.input_tokens,
+        cached_input_tokens=usage.cache_read_input_tokens or 0,
+        cache_creation_input_tokens=usage.cache_creation_input_tokens or 0,
+        output_tokens=usage.output_tokens,
+    )
+
+
+def _log_usage(label: str, usage: TokenUsage):
+    LLM_TOKENS.labels(provider=usage.provider, kind="input").inc(usage.input_tokens)
+    LLM_TOKENS.labels(provider=usage.provider, kind="cached_input").inc(usage.cached_input_tokens)
+    LLM_TOKENS.labels(provider=usage.provider, kind="cache_write").inc(usage.cache_creation_input_tokens)
+    LLM_TOKENS.labels(provider=usage.provider, kind="output").inc(usage.output_tokens)
+    # Request totals are on the access log line; the breakdown is for debugging
+    logger.debug(
+        f"{label}: {usage.total_tokens} tokens used "
+        f"(input {usage.input_tokens}, cached input {usage.cached_input_tokens}, "
+        f"cache write {usage.cache_creation_input_tokens}, output {usage.output_tokens})"
+    )
+
+
+async def extract_with_openai(text: str) -> tuple[dict, TokenUsage]:
+    response = await _openai_client.chat.completions.create(**_openai_request(text))
+    content = response.choices[0].message.content
+    usage = _openai_usage(response.usage)
+    _log_usage("OpenAI extraction", usage)
+    return json.loads(content), usage
+
+
+async def extract_with_anthropic(text: str) -> tuple[dict, TokenUsage]:
+    response = await _anthropic_client.messages.create(**_anthropic_request(text))
     content = response.content[0].text
-    tokens = response.usage.input_tokens + response.usage.output_tokens
-    logger.info(f"Anthropic extraction: {tokens} tokens used")
+    usage = _anthropic_usage(response.usage)
+    _log_usage("Anthropic extraction", usage)
 
     if content.startswith("```"):
         lines = content.split("\n")
         content = "\n".join(lines[1:-1])
 
-    return json.loads(content), tokens
+    return json.loads(content), usage
+
+
+_EXTRACTORS = {
+    "openai": extract_with_openai,
+    "anthropic": extract_with_anthropic,
+}
+_TIMEOUTS = {
+    "openai": OPENAI_TIMEOUT,
+    "anthropic": ANTHROPIC_TIMEOUT,
+}
+
+
+def _configured_providers() -> list[str]:
+    order = ["anthropic", "openai"] if AI_PROVIDER == "anthropic" else ["openai", "anthropic"]
+    clients = {"openai": _openai_client, "anthropic": _anthropic_client}
+    return [name for name in order if clients[name]]
+
+
+def _provider_order() -> list[str]:
+    """Configured providers, primary first, skipping those with an open circuit."""
+    configured = _configured_providers()
+    available = [name for name in configured if provider_stats[name].is_available()]
+    # With every circuit open, trying anyway beats failing outright
+    return available or configured
+
+
+def _acquire_provider(name: str):
+    """Claim a request to `name` just before sending it, which may be its half-open probe.
+
+    Raises CircuitOpen if another request got the probe first, unless no
+    provider's circuit is letting requests through, as in _provider_order.
+    """
+    if provider_stats[name].try_acquire_probe():
+        return
+    if any(provider_stats[other].is_available() for other in _configured_providers()):
+        raise CircuitOpen(f"{name} circuit is open")
+
+
+async def _call_provider(name: str, text: str) -> tuple[dict, TokenUsage]:
+    stats = provider_stats[name]
+    _acquire_provider(name)
+    started = time.monotonic()
+    try:
+        with LLM_IN_FLIGHT.labels(provider=name).track_inprogress():
+            result = await asyncio.wait_for(_EXTRACTORS[name](text), timeout=_TIMEOUTS[name])
+    except asyncio.TimeoutError:
+        stats.record_failure()
+        raise TimeoutError(f"{name} did not answer within {_TIMEOUTS[name]:g}s")
+    except Exception:
+        stats.record_failure()
+        raise
+    stats.record_success(time.monotonic() - started)
+    return result
+
+
+def _hedge_delay(name: str) -> float:
+    observed = provider_stats[name].latency_percentile(HEDGE_PERCENTILE)
+    return max(HEDGE_MIN_DELAY, observed if observed is not None else HEDGE_DEFAULT_DELAY)
 
 
-async def extract_resume_data(text: str) -> tuple[dict, int]:
-    primary = AI_PROVIDER
+async def extract_resume_data(text: str) -> tuple[dict, TokenUsage]:
+    await _clients_ready()
+    providers = _provider_order()
+    if not providers:
+        raise RuntimeError("All AI providers failed")
+    if HEDGE_ENABLED and len(providers) > 1:
+        return await _extract_hedged(text, providers[0], providers[1])
 
-    # Try primary provider
+    primary, *fallbacks = providers
     try:
-        if primary == "anthropic" and _anthropic_client:
-            return await extract_with_anthropic(text)
-        elif _openai_client:
-            return await extract_with_openai(text)
+        return await _call_provider(primary, text)
     except Exception as e:
         logger.warning(f"Primary provider ({primary}) failed: {e}")
 
-    # Fallback to the other provider
+    for name in fallbacks:
+        try:
+            logger.info(f"Falling back to {name}")
+            LLM_FALLBACKS.labels(provider=name, reason="error").inc()
+            return await _call_provider(name, text)
+        except Exception as e:
+            logger.error(f"Fallback provider ({name}) also failed: {e}")
+
+    raise RuntimeError("All AI providers failed")
+
+
+async def _extract_hedged(text: str, primary: str, secondary: str) -> tuple[dict, TokenUsage]:
+    """Race the secondary against a slow primary and keep the first valid answer.
+
+    The secondary starts once the primary has been running longer than its
+    recent latency percentile, or immediately if the primary fails first.
+    """
+    tasks = {asyncio.create_task(_call_provider(primary, text)): primary}
+    secondary_started = False
     try:
-        if primary == "openai" and _anthropic_client:
-            logger.info("Falling back to Anthropic")
-            return await extract_with_anthropic(text)
-        elif primary == "anthropic" and _openai_client:
-            logger.info("Falling back to OpenAI")
-            return await extract_with_openai(text)
-    except Exception as e:
-        logger.error(f"Fallback provider also failed: {e}")
+        done, _ = await asyncio.wait(tasks, timeout=_hedge_delay(primary))
+        if not done:
+            logger.info(f"{primary} slower than p{HEDGE_PERCENTILE * 100:g}, hedging with {secondary}")
+            LLM_FALLBACKS.labels(provider=secondary, reason="hedge").inc()
+            tasks[asyncio.create_task(_call_provider(secondary, text))] = secondary
+            secondary_started = True
+
+        while tasks:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks.pop(task)
+                if task.exception() is None:
+                    return task.result()
+                logger.warning(f"Provider ({name}) failed: {task.exception()}")
+            if not secondary_started:
+                logger.info(f"Falling back to {secondary}")
+                LLM_FALLBACKS.labels(provider=secondary, reason="error").inc()
+                tasks[asyncio.create_task(_call_provider(secondary, text))] = secondary
+                secondary_started = True
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    raise RuntimeError("All AI providers failed")
+
+
+async def stream_with_openai(text: str) -> AsyncIterator[tuple[str, str | TokenUsage]]:
+    stream = await _openai_client.chat.completions.create(
+        **_openai_request(text), stream=True, stream_options={"include_usage": True}
+    )
+    usage = TokenUsage(provider="openai")
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield "text", chunk.choices[0].delta.content
+        if chunk.usage:
+            usage = _openai_usage(chunk.usage)
+    _log_usage("OpenAI streaming extraction", usage)
+    yield "usage", usage
+
+
+async def stream_with_anthropic(text: str) -> AsyncIterator[tuple[str, str | TokenUsage]]:
+    async with _anthropic_client.messages.stream(**_anthropic_request(text)) as stream:
+        async for chunk in stream.text_stream:
+            yield "text", chunk
+        message = await stream.get_final_message()
+    usage = _anthropic_usage(message.usage)
+    _log_usage("Anthropic streaming extraction", usage)
+    yield "usage", usage
+
+
+async def stream_resume_data(text: str) -> AsyncIterator[tuple[str, str | TokenUsage]]:
+    """Stream the model output as ("text", chunk) items, then ("usage", TokenUsage).
+
+    The fallback provider is only tried if the primary fails before producing
+    any output, since text already sent to the client cannot be taken back.
+    """
+    await _clients_ready()
+    streams = {"openai": stream_with_openai, "anthropic": stream_with_anthropic}
+    for name in _provider_order():
+        started = False
+        began = time.monotonic()
+        try:
+            _acquire_provider(name)
+            async for item in streams[name](text):
+                started = True
+                yield item
+            provider_stats[name].record_success(time.monotonic() - began)
+            return
+        except CircuitOpen as e:
+            logger.info(f"Skipping streaming provider: {e}")
+        except Exception as e:
+            provider_stats[name].record_failure()
+            if started:
+                raise
+            logger.warning(f"Streaming provider ({name}) failed: {e}")
 
     raise RuntimeError("All AI providers failed")
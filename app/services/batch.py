@@ -0,0 +1,52 @@
+import asyncio
+import io
+import logging
+import zipfile
+from contextlib import asynccontextmanager
+
+from app.config import BATCH_MAX_ITEMS, BATCH_MAX_CONCURRENCY, BATCH_PER_KEY_CONCURRENCY, MAX_FILE_SIZE
+
+logger = logging.getLogger(__name__)
+
+_global_semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+_key_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+@asynccontextmanager
+async def llm_slot(api_key: str):
+    """Bound concurrent LLM calls from batches, per API key and per worker."""
+    semaphore = _key_semaphores.get(api_key)
+    if semaphore is None:
+        semaphore = _key_semaphores[api_key] = asyncio.Semaphore(BATCH_PER_KEY_CONCURRENCY)
+    async with semaphore:
+        async with _global_semaphore:
+            yield
+
+
+def expand_zip(zip_bytes: bytes, max_total: int) -> list[tuple[str, bytes]]:
+    """Return (filename, content) for each regular file in a zip archive.
+
+    Raises ValueError once the members inflate to more than `max_total` bytes
+    in all, so a small archive cannot fill the worker's memory.
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(zip_bytes))
+    except zipfile.BadZipFile:
+        raise ValueError("Corrupted zip archive")
+
+    members = []
+    total = 0
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir() or info.filename.startswith("__MACOSX/"):
+                continue
+            if len(members) >= BATCH_MAX_ITEMS:
+                raise ValueError(f"Zip archive contains more than {BATCH_MAX_ITEMS} files")
+            # Never inflate more than the limits allow, whatever the header claims
+            with archive.open(info) as member:
+                data = member.read(min(MAX_FILE_SIZE, max_total - total) + 1)
+            total += len(data)
+            if total > max_total:
+                raise ValueError(f"Zip archive inflates to more than {max_total // (1024 * 1024)}MB")
+            members.append((info.filename, data))
+    return members
@@ -1,29 +1,284 @@
 import io
 import logging
+import re
+from pathlib import Path
+from typing import BinaryIO
 
-from PyPDF2 import PdfReader
-from PyPDF2.errors import PdfReadError
-from docx import Document
+from app.config import DOCX_ENGINE, MAX_INPUT_TOKENS, PDF_ENGINE, PDF_MAX_PAGES, SPLIT_MAX_PAGES
 
 logger = logging.getLogger(__name__)
 
+PDF_TYPE = "application/pdf"
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TXT_TYPE = "text/plain"
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
+# Separates PDF pages in extracted text so later stages can work per page
+PAGE_BREAK = "\f"
+
+# Enough leading bytes to recognise every supported binary format
+SNIFF_BYTES = 8
+
+# Stop reading PDF pages (or DOCX paragraphs) past this much text. Compaction trims anything beyond
+# the token budget anyway; the margin covers the whitespace, headers and
+# footers it strips first.
+PDF_TEXT_TARGET_CHARS = MAX_INPUT_TOKENS * 12
+
+# Parser libraries are imported on first use: with an extraction pool the API
+# process itself never parses a document.
+_pdfium = None
+_pdfium_loaded = False
+
+
+def sniff_content_type(head: bytes) -> str | None:
+    """Detect PDF/DOCX from the first bytes of a file, whatever it claims to be."""
+    if head.startswith(b"%PDF-"):
+        return PDF_TYPE
+    if head.startswith(b"PK\x03\x04"):
+        return DOCX_TYPE
+    return None
+
+
+def _open_source(source: bytes | Path) -> BinaryIO:
+    """Open an in-memory document, or one spooled to disk, as a stream.
+
+    Reading from the file lets the parsers seek through large uploads instead
+    of holding another full copy in memory.
+    """
+    if isinstance(source, Path):
+        return open(source, "rb")
+    return io.BytesIO(source)
+
+
+def _get_pdfium():
+    """Return the pypdfium2 module, or None if it is not installed."""
+    global _pdfium, _pdfium_loaded
+    if not _pdfium_loaded:
+        _pdfium_loaded = True
+        try:
+            import pypdfium2
+            _pdfium = pypdfium2
+        except ImportError:
+            logger.warning("pypdfium2 unavailable, extracting PDF text with PyPDF2")
+    return _pdfium
+
+
+def _pdfium_pages(stream: BinaryIO, first: int, count: int, target_chars: int) -> tuple[list[str], int]:
+    pdfium = _get_pdfium()
+    if pdfium is None:
+        raise RuntimeError("pypdfium2 is not installed")
+
+    pdf = pdfium.PdfDocument(stream)
     try:
-        reader = PdfReader(io.BytesIO(file_bytes))
+        page_count = len(pdf)
+        texts = []
+        for index in range(first, min(first + count, page_count)):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            texts.append(textpage.get_text_bounded().replace("\r\n", "\n"))
+            textpage.close()
+            page.close()
+            if target_chars and sum(len(text) for text in texts) >= target_chars:
+                break
+    finally:
+        pdf.close()
+    return texts, page_count
+
+
+def _pypdf2_pages(stream: BinaryIO, first: int, count: int, target_chars: int) -> tuple[list[str], int]:
+    from PyPDF2 import PdfReader
+    from PyPDF2.errors import PdfReadError
+
+    try:
+        reader = PdfReader(stream)
+        page_count = len(reader.pages)
     except PdfReadError:
         raise ValueError("Corrupted or encrypted PDF file")
 
-    text_parts = []
-    for page in reader.pages:
-        text = page.extract_text()
-        if text:
-            text_parts.append(text)
-    return "\n".join(text_parts)
+    texts = []
+    for index in range(first, min(first + count, page_count)):
+        texts.append(reader.pages[index].extract_text() or "")
+        if target_chars and sum(len(text) for text in texts) >= target_chars:
+            break
+    return texts, page_count
+
+
+_PDF_ENGINES = {"pdfium": _pdfium_pages, "pypdf2": _pypdf2_pages}
+
+
+def extract_pdf_pages(
+    source: bytes | Path, first: int = 0, count: int | None = None, target_chars: int = PDF_TEXT_TARGET_CHARS
+) -> tuple[list[str], int]:
+    """Extract the text of up to `count` pages starting at `first`.
+
+    Returns the page texts and the document's total page count. Stops early
+    once `target_chars` have been gathered (0 reads every page). PyPDF2 takes
+    over when the configured engine cannot read the file.
+    """
+    if count is None:
+        count = PDF_MAX_PAGES or 1 << 30
+    engine = _PDF_ENGINES.get(PDF_ENGINE, _pypdf2_pages)
+    with _open_source(source) as stream:
+        if engine is not _pypdf2_pages:
+            try:
+                return engine(stream, first, count, target_chars)
+            except Exception as e:
+                logger.warning(f"{PDF_ENGINE} could not read PDF ({e}), falling back to PyPDF2")
+                stream.seek(0)
+        return _pypdf2_pages(stream, first, count, target_chars)
+
+
+def preload_parsers():
+    """Import the parser libraries now, e.g. before forking workers that share them."""
+    import docx  # noqa: F401
+    import PyPDF2  # noqa: F401
+
+    if PDF_ENGINE == "pdfium":
+        _get_pdfium()
+
+
+def join_pdf_pages(texts: list[str]) -> str:
+    # Form feeds inside a page would be mistaken for page boundaries later on
+    return f"\n{PAGE_BREAK}\n".join(
+        text.replace(PAGE_BREAK, "\n") for text in texts if text.strip()
+    )
 
 
-def extract_text_from_docx(file_bytes: bytes) -> str:
-    doc = Document(io.BytesIO(file_bytes))
+def pdf_page_texts(source: bytes | Path, whole_document: bool = False) -> list[str]:
+    """Extract a PDF's text page by page, from the first page on.
+
+    Only the start of a resume is read by default. `whole_document` reads up to
+    SPLIT_MAX_PAGES regardless of length, for documents holding many resumes.
+    """
+    max_pages = SPLIT_MAX_PAGES if whole_document else PDF_MAX_PAGES
+    texts, page_count = extract_pdf_pages(
+        source, 0, max_pages or 1 << 30, 0 if whole_document else PDF_TEXT_TARGET_CHARS
+    )
+    if max_pages and page_count > max_pages:
+        logger.info(f"PDF has {page_count} pages, extracted the first {max_pages}")
+    return texts
+
+
+def extract_text_from_pdf(source: bytes | Path, whole_document: bool = False) -> str:
+    """Extract a PDF's text with pages separated by PAGE_BREAK."""
+    return join_pdf_pages(pdf_page_texts(source, whole_document))
+
+
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_MC_NS = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+_W = f"{{{_W_NS}}}"
+_DOCX_BODY = "word/document.xml"
+_DOCX_PART_RE = re.compile(r"word/(header|footer)(\d*)\.xml")
+_DOCX_BREAKS = {_W + "tab": "\t", _W + "br": "\n", _W + "cr": "\n"}
+_docx_xpaths = {}
+
+
+def _docx_xpath() -> dict:
+    """Compiled XPath queries for paragraphs that anchor text boxes, built on first use."""
+    if not _docx_xpaths:
+        from lxml import etree
+
+        namespaces = {"w": _W_NS, "mc": _MC_NS}
+        # Text boxes' paragraphs, without the VML copy Word keeps for older readers
+        _docx_xpaths["box_paragraphs"] = etree.XPath(
+            ".//w:txbxContent[not(ancestor::mc:Fallback)]//w:p", namespaces=namespaces
+        )
+        # The anchor's own text: nodes whose nearest paragraph is $p
+        _docx_xpaths["own_text"] = etree.XPath(
+            "(.//w:t | .//w:r/w:tab | .//w:br | .//w:cr)[count(ancestor::w:p[1] | $p) = 1]", namespaces=namespaces
+        )
+    return _docx_xpaths
+
+
+def _docx_parts(names: set[str]) -> list[str]:
+    """Headers, then the body, then footers, each kind in part number order."""
+    def numbered(kind: str) -> list[str]:
+        parts = [
+            (int(match.group(2) or 0), name)
+            for name in names
+            if (match := _DOCX_PART_RE.fullmatch(name)) and match.group(1) == kind
+        ]
+        return [name for _, name in sorted(parts)]
+
+    return numbered("header") + [_DOCX_BODY] + numbered("footer")
+
+
+def _paragraph_text(paragraph) -> str | None:
+    """The paragraph's text, or None when it anchors a text box (see _xml_paragraphs)."""
+    parts = []
+    for node in paragraph.iter(_W + "t", _W + "txbxContent", *_DOCX_BREAKS):
+        tag = node.tag
+        if tag == _W + "t":
+            parts.append(node.text or "")
+        elif tag == _W + "txbxContent":
+            return None
+        elif tag != _W + "tab" or node.getparent().tag == _W + "r":
+            # w:tab outside a run is a tab stop in the paragraph properties
+            parts.append(_DOCX_BREAKS[tag])
+    return "".join(parts).strip()
+
+
+def _xml_paragraphs(part: BinaryIO):
+    """Yield the text of each non-empty paragraph of a WordprocessingML part, in document order.
+
+    Paragraphs in tables and text boxes are included; a text box's paragraphs
+    come before the paragraph anchoring it. The VML copy Word keeps of each
+    text box for older readers (mc:Fallback) is skipped.
+    """
+    from lxml import etree
+
+    # Only paragraph ends reach Python; each outermost paragraph is read and then freed
+    for _, elem in etree.iterparse(part, tag=_W + "p", resolve_entities=False, no_network=True):
+        if elem.getparent().tag != _W + "body" and next(elem.iterancestors(_W + "p"), None) is not None:
+            continue  # in a text box, read with the paragraph anchoring it
+        texts = [_paragraph_text(elem)]
+        if texts[0] is None:
+            # Rare enough for XPath: the text boxes' paragraphs, then the anchor's own runs
+            xpath = _docx_xpath()
+            texts = [_paragraph_text(box) or "" for box in xpath["box_paragraphs"](elem)]
+            texts.append(
+                "".join(
+                    node.text or "" if node.tag == _W + "t" else _DOCX_BREAKS[node.tag]
+                    for node in xpath["own_text"](elem, p=elem)
+                ).strip()
+            )
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+        yield from filter(None, texts)
+
+
+def _xml_docx_text(stream: BinaryIO, target_chars: int) -> str:
+    """Stream the paragraphs of the headers, body and footers without building a document model."""
+    import zipfile
+
+    lines = []
+    chars = 0
+    repeated = set()
+    with zipfile.ZipFile(stream) as archive:
+        names = set(archive.namelist())
+        if _DOCX_BODY not in names:
+            raise ValueError("Not a Word document")
+        for name in _docx_parts(names):
+            with archive.open(name) as part:
+                texts = _xml_paragraphs(part)
+                if name != _DOCX_BODY:
+                    # Sections often repeat one header for first, odd and even pages
+                    texts = tuple(texts)
+                    if texts in repeated:
+                        continue
+                    repeated.add(texts)
+                for text in texts:
+                    lines.append(text)
+                    chars += len(text) + 1
+                    if target_chars and chars >= target_chars:
+                        return "\n".join(lines)
+    return "\n".join(lines)
+
+
+def _python_docx_text(stream: BinaryIO, target_chars: int) -> str:
+    from docx import Document
+
+    doc = Document(stream)
     text_parts = []
     for paragraph in doc.paragraphs:
         if paragraph.text.strip():
@@ -31,12 +286,35 @@ def extract_text_from_docx(file_bytes: bytes) -> str:
     return "\n".join(text_parts)
 
 
-def extract_text(file_bytes: bytes, content_type: str) -> str:
-    if content_type == "application/pdf":
-        text = extract_text_from_pdf(file_bytes)
-    elif content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        text = extract_text_from_docx(file_bytes)
-    elif content_type == "text/plain":
+_DOCX_ENGINES = {"xml": _xml_docx_text, "python-docx": _python_docx_text}
+
+
+def extract_text_from_docx(source: bytes | Path, whole_document: bool = False) -> str:
+    """Extract a DOCX's text, one paragraph per line.
+
+    Stops once PDF_TEXT_TARGET_CHARS have been read, unless `whole_document`.
+    python-docx takes over when the configured engine cannot read the file.
+    """
+    target_chars = 0 if whole_document else PDF_TEXT_TARGET_CHARS
+    engine = _DOCX_ENGINES.get(DOCX_ENGINE, _python_docx_text)
+    with _open_source(source) as stream:
+        if engine is not _python_docx_text:
+            try:
+                return engine(stream, target_chars)
+            except Exception as e:
+                logger.warning(f"{DOCX_ENGINE} could not read DOCX ({e}), falling back to python-docx")
+                stream.seek(0)
+        return _python_docx_text(stream, target_chars)
+
+
+def extract_text(source: bytes | Path, content_type: str, whole_document: bool = False) -> str:
+    """Extract text from file contents, or from the path of a spooled upload."""
+    if content_type == PDF_TYPE:
+        text = extract_text_from_pdf(source, whole_document)
+    elif content_type == DOCX_TYPE:
+        text = extract_text_from_docx(source, whole_document)
+    elif content_type == TXT_TYPE:
+        file_bytes = source.read_bytes() if isinstance(source, Path) else source
         text = file_bytes.decode("utf-8", errors="replace")
     else:
         raise ValueError(f"Unsupported content type: {content_type}")
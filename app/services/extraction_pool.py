@@ -0,0 +1,188 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from app.config import (
+    EXTRACTION_WORKERS,
+    EXTRACTION_TIMEOUT,
+    EXTRACTION_MAX_QUEUE,
+    EXTRACTION_MAX_TASKS_PER_CHILD,
+    PDF_MAX_PAGES,
+    PDF_PAGES_PER_TASK,
+    SPLIT_MAX_PAGES,
+)
+from app.metrics import stage_timer
+from app.services.document_parser import (
+    PDF_TYPE,
+    PDF_TEXT_TARGET_CHARS,
+    extract_text,
+    extract_pdf_pages,
+    join_pdf_pages,
+    pdf_page_texts,
+)
+from app.services.ocr import ocr_sparse_pages
+
+logger = logging.getLogger(__name__)
+
+_pool: ProcessPoolExecutor | None = None
+_pending = 0
+
+
+class ExtractionQueueFull(Exception):
+    pass
+
+
+def _create_pool() -> ProcessPoolExecutor:
+    # Workers are replaced after N documents so fragmentation from large PDFs
+    # does not accumulate in long-lived processes.
+    return ProcessPoolExecutor(
+        max_workers=EXTRACTION_WORKERS,
+        max_tasks_per_child=EXTRACTION_MAX_TASKS_PER_CHILD or None,
+    )
+
+
+def init_extraction_pool():
+    global _pool
+    if EXTRACTION_WORKERS <= 0:
+        logger.info("Extraction pool disabled, extracting text inline")
+        return
+    _pool = _create_pool()
+    logger.info(f"Extraction pool started with {EXTRACTION_WORKERS} workers")
+
+
+def shutdown_extraction_pool():
+    global _pool
+    if _pool:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        logger.info("Extraction pool stopped")
+
+
+def _task_done(pool: ProcessPoolExecutor, future: asyncio.Future):
+    global _pending
+    # Tasks of a retired pool no longer count against the queue
+    if pool is _pool:
+        _pending -= 1
+    if not future.cancelled():
+        future.exception()  # retrieved, as nobody may be awaiting a timed out task
+
+
+def _kill_workers(processes: list):
+    for process in processes:
+        if process.is_alive():
+            logger.warning(f"Killing extraction worker {process.pid}")
+            process.kill()
+
+
+def _replace_pool(grace: float = 0):
+    """Retire the pool and start a fresh one with an empty queue.
+
+    The old pool finishes what it can within `grace` seconds, then its
+    remaining workers are killed: a document that hangs its worker would
+    otherwise hold it, and its queue slot, forever.
+    """
+    global _pool, _pending
+    old, _pool, _pending = _pool, _create_pool(), 0
+    # Snapshot first: shutdown() drops the executor's reference to its processes
+    processes = list((old._processes or {}).values())
+    old.shutdown(wait=False)
+    asyncio.get_running_loop().call_later(grace, _kill_workers, processes)
+
+
+async def extract_text_async(source: bytes | Path, content_type: str, whole_document: bool = False) -> str:
+    """Run extract_text without blocking the event loop.
+
+    Plain text is decoded inline since it is cheap. PDF/DOCX go to the process
+    pool; a task that times out retires the pool (see _replace_pool), so a
+    document that hangs its worker cannot hold a queue slot forever.
+    Pass the path of a spooled upload rather than its bytes so only the path
+    is sent to the worker process. PDF pages without embedded text are then
+    OCRed, outside the extraction stage and its pool.
+    """
+    with stage_timer("extract_text", content_type) as stage:
+        if content_type == "text/plain" or _pool is None:
+            if content_type != PDF_TYPE:
+                return extract_text(source, content_type, whole_document)
+            texts = pdf_page_texts(source, whole_document)
+        elif _pending >= EXTRACTION_MAX_QUEUE:
+            stage["outcome"] = "rejected"
+            raise ExtractionQueueFull()
+        elif content_type != PDF_TYPE:
+            return await _extract_in_pool(_submit(extract_text, source, content_type, whole_document), content_type)
+        else:
+            texts = await _extract_in_pool(_extract_pdf(source, whole_document), content_type)
+    text = join_pdf_pages(await ocr_sparse_pages(source, texts))
+    logger.info(f"Extracted {len(text)} chars from {content_type}")
+    return text
+
+
+def _submit(fn, *args) -> asyncio.Future:
+    """Queue a call on the pool; it counts against the queue until it finishes."""
+    global _pending
+
+    loop = asyncio.get_running_loop()
+    try:
+        future = loop.run_in_executor(_pool, fn, *args)
+    except BrokenProcessPool:
+        logger.error("Extraction pool is broken, restarting it")
+        _replace_pool()
+        future = loop.run_in_executor(_pool, fn, *args)
+
+    _pending += 1
+    future.add_done_callback(functools.partial(_task_done, _pool))
+    # Shielded so a timed out request leaves the task to its pool, which kills
+    # it if it is still running once the grace period is over
+    return asyncio.shield(future)
+
+
+async def _extract_pdf(source: bytes | Path, whole_document: bool) -> list[str]:
+    """Extract a PDF's page texts, spreading a spooled file's page ranges across the pool.
+
+    The first range also reports the page count; the remaining ranges up to
+    PDF_MAX_PAGES only run if the first did not already yield enough text.
+    A `whole_document` is read up to SPLIT_MAX_PAGES, however long it is.
+    In-memory PDFs are read by a single task: each range would otherwise ship
+    a full copy of the document to its worker.
+    """
+    if not isinstance(source, Path) or PDF_PAGES_PER_TASK <= 0:
+        return await _submit(pdf_page_texts, source, whole_document)
+
+    max_pages = SPLIT_MAX_PAGES if whole_document else PDF_MAX_PAGES
+    target_chars = 0 if whole_document else PDF_TEXT_TARGET_CHARS
+    per_task = min(PDF_PAGES_PER_TASK, max_pages) if max_pages else PDF_PAGES_PER_TASK
+    texts, page_count = await _submit(extract_pdf_pages, source, 0, per_task, target_chars)
+    last_page = min(page_count, max_pages) if max_pages else page_count
+    enough = target_chars and sum(len(text) for text in texts) >= target_chars
+    if not enough and last_page > per_task:
+        ranges = await asyncio.gather(*(
+            _submit(extract_pdf_pages, source, first, min(per_task, last_page - first), target_chars)
+            for first in range(per_task, last_page, per_task)
+        ))
+        for range_texts, _ in ranges:
+            texts.extend(range_texts)
+    if page_count > last_page:
+        logger.info(f"PDF has {page_count} pages, extracted the first {last_page}")
+    return texts
+
+
+async def _extract_in_pool(extraction, content_type: str):
+    # The pool this extraction's tasks are submitted to
+    pool = _pool
+    try:
+        return await asyncio.wait_for(extraction, timeout=EXTRACTION_TIMEOUT)
+    except asyncio.TimeoutError:
+        # The worker may be stuck for good: new work goes to a fresh pool, and
+        # other documents on the old one get EXTRACTION_TIMEOUT to finish.
+        # Requests timing out together on one pool retire it only once.
+        logger.warning(f"Text extraction timed out after {EXTRACTION_TIMEOUT}s ({content_type})")
+        if _pool is pool:
+            _replace_pool(grace=EXTRACTION_TIMEOUT)
+        raise TimeoutError(f"Text extraction timed out after {EXTRACTION_TIMEOUT:g}s")
+    except BrokenProcessPool:
+        logger.error("Extraction worker crashed, restarting pool")
+        if getattr(_pool, "_broken", False):  # not already replaced by another request
+            _replace_pool()
+        raise ValueError("Document could not be processed")
@@ -0,0 +1,321 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import socket
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, urlunsplit
+
+from app.config import (
+    API_KEYS,
+    JOB_TTL,
+    JOB_STREAM_MAXLEN,
+    JOB_WORKER_CONCURRENCY,
+    JOB_CLAIM_IDLE_MS,
+    JOB_MAX_ATTEMPTS,
+    WEBHOOK_TIMEOUT,
+    WEBHOOK_SECRET,
+)
+from app.middleware import auth
+from app.models.schemas import ParseResponse
+from app.services.admission import Overloaded
+from app.services.extraction_pool import extract_text_async
+from app.services.pipeline import parse_text
+
+logger = logging.getLogger(__name__)
+
+JOB_STREAM = "jobs:stream"
+JOB_GROUP = "parsers"
+WEBHOOK_ATTEMPTS = 3
+# Worker loop backoff after a Redis error, doubling up to the maximum
+READ_BACKOFF = 1.0
+READ_BACKOFF_MAX = 30.0
+
+
+class QueueUnavailable(Exception):
+    pass
+
+
+class WebhookRejected(ValueError):
+    pass
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def _payload_key(job_id: str) -> str:
+    return f"job:{job_id}:payload"
+
+
+async def enqueue_job(
+    api_key: str,
+    *,
+    text: str | None = None,
+    file_bytes: bytes | None = None,
+    content_type: str = "text/plain",
+    filename: str | None = None,
+    webhook_url: str | None = None,
+) -> dict:
+    """Store the job and its payload, then append it to the Redis stream."""
+    if not auth._redis:
+        raise QueueUnavailable()
+
+    job_id = uuid.uuid4().hex
+    job = {
+        "status": "queued",
+        "api_key": api_key,
+        "source": "text" if file_bytes is None else "file",
+        "content_type": content_type,
+        "created_at": _now(),
+    }
+    if filename:
+        job["filename"] = filename
+    if webhook_url:
+        job["webhook_url"] = webhook_url
+
+    # The client decodes responses as str, so binary uploads travel as base64
+    payload = text if file_bytes is None else base64.b64encode(file_bytes).decode("ascii")
+
+    async with auth._redis.pipeline(transaction=True) as pipe:
+        pipe.hset(_job_key(job_id), mapping=job)
+        pipe.expire(_job_key(job_id), JOB_TTL)
+        pipe.set(_payload_key(job_id), payload, ex=JOB_TTL)
+        pipe.xadd(JOB_STREAM, {"job_id": job_id}, maxlen=JOB_STREAM_MAXLEN, approximate=True)
+        await pipe.execute()
+
+    logger.info(f"Queued job {job_id} ({content_type})")
+    return {"job_id": job_id, **job}
+
+
+async def get_job(job_id: str, api_key: str) -> dict | None:
+    if not auth._redis:
+        raise QueueUnavailable()
+
+    job = await auth._redis.hgetall(_job_key(job_id))
+    if not job or job.get("api_key") != api_key:
+        return None
+    job["job_id"] = job_id
+    if "result" in job:
+        job["result"] = json.loads(job["result"])
+    return job
+
+
+async def process_job(job_id: str):
+    job = await auth._redis.hgetall(_job_key(job_id))
+    if not job:
+        logger.warning(f"Job {job_id} expired before it was processed")
+        return
+    if job["status"] in ("done", "failed"):
+        return
+    if int(job.get("attempts", 0)) >= JOB_MAX_ATTEMPTS:
+        # Every earlier attempt crashed, possibly taking its worker down with it
+        await _fail_job(job_id, job)
+        return
+
+    async with auth._redis.pipeline(transaction=True) as pipe:
+        pipe.hset(_job_key(job_id), mapping={"status": "processing", "started_at": _now()})
+        pipe.hincrby(_job_key(job_id), "attempts", 1)
+        await pipe.execute()
+
+    payload = await auth._redis.get(_payload_key(job_id))
+    content_type = job["content_type"]
+    tier = API_KEYS.get(job["api_key"], "free")
+    try:
+        if payload is None:
+            result = ParseResponse(success=False, error="Job payload expired.")
+        elif job["source"] == "text":
+            result = await parse_text(payload, tier=tier, api_key=job["api_key"])
+        else:
+            result = await _parse_document(base64.b64decode(payload), content_type, tier, job["api_key"])
+    except Overloaded:
+        # Back in the queue; the stream entry stays pending until reclaimed.
+        # Not the job's fault, so not counted as an attempt.
+        async with auth._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(_job_key(job_id), "status", "queued")
+            pipe.hincrby(_job_key(job_id), "attempts", -1)
+            await pipe.execute()
+        raise
+    await _finish_job(job_id, job, result)
+
+
+async def _fail_job(job_id: str, job: dict):
+    logger.error(f"Job {job_id} failed {JOB_MAX_ATTEMPTS} times, giving up")
+    error = f"Job could not be processed after {JOB_MAX_ATTEMPTS} attempts."
+    await _finish_job(job_id, job, ParseResponse(success=False, error=error))
+
+
+async def _finish_job(job_id: str, job: dict, result: ParseResponse):
+    status = "done" if result.success else "failed"
+    async with auth._redis.pipeline(transaction=True) as pipe:
+        pipe.hset(
+            _job_key(job_id),
+            mapping={"status": status, "finished_at": _now(), "result": result.model_dump_json()},
+        )
+        pipe.delete(_payload_key(job_id))
+        await pipe.execute()
+    logger.info(f"Job {job_id} {status}")
+
+    if job.get("webhook_url"):
+        await deliver_webhook(job["webhook_url"], job_id, status, result)
+
+
+async def _parse_document(file_bytes: bytes, content_type: str, tier: str, api_key: str) -> ParseResponse:
+    try:
+        raw_text = await extract_text_async(file_bytes, content_type)
+    except Exception as e:
+        logger.exception("Failed to extract text from job payload")
+        return ParseResponse(success=False, error=f"Failed to extract text: {str(e)}")
+
+    if not raw_text.strip():
+        return ParseResponse(success=False, error="No text could be extracted from the file.")
+    return await parse_text(raw_text, content_type, tier=tier, api_key=api_key)
+
+
+async def resolve_webhook(url: str) -> tuple[str, str]:
+    """Resolve a webhook URL to the same URL addressed by IP, plus its Host header.
+
+    Raises WebhookRejected unless the URL is http(s) and every address its
+    host resolves to is public: loopback, private, link-local (cloud metadata)
+    and reserved ranges are refused so webhooks cannot reach internal services.
+    Connecting to the checked IP keeps DNS from changing the answer afterwards.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise WebhookRejected("webhook_url must be an http(s) URL.")
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError:
+        raise WebhookRejected("webhook_url has an invalid port.")
+
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+    except OSError:
+        raise WebhookRejected("webhook_url host could not be resolved.")
+    addresses = [info[4][0] for info in infos]
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%")[0])
+        if not ip.is_global or ip.is_multicast:
+            raise WebhookRejected("webhook_url must point to a public address.")
+
+    host = f"[{addresses[0]}]" if ":" in addresses[0] else addresses[0]
+    host_header = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+    netloc = host if parts.port is None else f"{host}:{parts.port}"
+    return urlunsplit(parts._replace(netloc=netloc)), host_header
+
+
+async def deliver_webhook(url: str, job_id: str, status: str, result: ParseResponse):
+    import httpx
+
+    try:
+        target, host = await resolve_webhook(url)
+    except WebhookRejected as e:
+        logger.error(f"Not delivering webhook for job {job_id}: {e}")
+        return
+
+    body = json.dumps({"job_id": job_id, "status": status, "result": result.model_dump()}).encode("utf-8")
+    headers = {"Content-Type": "application/json", "Host": host}
+    if WEBHOOK_SECRET:
+        signature = hmac.new(WEBHOOK_SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+        headers["X-Webhook-Signature"] = f"sha256={signature}"
+
+    # TLS is still verified against the host name; redirects could lead anywhere
+    extensions = {"sni_hostname": urlsplit(url).hostname}
+    async with httpx.AsyncClient(timeout=WEBHOOK_TIMEOUT, follow_redirects=False) as client:
+        for attempt in range(1, WEBHOOK_ATTEMPTS + 1):
+            try:
+                response = await client.post(target, content=body, headers=headers, extensions=extensions)
+                if response.is_redirect:
+                    logger.warning(f"Webhook for job {job_id} redirected, not following it")
+                if response.status_code < 500:
+                    return
+                logger.warning(f"Webhook for job {job_id} returned {response.status_code}")
+            except httpx.HTTPError as e:
+                logger.warning(f"Webhook for job {job_id} failed: {e}")
+            if attempt < WEBHOOK_ATTEMPTS:
+                await asyncio.sleep(2**attempt)
+    logger.error(f"Giving up on webhook for job {job_id}")
+
+
+async def _ensure_group():
+    try:
+        await auth._redis.xgroup_create(JOB_STREAM, JOB_GROUP, id="0", mkstream=True)
+    except Exception as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def _handle_entry(entry_id: str, fields: dict):
+    job_id = fields.get("job_id")
+    try:
+        await process_job(job_id)
+    except Overloaded:
+        logger.warning(f"Job {job_id} deferred, LLM capacity exhausted")
+        return
+    except Exception:
+        logger.exception(f"Job {job_id} crashed")
+        try:
+            job = await auth._redis.hgetall(_job_key(job_id))
+            if job and int(job.get("attempts", 0)) < JOB_MAX_ATTEMPTS:
+                # Left unacknowledged so a consumer reclaims it for another attempt
+                return
+            if job:
+                await _fail_job(job_id, job)
+        except Exception:
+            logger.exception(f"Could not record the failure of job {job_id}")
+            return
+    try:
+        await auth._redis.xack(JOB_STREAM, JOB_GROUP, entry_id)
+    except Exception:
+        logger.exception(f"Could not acknowledge job {job_id}")
+
+
+async def run_worker(consumer: str, stop: asyncio.Event):
+    """Consume the job stream until `stop` is set."""
+    await _ensure_group()
+    tasks: set[asyncio.Task] = set()
+    backoff = READ_BACKOFF
+    logger.info(f"Job worker {consumer} started")
+
+    while not stop.is_set():
+        free = JOB_WORKER_CONCURRENCY - len(tasks)
+        if free <= 0:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            continue
+
+        try:
+            # Pick up jobs abandoned by crashed consumers before reading new ones
+            _, entries, _ = await auth._redis.xautoclaim(
+                JOB_STREAM, JOB_GROUP, consumer, min_idle_time=JOB_CLAIM_IDLE_MS, count=free
+            )
+            if not entries:
+                response = await auth._redis.xreadgroup(
+                    JOB_GROUP, consumer, {JOB_STREAM: ">"}, count=free, block=2000
+                )
+                entries = response[0][1] if response else []
+        except Exception as e:
+            logger.error(f"Redis error while reading jobs ({e}), retrying in {backoff:g}s")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, READ_BACKOFF_MAX)
+            continue
+        backoff = READ_BACKOFF
+
+        for entry_id, fields in entries:
+            task = asyncio.create_task(_handle_entry(entry_id, fields))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    logger.info(f"Job worker {consumer} stopped")
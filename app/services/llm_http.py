@@ -0,0 +1,107 @@
+import importlib.util
+import logging
+
+import httpx
+
+from app.config import (
+    OPENAI_TIMEOUT,
+    ANTHROPIC_TIMEOUT,
+    LLM_POOL_MAX_CONNECTIONS,
+    LLM_POOL_MAX_KEEPALIVE,
+    LLM_KEEPALIVE_EXPIRY,
+    LLM_POOL_TIMEOUT,
+    LLM_CONNECT_TIMEOUT,
+    LLM_HTTP2,
+)
+from app.metrics import LLM_HTTP_ACTIVE, LLM_HTTP_POOL_SIZE, LLM_HTTP_CONNECTIONS_OPENED, LLM_HTTP_POOL_TIMEOUTS
+from app.services.admission import rate_limit_hook
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetricsTransport(httpx.AsyncBaseTransport):
+    """Count requests holding a pooled connection, new connections and pool timeouts.
+
+    A request holds its connection until the response body is closed, which
+    for streamed completions is long after the headers arrive.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        parent_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: dict):
+            if event_name == "connection.connect_tcp.complete":
+                LLM_HTTP_CONNECTIONS_OPENED.labels(host=host).inc()
+            if parent_trace is not None:
+                await parent_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        LLM_HTTP_ACTIVE.inc()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.PoolTimeout:
+            LLM_HTTP_ACTIVE.dec()
+            LLM_HTTP_POOL_TIMEOUTS.inc()
+            raise
+        except BaseException:
+            LLM_HTTP_ACTIVE.dec()
+            raise
+        response.stream = _ReleasingStream(response.stream)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream):
+        self._stream = stream
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                LLM_HTTP_ACTIVE.dec()
+
+
+def provider_timeout(seconds: float) -> httpx.Timeout:
+    """Read/write timeout of `seconds`, with short connect and pool timeouts."""
+    return httpx.Timeout(seconds, connect=LLM_CONNECT_TIMEOUT, pool=LLM_POOL_TIMEOUT)
+
+
+def create_llm_http_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    """Build the keep-alive client shared by the OpenAI and Anthropic SDKs.
+
+    Connections are reused across requests and providers' hosts, so TLS
+    handshakes stay off the hot path. Provider rate-limit headers feed the
+    admission controller.
+    """
+    if transport is None:
+        http2 = LLM_HTTP2 and importlib.util.find_spec("h2") is not None
+        if LLM_HTTP2 and not http2:
+            logger.warning("LLM_HTTP2 is set but the h2 package is not installed, using HTTP/1.1")
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=LLM_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+            ),
+            http2=http2,
+        )
+    LLM_HTTP_POOL_SIZE.set(LLM_POOL_MAX_CONNECTIONS)
+    return httpx.AsyncClient(
+        transport=PoolMetricsTransport(transport),
+        timeout=provider_timeout(max(OPENAI_TIMEOUT, ANTHROPIC_TIMEOUT)),
+        event_hooks={"response": [rate_limit_hook]},
+    )
@@ -0,0 +1,195 @@
+import re
+
+from app.models.schemas import ContactInfo, ParsedResume
+from app.services.text_compactor import MAX_INPUT_CHARS, is_section_heading, split_sections
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"(?<![\w+])\+?\d[\d ().-]{6,}\d(?!\w)")
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:[\w-]+\.)?linkedin\.com/(?:in|pub)/[\w%-]+/?", re.IGNORECASE)
+GITHUB_RE = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[\w-]+/?", re.IGNORECASE)
+URL_RE = re.compile(
+    r"(?:https?://|www\.)[\w-]+(?:\.[\w-]+)+(?:/[^\s|,;]*)?"
+    r"|\b[\w-]+\.(?:com|dev|io|me|net|org|site|tech)(?:/[^\s|,;]*)?\b",
+    re.IGNORECASE,
+)
+_NAME_RE = re.compile(r"^[^\W\d_]+(?:[ '.-][^\W\d_]+\.?){1,3}$")
+_LEFTOVER_RE = re.compile(r"^[\s|,;•·/–-]*$")
+_SKILL_SPLIT_RE = re.compile(r"\s*[,;|•·]\s*|\s{2,}")
+_BULLET_RE = re.compile(r"^[-*•·▪●◦]\s*")
+
+# Canonical section names for headings, matched by keyword
+_SECTION_KEYWORDS = (
+    ("experience", ("experience", "employment", "work history")),
+    ("education", ("education", "academic")),
+    ("skills", ("skill", "competenc")),
+    ("certifications", ("certif", "licens", "courses", "training")),
+    ("languages", ("language",)),
+    ("summary", ("summary", "profile", "about me", "objective")),
+    ("unused", ("reference", "interest", "hobbies")),
+)
+
+# Phone numbers shorter than this are more likely dates or IDs
+_MIN_PHONE_DIGITS = 7
+# A year, with an optional day and month before it or a month after it
+_DATE = r"(?:\d{1,2}[./-]){0,2}(?:19|20)\d\d|(?:19|20)\d\d[./-]\d{1,2}"
+# Dates and date ranges such as "2019 - 2023", "01.2019 - 03.2021" or "12.05.19"
+_DATE_RANGE_RE = re.compile(rf"^(?:{_DATE})(?:\D+(?:{_DATE}))?$|^\d{{1,2}}[./-]\d{{1,2}}[./-]\d{{2}}$")
+# An unformatted run of digits is more likely an ID than a phone number
+_BARE_DIGITS_RE = re.compile(r"^\d+$")
+
+
+def section_name(heading: str) -> str:
+    heading = heading.lower()
+    for name, keywords in _SECTION_KEYWORDS:
+        if any(keyword in heading for keyword in keywords):
+            return name
+    return "other"
+
+
+def find_sections(text: str) -> list[tuple[str, list[str]]]:
+    """Split text into (section name, lines) pairs.
+
+    Lines before the first heading come back as the "header" section, which is
+    where contact details live.
+    """
+    lines = [line.strip() for line in text[:MAX_INPUT_CHARS].splitlines()]
+    sections = []
+    for section in split_sections(lines):
+        first = section[0]
+        if is_section_heading(first):
+            sections.append((section_name(first), section))
+        else:
+            sections.append(("header", section))
+    return sections
+
+
+def _first_match(pattern: re.Pattern, text: str) -> str | None:
+    match = pattern.search(text)
+    return match.group(0).rstrip("/.") if match else None
+
+
+def _is_phone(candidate: str) -> bool:
+    candidate = candidate.strip()
+    digits = re.sub(r"\D", "", candidate)
+    return (
+        len(digits) >= _MIN_PHONE_DIGITS
+        and not _DATE_RANGE_RE.match(candidate)
+        and not _BARE_DIGITS_RE.match(candidate)
+    )
+
+
+def find_phone(text: str) -> str | None:
+    return next((m.group(0).strip() for m in PHONE_RE.finditer(text) if _is_phone(m.group(0))), None)
+
+
+def _find_website(text: str) -> str | None:
+    for match in URL_RE.finditer(text):
+        url = match.group(0).rstrip("/.")
+        # Skip profile links and the domain part of email addresses
+        if LINKEDIN_RE.match(url) or GITHUB_RE.match(url) or text[match.start() - 1:match.start()] == "@":
+            continue
+        return url
+    return None
+
+
+def find_name(header: list[str]) -> str | None:
+    for line in header[:3]:
+        if line and _NAME_RE.match(line) and not is_section_heading(line):
+            return line
+    return None
+
+
+def extract_contact(sections: list[tuple[str, list[str]]]) -> ContactInfo:
+    """Fill the pattern-matchable contact fields, preferring the header.
+
+    Phone numbers are only looked for in the header: further down, digit runs
+    are mostly dates and IDs.
+    """
+    header = next((lines for name, lines in sections if name == "header"), [])
+    header_text = "\n".join(header)
+    full_text = "\n".join(line for _, lines in sections for line in lines)
+    searched = header_text or full_text
+    return ContactInfo(
+        name=find_name(header),
+        email=_first_match(EMAIL_RE, searched) or _first_match(EMAIL_RE, full_text),
+        phone=find_phone(header_text),
+        linkedin=_first_match(LINKEDIN_RE, full_text),
+        github=_first_match(GITHUB_RE, full_text),
+        website=_find_website(searched),
+    )
+
+
+def extract_skills(sections: list[tuple[str, list[str]]]) -> list[str]:
+    skills: dict[str, str] = {}
+    for name, lines in sections:
+        if name != "skills":
+            continue
+        for line in lines[1:]:
+            line = _BULLET_RE.sub("", line)
+            # "Languages: Python, Go" lists skills after a category label
+            if ":" in line:
+                line = line.split(":", 1)[1]
+            for skill in _SKILL_SPLIT_RE.split(line):
+                skill = skill.strip(" .")
+                if 1 <= len(skill) <= 40:
+                    skills.setdefault(skill.lower(), skill)
+    return list(skills.values())
+
+
+def strip_for_llm(sections: list[tuple[str, list[str]]]) -> str:
+    """Return the text the LLM still has to read.
+
+    Emails, phone numbers and profile links are removed from the header since
+    they are extracted locally, and sections the schema has no place for
+    (references, hobbies) are dropped.
+    """
+    kept = []
+    for name, lines in sections:
+        if name == "unused":
+            continue
+        if name == "header":
+            lines = [_strip_contact(line) for line in lines]
+            lines = [line for line in lines if line is not None]
+        kept.extend(lines)
+    return "\n".join(kept)
+
+
+def _strip_contact(line: str) -> str | None:
+    stripped = line
+    for pattern in (EMAIL_RE, LINKEDIN_RE, GITHUB_RE, URL_RE):
+        stripped = pattern.sub("", stripped)
+    stripped = PHONE_RE.sub(lambda m: "" if _is_phone(m.group(0)) else m.group(0), stripped)
+    if stripped == line:
+        return line
+    if _LEFTOVER_RE.match(stripped):
+        return None
+    # Collapse the separators left behind around removed values
+    return re.sub(r"([|,;•·])(\s*[|,;•·])+", r"\1", stripped).strip(" |,;•·")
+
+
+# Contact fields taken from pattern matches over whatever the LLM returns
+PATTERN_FIELDS = ("email", "linkedin", "github", "website")
+
+
+def merge_contact(llm_contact: ContactInfo, local_contact: ContactInfo) -> ContactInfo:
+    """Combine LLM and local contact details.
+
+    Pattern-matched fields win since they were stripped from the LLM's input;
+    for name, location and phone (whose pattern can still mistake a date or
+    an ID for a number) the LLM wins and the local guess only fills gaps.
+    """
+    merged = llm_contact.model_dump()
+    for field, value in local_contact.model_dump().items():
+        if value and (field in PATTERN_FIELDS or not merged[field]):
+            merged[field] = value
+    return ContactInfo(**merged)
+
+
+def local_resume(text: str) -> ParsedResume:
+    """Build a resume from locally extractable fields only (no LLM call)."""
+    sections = find_sections(text)
+    return ParsedResume(
+        contact=extract_contact(sections),
+        skills=extract_skills(sections),
+        raw_text=text[:2000],
+    )
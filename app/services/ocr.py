@@ -0,0 +1,239 @@
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from importlib.util import find_spec
+from pathlib import Path
+
+from app.config import (
+    OCR_WORKERS,
+    OCR_MIN_CHARS,
+    OCR_MAX_PAGES,
+    OCR_TIMEOUT,
+    OCR_MAX_QUEUE,
+    OCR_DPI,
+    OCR_LANG,
+    OCR_MEMORY_LIMIT_MB,
+    EXTRACTION_MAX_TASKS_PER_CHILD,
+    RESULT_CACHE_TTL,
+)
+from app.metrics import OCR_PAGES, REDIS_ERRORS, stage_timer
+from app.middleware import auth
+from app.services.document_parser import PDF_TYPE, _get_pdfium, _open_source
+
+logger = logging.getLogger(__name__)
+
+# Longest side of a rendered page in pixels, whatever OCR_DPI asks for, so a
+# poster-sized page cannot blow up a worker's memory.
+MAX_RENDER_PIXELS = 4000
+# FPDF_PAGEOBJ_IMAGE in pdfium's public API
+_IMAGE_OBJECT = 3
+
+_pool: ProcessPoolExecutor | None = None
+_pending = 0
+
+
+def ocr_available() -> bool:
+    return find_spec("pytesseract") is not None and shutil.which("tesseract") is not None
+
+
+def _limit_worker():
+    # OCR workers (and the tesseract processes they start) run at low priority
+    # with a memory cap, so scans cannot starve the regular extraction pool.
+    os.nice(10)
+    if OCR_MEMORY_LIMIT_MB > 0:
+        try:
+            import resource
+
+            limit = OCR_MEMORY_LIMIT_MB * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            logger.warning(f"Could not limit OCR worker memory: {e}")
+
+
+def _create_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=OCR_WORKERS,
+        initializer=_limit_worker,
+        max_tasks_per_child=EXTRACTION_MAX_TASKS_PER_CHILD or None,
+    )
+
+
+def init_ocr_pool():
+    global _pool
+    if OCR_WORKERS <= 0:
+        logger.info("OCR disabled")
+        return
+    if not ocr_available():
+        logger.warning("pytesseract or tesseract not installed, PDF pages without text will not be OCRed")
+        return
+    _pool = _create_pool()
+    logger.info(f"OCR pool started with {OCR_WORKERS} workers")
+
+
+def shutdown_ocr_pool():
+    global _pool
+    if _pool:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        logger.info("OCR pool stopped")
+
+
+def page_digests(source: bytes | Path, indexes: list[int]) -> list[str | None]:
+    """Hash the images drawn on each of the given pages, None for pages without any.
+
+    The raw image streams identify a scan without rendering it, so the same
+    page sent again (e.g. inside another PDF) is found in the cache.
+    """
+    pdfium = _get_pdfium()
+    if pdfium is None:
+        raise RuntimeError("pypdfium2 is not installed")
+
+    digests = []
+    with _open_source(source) as stream:
+        pdf = pdfium.PdfDocument(stream)
+        try:
+            for index in indexes:
+                page = pdf[index]
+                digest = hashlib.sha256(f"{OCR_DPI}:{OCR_LANG}:{page.get_rotation()}".encode())
+                images = 0
+                for image in page.get_objects(filter=[_IMAGE_OBJECT]):
+                    digest.update(bytes(image.get_data(decode_simple=False)))
+                    images += 1
+                page.close()
+                digests.append(digest.hexdigest() if images else None)
+        finally:
+            pdf.close()
+    return digests
+
+
+def ocr_page(source: bytes | Path, index: int, timeout: float) -> str:
+    """Render one page in grayscale at OCR_DPI and read it with Tesseract."""
+    import pytesseract
+
+    pdfium = _get_pdfium()
+    with _open_source(source) as stream:
+        pdf = pdfium.PdfDocument(stream)
+        try:
+            page = pdf[index]
+            # Scans are often embedded at 300-600 DPI; OCR_DPI is enough for
+            # body text and much cheaper to render and recognise.
+            scale = min(OCR_DPI / 72, MAX_RENDER_PIXELS / max(page.get_size()))
+            image = page.render(scale=scale, grayscale=True).to_pil()
+            page.close()
+        finally:
+            pdf.close()
+    return pytesseract.image_to_string(image, lang=OCR_LANG, timeout=timeout)
+
+
+def _task_done():
+    global _pending
+    _pending -= 1
+
+
+def _submit(fn, *args) -> asyncio.Future:
+    """Queue a call on the pool; it counts against the queue until its worker is done with it."""
+    global _pool, _pending
+
+    loop = asyncio.get_running_loop()
+    try:
+        task = _pool.submit(fn, *args)
+    except BrokenProcessPool:
+        logger.error("OCR pool is broken, restarting it")
+        _pool = _create_pool()
+        task = _pool.submit(fn, *args)
+    _pending += 1
+    # Counted off the pool's own future: cancelling the asyncio one only drops
+    # a page still queued, a page being read keeps its worker until it is done
+    task.add_done_callback(lambda _: loop.call_soon_threadsafe(_task_done))
+    return asyncio.wrap_future(task)
+
+
+async def _cached_texts(digests: list[str]) -> dict[str, str]:
+    if not auth._redis or not digests:
+        return {}
+    try:
+        values = await auth._redis.mget([f"ocr_cache:{digest}" for digest in digests])
+    except Exception:
+        logger.error("Redis error during OCR cache lookup")
+        REDIS_ERRORS.labels(operation="ocr_get").inc()
+        return {}
+    return {digest: value for digest, value in zip(digests, values) if value is not None}
+
+
+async def _store_texts(results: dict[str, str]):
+    if not auth._redis or not results:
+        return
+    try:
+        async with auth._redis.pipeline(transaction=False) as pipe:
+            for digest, text in results.items():
+                pipe.set(f"ocr_cache:{digest}", text, ex=RESULT_CACHE_TTL)
+            await pipe.execute()
+    except Exception:
+        logger.error("Redis error while caching OCR text")
+        REDIS_ERRORS.labels(operation="ocr_set").inc()
+
+
+async def ocr_sparse_pages(source: bytes | Path, texts: list[str]) -> list[str]:
+    """Replace the text of pages that have (almost) none with their OCR.
+
+    Pages with fewer than OCR_MIN_CHARS characters and at least one image are
+    OCRed in parallel on the OCR pool, up to OCR_MAX_PAGES per document and
+    within OCR_TIMEOUT overall; pages not done by then keep their embedded
+    text. Results are cached by the hash of the page's images. When OCR is
+    unavailable or its queue is full, the embedded text is returned as is.
+    """
+    sparse = [index for index, text in enumerate(texts) if len(text.strip()) < OCR_MIN_CHARS][:OCR_MAX_PAGES]
+    if not sparse or _pool is None:
+        return texts
+    if _pending + len(sparse) > OCR_MAX_QUEUE:
+        logger.warning(f"OCR queue full, skipping OCR of {len(sparse)} pages")
+        OCR_PAGES.labels(outcome="skipped").inc(len(sparse))
+        return texts
+
+    texts = list(texts)
+    deadline = time.monotonic() + OCR_TIMEOUT
+    with stage_timer("ocr", PDF_TYPE) as stage:
+        try:
+            digests = await asyncio.wait_for(_submit(page_digests, source, sparse), OCR_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Could not inspect PDF pages for OCR: {e!r}")
+            stage["outcome"] = "error"
+            return texts
+        pages = {index: digest for index, digest in zip(sparse, digests) if digest}
+        cached = await _cached_texts(list(pages.values()))
+
+        futures = {}
+        for index, digest in pages.items():
+            if digest in cached:
+                texts[index] = cached[digest]
+                OCR_PAGES.labels(outcome="cached").inc()
+            else:
+                futures[_submit(ocr_page, source, index, max(1.0, deadline - time.monotonic()))] = index
+        if not futures:
+            return texts
+
+        done, pending = await asyncio.wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        for future in pending:
+            # Drops pages still queued; a page being read stops at its tesseract timeout
+            future.cancel()
+        results = {}
+        for future in done:
+            index = futures[future]
+            if future.exception() is not None:
+                logger.warning(f"OCR of page {index + 1} failed: {future.exception()!r}")
+                OCR_PAGES.labels(outcome="failed").inc()
+                continue
+            texts[index] = future.result()
+            results[pages[index]] = texts[index]
+            OCR_PAGES.labels(outcome="ok").inc()
+        if pending:
+            logger.warning(f"OCR budget of {OCR_TIMEOUT:g}s exhausted, {len(pending)} pages left unread")
+            OCR_PAGES.labels(outcome="timeout").inc(len(pending))
+            stage["outcome"] = "timeout"
+        await _store_texts(results)
+    return texts
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+
+from pydantic import TypeAdapter, ValidationError
+
+from app.logging_config import annotate_request
+from app.metrics import PARTIAL_REPARSES, stage_timer
+from app.models.schemas import CompactionStats, ContactInfo, ParseResponse, ParsedResume, SimilarResume, TokenUsage
+from app.services.admission import admit
+from app.services.ai_extractor import extract_resume_data
+from app.services.local_extractor import extract_contact, find_sections, local_resume, merge_contact, strip_for_llm
+from app.services.result_cache import make_cache_key, get_cached_result, store_result
+from app.services.similarity import minhash, section_hashes, find_similar, index_resume, plan_partial, merge_partial
+from app.services.text_compactor import compact_text
+from app.services.usage import record_usage
+
+logger = logging.getLogger(__name__)
+
+
+async def parse_text(
+    text: str,
+    content_type: str = "text/plain",
+    mode: str = "full",
+    tier: str = "free",
+    api_key: str | None = None,
+    reuse_similar: bool = False,
+) -> ParseResponse:
+    """Turn extracted resume text into a ParseResponse, using the result cache.
+
+    In "fast" mode only locally extracted fields (contact details, skills) are
+    returned and the LLM is never called. LLM calls wait for an admission slot
+    by `tier` and raise Overloaded when none frees up in time.
+
+    With an `api_key`, resumes are looked up in and added to that key's
+    near-duplicate index; `similar_to` names the closest earlier resume. With
+    `reuse_similar` its result is reused and only the sections that changed
+    are sent to the LLM. Parses are counted in the key's usage stats.
+    """
+    started = time.perf_counter()
+    result = await _parse_text(text, content_type, mode, tier, api_key, reuse_similar)
+    if api_key:
+        record_usage(
+            api_key, result.token_usage, time.perf_counter() - started, success=result.success, cached=result.cached
+        )
+    return result
+
+
+def prepare_text(
+    text: str, content_type: str = "text/plain"
+) -> tuple[str, CompactionStats, list[tuple[str, list[str]]], ContactInfo, str]:
+    """Compact resume text and pattern match the contact details out of it.
+
+    Returns the compacted text, its compaction stats and sections, the local
+    contact details and the text left for the LLM, which results are cached
+    by. Streamed parses use it too, so both build the same LLM input.
+    """
+    with stage_timer("compact", content_type):
+        text, compaction = compact_text(text)
+
+    # Contact details are pattern matched here; the LLM only reads what is left
+    with stage_timer("local_extract", content_type):
+        sections = find_sections(text)
+        local_contact = extract_contact(sections)
+        llm_text = strip_for_llm(sections)
+    return text, compaction, sections, local_contact, llm_text
+
+
+async def _parse_text(
+    text: str, content_type: str, mode: str, tier: str, api_key: str | None, reuse_similar: bool
+) -> ParseResponse:
+    if mode == "fast":
+        with stage_timer("local_extract", content_type):
+            resume = local_resume(text)
+        return ParseResponse(success=True, data=resume, tokens_used=0)
+
+    text, compaction, sections, local_contact, llm_text = prepare_text(text, content_type)
+
+    cache_key = make_cache_key(llm_text)
+    # The cache key's digest identifies the resume text
+    resume_id = cache_key.rsplit(":", 1)[1][:16]
+    with stage_timer("cache_lookup", content_type) as stage:
+        cached_data = await get_cached_result(cache_key)
+        stage["outcome"] = "miss" if cached_data is None else "hit"
+
+    if cached_data is not None:
+        annotate_request(cached=True)
+        with stage_timer("validate", content_type):
+            resume = build_resume(cached_data, text, local_contact)
+        return ParseResponse(
+            success=True,
+            data=resume,
+            tokens_used=0,
+            cached=True,
+            compaction=compaction,
+            resume_id=resume_id,
+        )
+
+    similar = previous_data = partial = None
+    if api_key:
+        with stage_timer("similar_lookup", content_type) as stage:
+            # 64 passes over every shingle take tens of ms on long resumes
+            signature = await asyncio.to_thread(minhash, text)
+            hashes = section_hashes(sections)
+            similar = await find_similar(api_key, signature)
+            if similar and reuse_similar:
+                partial = plan_partial(sections, hashes, similar["sections"])
+                previous_data = await get_cached_result(similar["cache_key"]) if partial else None
+                if previous_data is None:
+                    partial = None
+            stage["outcome"] = "partial" if partial else "hit" if similar else "miss"
+
+    llm_input = strip_for_llm(partial[0]) if partial else llm_text
+    if partial and not llm_input:
+        # Nothing the LLM reads has changed
+        parsed_data, usage = previous_data, TokenUsage()
+    else:
+        async with admit(tier, content_type):
+            try:
+                with stage_timer("llm", content_type) as stage:
+                    parsed_data, usage = await extract_resume_data(llm_input)
+                    stage["provider"] = usage.provider or "unknown"
+            except Exception as e:
+                logger.exception("AI extraction failed")
+                return ParseResponse(success=False, error=f"AI extraction failed: {str(e)}", compaction=compaction)
+
+    if partial:
+        PARTIAL_REPARSES.inc()
+        parsed_data = merge_partial(previous_data, parsed_data, partial[1])
+
+    annotate_request(cached=False, provider=usage.provider, tokens=usage.total_tokens, partial=bool(partial))
+    await store_result(cache_key, parsed_data)
+    if api_key:
+        await index_resume(api_key, resume_id, signature, cache_key, hashes)
+    with stage_timer("validate", content_type):
+        resume = build_resume(parsed_data, text, local_contact)
+    similar_to = None
+    if similar:
+        similar_to = SimilarResume(
+            resume_id=similar["resume_id"],
+            similarity=similar["similarity"],
+            reparsed_sections=sorted(partial[1]) if partial else None,
+        )
+    return ParseResponse(
+        success=True,
+        data=resume,
+        tokens_used=usage.total_tokens,
+        token_usage=usage,
+        compaction=compaction,
+        resume_id=resume_id,
+        similar_to=similar_to,
+    )
+
+
+_RESUME_ADAPTER = TypeAdapter(ParsedResume)
+
+
+def validate_resume(data) -> ParsedResume:
+    """Validate LLM output, dropping only the parts that do not fit the schema.
+
+    Well-formed data is validated in a single pass. Otherwise a malformed list
+    entry (one bad experience) is removed, a malformed contact field or
+    top-level field is reset to its default, and the rest is validated again.
+    """
+    try:
+        return _RESUME_ADAPTER.validate_python(data)
+    except ValidationError as e:
+        errors = e.errors()
+    if not isinstance(data, dict):
+        logger.warning("LLM returned a non-object resume, discarding it")
+        return ParsedResume()
+
+    data = dict(data)
+    bad_items: dict[str, set[int]] = defaultdict(set)
+    for error in errors:
+        field, *rest = error["loc"]
+        value = data.get(field)
+        if rest and isinstance(rest[0], int) and isinstance(value, list):
+            bad_items[field].add(rest[0])
+        elif rest and isinstance(rest[0], str) and isinstance(value, dict):
+            data[field] = {key: item for key, item in value.items() if key != rest[0]}
+        else:
+            data.pop(field, None)
+    for field, indexes in bad_items.items():
+        data[field] = [item for index, item in enumerate(data[field]) if index not in indexes]
+
+    logger.warning(f"Dropped {len(errors)} malformed value(s) from parsed data")
+    try:
+        return _RESUME_ADAPTER.validate_python(data)
+    except ValidationError:
+        logger.warning("Failed to validate parsed data, returning an empty result")
+        return ParsedResume()
+
+
+def build_resume(parsed_data: dict, text: str, local_contact: ContactInfo | None = None) -> ParsedResume:
+    resume = validate_resume(parsed_data)
+    resume.raw_text = text[:2000]
+    if local_contact is not None:
+        resume.contact = merge_contact(resume.contact, local_contact)
+    return resume
@@ -0,0 +1,69 @@
+import logging
+import time
+from collections import deque
+
+from app.config import CIRCUIT_BREAKER_THRESHOLD, CIRCUIT_BREAKER_COOLDOWN
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+class ProviderStats:
+    """Recent latency and a consecutive-failure circuit breaker for one provider."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= CIRCUIT_BREAKER_THRESHOLD:
+            self.open_until = time.monotonic() + CIRCUIT_BREAKER_COOLDOWN
+            logger.warning(
+                f"Circuit open for {self.name} after {self.consecutive_failures} consecutive failures"
+            )
+
+    def is_available(self) -> bool:
+        """Whether the circuit lets requests through; claims nothing, see try_acquire_probe."""
+        return time.monotonic() >= self.open_until
+
+    def try_acquire_probe(self) -> bool:
+        """Claim a request to the provider, right before sending it.
+
+        Always granted while the circuit is closed. Once the cooldown is over a
+        single caller gets the probe; everyone else is kept away for another
+        cooldown unless that probe succeeds and closes the circuit. A failed
+        probe reopens it straight away.
+        """
+        now = time.monotonic()
+        if now < self.open_until:
+            return False
+        if self.consecutive_failures >= CIRCUIT_BREAKER_THRESHOLD:
+            self.open_until = now + CIRCUIT_BREAKER_COOLDOWN
+            logger.info(f"Circuit half-open for {self.name}, sending one probe request")
+        return True
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(percentile * len(ordered)))]
+
+
+provider_stats = {
+    "openai": ProviderStats("openai"),
+    "anthropic": ProviderStats("anthropic"),
+}
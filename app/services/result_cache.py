@@ -0,0 +1,83 @@
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+
+from app.metrics import CACHE_LOOKUPS, REDIS_ERRORS
+from app.config import RESULT_CACHE_ENABLED, RESULT_CACHE_TTL, RESULT_CACHE_LRU_SIZE
+from app.middleware import auth
+from app.services.ai_extractor import cache_namespace
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# key -> (expires_at, parsed_data); most recently used entries at the end
+_lru: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+
+def make_cache_key(text: str) -> str:
+    normalized = _WHITESPACE_RE.sub(" ", text).strip()
+    digest = hashlib.sha256(f"{cache_namespace()}\n{normalized}".encode("utf-8")).hexdigest()
+    return f"parse_cache:{digest}"
+
+
+def _remember(key: str, data: dict):
+    _lru[key] = (time.monotonic() + RESULT_CACHE_TTL, data)
+    _lru.move_to_end(key)
+    while len(_lru) > RESULT_CACHE_LRU_SIZE:
+        _lru.popitem(last=False)
+
+
+def clear_local_cache():
+    _lru.clear()
+
+
+async def get_cached_result(key: str) -> dict | None:
+    if not RESULT_CACHE_ENABLED:
+        return None
+
+    entry = _lru.get(key)
+    if entry:
+        expires_at, data = entry
+        if expires_at > time.monotonic():
+            _lru.move_to_end(key)
+            CACHE_LOOKUPS.labels(result="hit_local").inc()
+            return data
+        del _lru[key]
+
+    if not auth._redis:
+        CACHE_LOOKUPS.labels(result="miss").inc()
+        return None
+
+    try:
+        cached = await auth._redis.get(key)
+    except Exception:
+        logger.error("Redis error during result cache lookup")
+        REDIS_ERRORS.labels(operation="cache_get").inc()
+        cached = None
+    if not cached:
+        CACHE_LOOKUPS.labels(result="miss").inc()
+        return None
+
+    CACHE_LOOKUPS.labels(result="hit_redis").inc()
+    data = json.loads(cached)
+    _remember(key, data)
+    return data
+
+
+async def store_result(key: str, data: dict):
+    if not RESULT_CACHE_ENABLED:
+        return
+
+    _remember(key, data)
+    if not auth._redis:
+        return
+
+    try:
+        await auth._redis.set(key, json.dumps(data), ex=RESULT_CACHE_TTL)
+    except Exception:
+        logger.error("Redis error while storing parse result")
+        REDIS_ERRORS.labels(operation="cache_set").inc()
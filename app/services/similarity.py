@@ -0,0 +1,166 @@
+import hashlib
+import json
+import logging
+import random
+import re
+
+from app.config import SIMILARITY_ENABLED, SIMILARITY_THRESHOLD, SIMILARITY_MAX_CHANGED, RESULT_CACHE_TTL
+from app.metrics import REDIS_ERRORS, SIMILAR_LOOKUPS
+from app.middleware import auth
+from app.services.local_extractor import strip_for_llm
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+")
+
+# Words per shingle: one edited word changes this many shingles
+SHINGLE_SIZE = 3
+# MinHash signature of 64 values, indexed as 16 LSH bands of 4. Resumes sharing
+# 80% of their shingles collide in some band with >99% probability, unrelated
+# ones almost never, so only likely matches are fetched and compared.
+NUM_HASHES = 64
+BAND_ROWS = 4
+
+# Fixed seed: signatures are stored in Redis and compared across processes
+_rng = random.Random(0x5EED)
+_MASKS = [_rng.getrandbits(64) for _ in range(NUM_HASHES)]
+
+# Schema fields filled from each kind of section, for partial re-parses
+SECTION_FIELDS = {
+    "header": ("contact",),
+    "summary": ("summary",),
+    "experience": ("experience",),
+    "education": ("education",),
+    "skills": ("skills",),
+    "certifications": ("certifications",),
+    "languages": ("languages",),
+    "unused": (),
+}
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def minhash(text: str) -> list[int]:
+    """MinHash signature of the text's word shingles.
+
+    Each value is the minimum of the shingle hashes XORed with one fixed mask;
+    the share of equal values between two signatures estimates their Jaccard
+    similarity. CPU bound (~25ms at MAX_INPUT_TOKENS), so run it off the
+    event loop.
+    """
+    words = _WORD_RE.findall(text.lower())
+    hashes = {_hash64(" ".join(words[i:i + SHINGLE_SIZE])) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))}
+    return [min(value ^ mask for value in hashes) for mask in _MASKS]
+
+
+def similarity(first: list[int], second: list[int]) -> float:
+    return sum(a == b for a, b in zip(first, second)) / NUM_HASHES
+
+
+def section_hashes(sections: list[tuple[str, list[str]]]) -> list[list[str]]:
+    """[name, digest] per section of the text the LLM reads, for diffing against later versions."""
+    return [
+        [name, hashlib.sha256(strip_for_llm([(name, lines)]).encode("utf-8")).hexdigest()[:16]]
+        for name, lines in sections
+    ]
+
+
+def _band_keys(api_key: str, signature: list[int]) -> list[str]:
+    keys = []
+    for band, start in enumerate(range(0, NUM_HASHES, BAND_ROWS)):
+        digest = _hash64(",".join(map(str, signature[start:start + BAND_ROWS])))
+        keys.append(f"minhash:{api_key}:{band}:{digest:016x}")
+    return keys
+
+
+def _doc_key(api_key: str, resume_id: str) -> str:
+    return f"minhash_doc:{api_key}:{resume_id}"
+
+
+async def find_similar(api_key: str, signature: list[int]) -> dict | None:
+    """Find the most similar resume this API key parsed before, if it is at least SIMILARITY_THRESHOLD alike.
+
+    Returns {"resume_id", "similarity", "cache_key", "sections"} or None.
+    """
+    if not SIMILARITY_ENABLED or not auth._redis:
+        return None
+    try:
+        async with auth._redis.pipeline(transaction=False) as pipe:
+            for key in _band_keys(api_key, signature):
+                pipe.smembers(key)
+            buckets = await pipe.execute()
+        candidates = sorted({member for bucket in buckets for member in bucket})
+        entries = await auth._redis.mget([_doc_key(api_key, rid) for rid in candidates]) if candidates else []
+    except Exception:
+        logger.error("Redis error during similar resume lookup")
+        REDIS_ERRORS.labels(operation="similar_get").inc()
+        return None
+
+    best = None
+    for resume_id, entry in zip(candidates, entries):
+        if not entry:
+            continue
+        entry = json.loads(entry)
+        score = similarity(signature, entry.pop("signature"))
+        if score >= SIMILARITY_THRESHOLD and (best is None or score > best["similarity"]):
+            best = {"resume_id": resume_id, "similarity": score, **entry}
+    SIMILAR_LOOKUPS.labels(result="hit" if best else "miss").inc()
+    return best
+
+
+async def index_resume(api_key: str, resume_id: str, signature: list[int], cache_key: str, sections: list[list[str]]):
+    """Record a parsed resume so later near-duplicates from the same API key find it."""
+    if not SIMILARITY_ENABLED or not auth._redis:
+        return
+    try:
+        async with auth._redis.pipeline(transaction=False) as pipe:
+            for key in _band_keys(api_key, signature):
+                pipe.sadd(key, resume_id)
+                pipe.expire(key, RESULT_CACHE_TTL)
+            pipe.set(
+                _doc_key(api_key, resume_id),
+                json.dumps({"cache_key": cache_key, "sections": sections, "signature": signature}),
+                ex=RESULT_CACHE_TTL,
+            )
+            await pipe.execute()
+    except Exception:
+        logger.error("Redis error while indexing resume signature")
+        REDIS_ERRORS.labels(operation="similar_set").inc()
+
+
+def plan_partial(
+    sections: list[tuple[str, list[str]]], hashes: list[list[str]], previous: list[list[str]]
+) -> tuple[list[tuple[str, list[str]]], set[str]] | None:
+    """Work out what to re-parse of a new version of an earlier resume.
+
+    Returns the sections to send to the LLM (every section of a kind that
+    changed, so the re-parsed field is complete) and the kinds of section that
+    changed or disappeared. None when a partial re-parse is not safe or not
+    worth it: a changed section of unknown kind, or more than
+    SIMILARITY_MAX_CHANGED of the text to re-read.
+    """
+    seen = {tuple(entry) for entry in previous}
+    names = {name for name, _ in sections}
+    changed = {name for name, digest in hashes if (name, digest) not in seen}
+    changed |= {name for name, _ in previous} - names
+    if not changed <= SECTION_FIELDS.keys():
+        return None
+    resend = [(name, lines) for name, lines in sections if name in changed]
+    resend_chars = sum(len(line) for _, lines in resend for line in lines)
+    total_chars = sum(len(line) for _, lines in sections for line in lines)
+    if resend_chars > total_chars * SIMILARITY_MAX_CHANGED:
+        return None
+    return resend, changed
+
+
+def merge_partial(previous: dict, partial: dict, changed: set[str]) -> dict:
+    """Take the fields of changed sections from `partial` and the rest from `previous`."""
+    merged = dict(previous)
+    for name in changed:
+        for field in SECTION_FIELDS[name]:
+            merged.pop(field, None)
+            if field in partial:
+                merged[field] = partial[field]
+    return merged
@@ -0,0 +1,44 @@
+import re
+
+from app.services.document_parser import PAGE_BREAK
+from app.services.local_extractor import EMAIL_RE, find_name, find_phone
+
+# Lines at the top of a page searched for a candidate's contact block
+HEADER_LINES = 8
+
+
+def _page_identity(page: str) -> tuple[str | None, set[str]]:
+    """Return the name heading and contact values (emails, phone digits) topping a page."""
+    lines = [line.strip() for line in page.splitlines() if line.strip()][:HEADER_LINES]
+    top = "\n".join(lines)
+    contacts = {email.lower() for email in EMAIL_RE.findall(top)}
+    phone = find_phone(top)
+    if phone:
+        contacts.add(re.sub(r"\D", "", phone))
+    name = find_name(lines)
+    return (name.lower() if name else None), contacts
+
+
+def split_candidates(text: str) -> list[str]:
+    """Split the text of a document holding several resumes into one text per resume.
+
+    A page starts a new resume when it opens with a name heading and a contact
+    block (email or phone) that do not belong to the resume before it, so
+    running headers repeating a candidate's name or email on every page keep
+    that resume together. Other pages continue the current resume.
+    """
+    candidates: list[list[str]] = []
+    name, contacts = None, set()
+    for page in text.split(PAGE_BREAK):
+        if not page.strip():
+            continue
+        page_name, page_contacts = _page_identity(page)
+        same_person = (page_name is not None and page_name == name) or bool(page_contacts & contacts)
+        if candidates and (page_name is None or not page_contacts or same_person):
+            candidates[-1].append(page)
+            contacts |= page_contacts
+            name = name or page_name
+        else:
+            candidates.append([page])
+            name, contacts = page_name, page_contacts
+    return [PAGE_BREAK.join(pages) for pages in candidates]
@@ -0,0 +1,158 @@
+import json
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONParser:
+    """Emit top-level fields of a streamed JSON object as soon as they close.
+
+    Feed raw model output chunk by chunk. Scalar and object fields are emitted
+    once as (key, value); array fields are emitted element by element as
+    (key, element), so each experience entry or skill arrives as soon as its
+    closing bracket or quote has been generated. Anything before the first `{`
+    (such as a markdown fence) is ignored.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._started = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"  # key | colon | value | comma (state at depth 1)
+        self._key: str | None = None
+        self._key_start = 0
+        self._value_start: int | None = None
+        self._in_array = False
+        self._item_start: int | None = None
+        self.document: dict = {}
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def feed(self, chunk: str) -> list[tuple[str, object]]:
+        self._buf += chunk
+        events: list[tuple[str, object]] = []
+        buf = self._buf
+        i = self._pos
+        while i < len(buf) and not self._done:
+            ch = buf[i]
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._string_closed(i, events)
+                i += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._value_opened(i)
+            elif ch in "{[":
+                self._value_opened(i)
+                self._depth += 1
+                if self._depth == 2 and ch == "[" and self._value_start == i:
+                    self._in_array = True
+            elif ch in "}]":
+                self._scalar_closed(i, events)
+                self._depth -= 1
+                self._container_closed(i, events)
+            elif ch == ",":
+                self._scalar_closed(i, events)
+                if self._depth == 1:
+                    self._expect = "key"
+            elif ch == ":" and self._depth == 1:
+                self._expect = "value"
+            elif ch not in _WHITESPACE:
+                self._value_opened(i)
+            i += 1
+
+        self._pos = i
+        # Drop consumed text that no pending value can still refer to
+        keep_from = min(
+            (p for p in (self._value_start, self._item_start) if p is not None),
+            default=self._key_start if self._in_string else i,
+        )
+        if keep_from > 0:
+            self._buf = self._buf[keep_from:]
+            self._pos -= keep_from
+            self._key_start -= keep_from
+            if self._value_start is not None:
+                self._value_start -= keep_from
+            if self._item_start is not None:
+                self._item_start -= keep_from
+        return events
+
+    def _value_opened(self, i: int):
+        if self._depth == 1:
+            if self._expect == "key" and self._in_string:
+                self._key_start = i
+            elif self._expect == "value" and self._value_start is None:
+                self._value_start = i
+        elif self._depth == 2 and self._in_array and self._item_start is None:
+            self._item_start = i
+
+    def _string_closed(self, i: int, events: list):
+        if self._depth == 1:
+            if self._expect == "key":
+                self._key = json.loads(self._buf[self._key_start:i + 1])
+                self._expect = "colon"
+            elif self._value_start is not None:
+                self._emit_value(i + 1, events)
+        elif self._depth == 2 and self._in_array and self._item_start is not None:
+            if self._buf[self._item_start] == '"':
+                self._emit_item(i + 1, events)
+
+    def _scalar_closed(self, i: int, events: list):
+        """Handle numbers/literals, which only end at a delimiter."""
+        if self._depth == 1 and self._value_start is not None:
+            self._emit_value(i, events)
+        elif self._depth == 2 and self._in_array and self._item_start is not None:
+            self._emit_item(i, events)
+
+    def _container_closed(self, i: int, events: list):
+        if self._depth == 0:
+            self._done = True
+        elif self._depth == 1 and self._value_start is not None:
+            if self._in_array:
+                self._in_array = False
+                self.document.setdefault(self._key, [])
+                self._value_start = None
+                self._expect = "comma"
+            else:
+                self._emit_value(i + 1, events)
+        elif self._depth == 2 and self._in_array and self._item_start is not None:
+            self._emit_item(i + 1, events)
+
+    def _emit_value(self, end: int, events: list):
+        raw = self._buf[self._value_start:end].strip()
+        self._value_start = None
+        self._expect = "comma"
+        if not raw:
+            return
+        value = json.loads(raw)
+        self.document[self._key] = value
+        events.append((self._key, value))
+
+    def _emit_item(self, end: int, events: list):
+        raw = self._buf[self._item_start:end].strip()
+        self._item_start = None
+        if not raw:
+            return
+        value = json.loads(raw)
+        self.document.setdefault(self._key, []).append(value)
+        events.append((self._key, value))
@@ -0,0 +1,137 @@
+import logging
+import time
+from typing import AsyncIterator, Optional
+
+from pydantic import TypeAdapter, ValidationError
+
+from app.logging_config import annotate_request
+from app.models.schemas import (
+    ContactInfo,
+    Experience,
+    Education,
+    Certification,
+    Language,
+    ParsedResume,
+    TokenUsage,
+)
+from app.services.admission import Overloaded, admit
+from app.services.ai_extractor import stream_resume_data
+from app.services.local_extractor import merge_contact
+from app.services.pipeline import build_resume, prepare_text
+from app.services.result_cache import make_cache_key, get_cached_result, store_result
+from app.services.stream_parser import IncrementalJSONParser
+from app.services.usage import record_usage
+
+logger = logging.getLogger(__name__)
+
+# Adapters for a whole field (contact, summary) or one element of a list field
+_FIELD_ADAPTERS: dict[str, TypeAdapter] = {
+    "contact": TypeAdapter(ContactInfo),
+    "summary": TypeAdapter(Optional[str]),
+    "skills": TypeAdapter(str),
+    "experience": TypeAdapter(Experience),
+    "education": TypeAdapter(Education),
+    "certifications": TypeAdapter(Certification),
+    "languages": TypeAdapter(Language),
+}
+_LIST_FIELDS = ("skills", "experience", "education", "certifications", "languages")
+
+
+def _validate_field(key: str, value) -> tuple[bool, object]:
+    adapter = _FIELD_ADAPTERS.get(key)
+    if adapter is None:
+        return False, None
+    try:
+        return True, adapter.dump_python(adapter.validate_python(value), mode="json")
+    except ValidationError:
+        logger.warning(f"Dropping malformed streamed {key} entry")
+        return False, None
+
+
+def _resume_events(resume: ParsedResume) -> list[tuple[str, object]]:
+    data = resume.model_dump(mode="json", exclude={"raw_text"})
+    events = [("contact", data["contact"]), ("summary", data["summary"])]
+    for key in _LIST_FIELDS:
+        events.extend((key, item) for item in data[key])
+    return events
+
+
+async def stream_parse(
+    text: str, tier: str = "free", api_key: str | None = None, content_type: str = "text/plain"
+) -> AsyncIterator[tuple[str, object]]:
+    """Yield (event, data) pairs for each resume field as soon as it is known.
+
+    The LLM reads the same text as for /parse, so results are cached under the
+    same key, and the contact event carries the locally matched details too.
+    Ends with a "done" event carrying tokens_used, or an "error" event. The LLM
+    admission slot is held until the model stops streaming. With an `api_key`
+    the parse is counted in its usage stats.
+    """
+    started = time.perf_counter()
+    outcome = {"usage": None, "success": False, "cached": False, "rejected": False}
+    try:
+        async for event in _stream_parse(text, tier, content_type, outcome):
+            yield event
+    finally:
+        # Like parse_text, requests turned away by admission control are not parses
+        if api_key and not outcome["rejected"]:
+            seconds = time.perf_counter() - started
+            record_usage(api_key, outcome["usage"], seconds, outcome["success"], outcome["cached"])
+
+
+async def _stream_parse(text: str, tier: str, content_type: str, outcome: dict) -> AsyncIterator[tuple[str, object]]:
+    text, compaction, _, local_contact, llm_text = prepare_text(text, content_type)
+
+    cache_key = make_cache_key(llm_text)
+    cached_data = await get_cached_result(cache_key)
+    if cached_data is not None:
+        annotate_request(cached=True)
+        outcome.update(success=True, cached=True)
+        for event in _resume_events(build_resume(cached_data, text, local_contact)):
+            yield event
+        yield "done", {"tokens_used": 0, "cached": True, "compaction": compaction.model_dump()}
+        return
+
+    parser = IncrementalJSONParser()
+    usage = TokenUsage()
+    contact_sent = False
+    try:
+        async with admit(tier, content_type):
+            async for kind, value in stream_resume_data(llm_text):
+                if kind == "usage":
+                    usage = outcome["usage"] = value
+                    continue
+                for key, item in parser.feed(value):
+                    valid, data = _validate_field(key, item)
+                    if not valid:
+                        continue
+                    if key == "contact":
+                        data = merge_contact(ContactInfo(**data), local_contact).model_dump(mode="json")
+                        contact_sent = True
+                    yield key, data
+    except Overloaded as e:
+        outcome["rejected"] = True
+        yield "error", {"error": "Server is busy. Retry shortly.", "retry_after": e.retry_after}
+        return
+    except Exception as e:
+        logger.exception("Streaming AI extraction failed")
+        yield "error", {"error": f"AI extraction failed: {str(e)}"}
+        return
+
+    if not parser.done:
+        yield "error", {"error": "AI extraction failed: incomplete JSON response", "tokens_used": usage.total_tokens}
+        return
+
+    if not contact_sent:
+        # The model sent no (valid) contact, the local details still count
+        yield "contact", merge_contact(ContactInfo(), local_contact).model_dump(mode="json")
+
+    annotate_request(cached=False, provider=usage.provider, tokens=usage.total_tokens)
+    outcome["success"] = True
+    await store_result(cache_key, parser.document)
+    yield "done", {
+        "tokens_used": usage.total_tokens,
+        "token_usage": usage.model_dump(),
+        "cached": False,
+        "compaction": compaction.model_dump(),
+    }
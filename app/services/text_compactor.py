@@ -0,0 +1,190 @@
+import logging
+import math
+import re
+from collections import Counter
+
+from app.config import AI_PROVIDER, MAX_INPUT_TOKENS
+from app.models.schemas import CompactionStats
+from app.services.document_parser import PAGE_BREAK
+
+logger = logging.getLogger(__name__)
+
+# Bounds the work done on pathological inputs before any token budget applies
+MAX_INPUT_CHARS = 200_000
+
+# Average characters per token of English text for each provider's tokenizer,
+# used when no local tokenizer is available
+CHARS_PER_TOKEN = {"openai": 4.0, "anthropic": 3.5}
+
+_INLINE_SPACE_RE = re.compile(r"[ \t\u00a0\u200b]+")
+_DIGITS_RE = re.compile(r"\d+")
+# "Page 2", "Page 2 of 3", "Page 2/3", "2 of 3" or "- 2 -"; a bare number or
+# "06/2019" is more likely a date than a page number
+_PAGE_NUMBER_RE = re.compile(r"^page\s*\d+(\s*(of|/)\s*\d+)?$|^\d+\s+of\s+\d+$|^-\s*\d+\s*-$", re.IGNORECASE)
+SECTION_HEADING_RE = re.compile(
+    r"^(summary|professional summary|profile|about me|objective|career objective|"
+    r"experience|work experience|professional experience|employment history|work history|"
+    r"education|academic background|skills|technical skills|core competencies|"
+    r"certifications?|licenses? (and|&) certifications|courses|training|languages|"
+    r"projects|publications|awards|honors|volunteer( experience)?|interests|hobbies|references)"
+    r"\s*:?$",
+    re.IGNORECASE,
+)
+
+# Lines this close to the top or bottom of a page are header/footer candidates
+_EDGE_LINES = 3
+
+_encoder = None
+_encoder_loaded = False
+
+
+def _get_encoder():
+    """Return a tiktoken encoder for OpenAI models, or None if unavailable."""
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        _encoder_loaded = True
+        if AI_PROVIDER == "openai":
+            try:
+                import tiktoken
+                # The encoding of gpt-4o-mini; downloaded on first use unless
+                # TIKTOKEN_CACHE_DIR already holds it
+                _encoder = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                logger.warning(f"tiktoken unavailable, estimating token counts from length: {e!r}")
+    return _encoder
+
+
+def preload_tokenizer():
+    """Load the tokenizer now rather than on the first request."""
+    _get_encoder()
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with the provider's tokenizer, or estimate them from length.
+
+    The estimate counts a token per non-ASCII character: CJK and Cyrillic
+    text takes about that many, far more than CHARS_PER_TOKEN suggests.
+    """
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / CHARS_PER_TOKEN.get(AI_PROVIDER, 4.0)) + len(text) - ascii_chars
+
+
+def is_section_heading(line: str) -> bool:
+    if len(line) > 40:
+        return False
+    return bool(SECTION_HEADING_RE.match(line)) or (
+        line.isupper() and 1 <= len(line.split()) <= 4 and any(c.isalpha() for c in line)
+    )
+
+
+def _normalize_lines(page: str) -> list[str]:
+    lines = []
+    for line in page.splitlines():
+        line = _INLINE_SPACE_RE.sub(" ", line).strip()
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    # Page numbers only sit at the top or bottom of a page
+    if lines and _PAGE_NUMBER_RE.match(lines[0]):
+        lines.pop(0)
+    if lines and _PAGE_NUMBER_RE.match(lines[-1]):
+        lines.pop()
+    while lines and not lines[0]:
+        lines.pop(0)
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _strip_repeated_edges(pages: list[list[str]]) -> list[list[str]]:
+    """Remove header/footer lines that repeat at the edges of most pages.
+
+    The first page keeps its copy: a running header is often the candidate's
+    name and contact line, which must still reach the LLM once.
+    """
+    if len(pages) < 2:
+        return pages
+
+    def edges(lines: list[str]) -> set[str]:
+        content = [line for line in lines if line]
+        return {_DIGITS_RE.sub("#", line) for line in content[:_EDGE_LINES] + content[-_EDGE_LINES:]}
+
+    counts = Counter(key for page in pages for key in edges(page))
+    threshold = max(2, math.ceil(len(pages) / 2))
+    repeated = {key for key, count in counts.items() if count >= threshold}
+    if not repeated:
+        return pages
+
+    cleaned = [pages[0]]
+    for lines in pages[1:]:
+        content_idx = [i for i, line in enumerate(lines) if line]
+        edge_idx = set(content_idx[:_EDGE_LINES] + content_idx[-_EDGE_LINES:])
+        cleaned.append([
+            line for i, line in enumerate(lines)
+            if not (i in edge_idx and _DIGITS_RE.sub("#", line) in repeated)
+        ])
+    return cleaned
+
+
+def split_sections(lines: list[str]) -> list[list[str]]:
+    """Split lines into sections, each starting at a heading (except the first)."""
+    sections: list[list[str]] = [[]]
+    for line in lines:
+        if line and is_section_heading(line) and sections[-1]:
+            sections.append([])
+        sections[-1].append(line)
+    return [section for section in sections if any(section)]
+
+
+def _fit_sections(sections: list[list[str]], budget: int) -> list[list[str]]:
+    """Share the token budget across sections so none is dropped entirely.
+
+    Small sections are kept whole; whatever is left is split evenly across the
+    larger ones, which are cut at a line boundary.
+    """
+    sizes = [count_tokens("\n".join(section)) for section in sections]
+    allocation = [0] * len(sections)
+    remaining = budget
+    order = sorted(range(len(sections)), key=lambda i: sizes[i])
+    for rank, i in enumerate(order):
+        allocation[i] = min(sizes[i], remaining // (len(sections) - rank))
+        remaining -= allocation[i]
+
+    fitted = []
+    for section, size, allowed in zip(sections, sizes, allocation):
+        if size <= allowed:
+            fitted.append(section)
+            continue
+        kept, used = [], 0
+        for line in section:
+            cost = count_tokens(line) + 1
+            if used + cost > allowed and kept:
+                break
+            kept.append(line)
+            used += cost
+        fitted.append(kept)
+    return fitted
+
+
+def compact_text(text: str, max_tokens: int = MAX_INPUT_TOKENS) -> tuple[str, CompactionStats]:
+    """Normalize resume text and fit it into the LLM input token budget."""
+    original_chars = len(text)
+    pages = [_normalize_lines(page) for page in text[:MAX_INPUT_CHARS].split(PAGE_BREAK)]
+    lines = [line for page in _strip_repeated_edges(pages) for line in page]
+    compacted = "\n".join(lines)
+
+    original_tokens = count_tokens(compacted)
+    truncated = original_tokens > max_tokens or original_chars > MAX_INPUT_CHARS
+    if original_tokens > max_tokens:
+        sections = _fit_sections(split_sections(lines), max_tokens)
+        compacted = "\n".join(line for section in sections for line in section)
+
+    stats = CompactionStats(
+        original_chars=original_chars,
+        compacted_chars=len(compacted),
+        compacted_tokens=count_tokens(compacted) if truncated else original_tokens,
+        truncated=truncated,
+    )
+    return compacted, stats
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from collections import defaultdict
+
+from app.config import API_KEYS, TIER_LIMITS, USAGE_FLUSH_INTERVAL, USAGE_LATENCY_BUCKETS
+from app.metrics import REDIS_ERRORS
+from app.middleware import auth
+from app.models.schemas import TokenUsage
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_FIELDS = ("input_tokens", "cached_input_tokens", "cache_creation_input_tokens", "output_tokens")
+
+# Per-key counters not yet written to Redis: stats hash key -> field -> increment
+_buffer: defaultdict[str, defaultdict[str, int]] = defaultdict(lambda: defaultdict(int))
+_flusher: asyncio.Task | None = None
+
+
+def _stats_key(api_key: str, month: str) -> str:
+    return f"usage_stats:{api_key}:{month}"
+
+
+def _latency_field(seconds: float) -> str:
+    for bound in USAGE_LATENCY_BUCKETS:
+        if seconds <= bound:
+            return f"latency:le_{bound:g}"
+    return "latency:le_inf"
+
+
+def record_usage(api_key: str, usage: TokenUsage | None, seconds: float, success: bool = True, cached: bool = False):
+    """Count one parse for `api_key`; written to Redis by the next flush."""
+    counters = _buffer[_stats_key(api_key, auth._get_month_key())]
+    counters["parses"] += 1
+    counters["failed"] += not success
+    counters["cached"] += cached
+    counters["latency_ms"] += round(seconds * 1000)
+    counters[_latency_field(seconds)] += 1
+    if usage is not None:
+        counters["tokens"] += usage.total_tokens
+        for field in _TOKEN_FIELDS:
+            counters[field] += getattr(usage, field)
+        if usage.provider:
+            counters[f"provider:{usage.provider}"] += 1
+
+
+async def flush_usage():
+    """Write the buffered counters to Redis in one pipeline.
+
+    Counters go back into the buffer when Redis fails, to be retried by the
+    next flush.
+    """
+    global _buffer
+    if not _buffer or not auth._redis:
+        return
+    pending, _buffer = _buffer, defaultdict(lambda: defaultdict(int))
+    try:
+        async with auth._redis.pipeline(transaction=False) as pipe:
+            for key, counters in pending.items():
+                for field, amount in counters.items():
+                    if amount:
+                        pipe.hincrby(key, field, amount)
+                pipe.expire(key, auth.USAGE_TTL)
+            await pipe.execute()
+    except Exception:
+        logger.error("Redis error while flushing usage counters")
+        REDIS_ERRORS.labels(operation="usage_flush").inc()
+        for key, counters in pending.items():
+            for field, amount in counters.items():
+                _buffer[key][field] += amount
+
+
+async def _flush_periodically():
+    while True:
+        await asyncio.sleep(USAGE_FLUSH_INTERVAL)
+        await flush_usage()
+
+
+def start_usage_flusher():
+    global _flusher
+    _flusher = asyncio.create_task(_flush_periodically())
+
+
+async def stop_usage_flusher():
+    """Stop the periodic flush and write whatever is still buffered."""
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        _flusher = None
+    await flush_usage()
+
+
+def _stats(counters: dict[str, str]) -> dict:
+    values = {field: int(value) for field, value in counters.items()}
+    parses = values.get("parses", 0)
+    return {
+        "parses": parses,
+        "failed": values.get("failed", 0),
+        "cached": values.get("cached", 0),
+        "tokens_used": values.get("tokens", 0),
+        "token_usage": {field: values.get(field, 0) for field in _TOKEN_FIELDS},
+        "providers": {
+            field.split(":", 1)[1]: value for field, value in values.items() if field.startswith("provider:")
+        },
+        "latency_buckets": {
+            field.split(":", 1)[1]: value for field, value in values.items() if field.startswith("latency:")
+        },
+        "latency_avg_ms": round(values.get("latency_ms", 0) / parses) if parses else None,
+    }
+
+
+async def get_usage(api_keys: list[str]) -> dict[str, dict]:
+    """This month's usage of each key, fetched in one pipelined round trip.
+
+    Request counts are exact; parse stats lag by up to USAGE_FLUSH_INTERVAL
+    per API process.
+    """
+    month = auth._get_month_key()
+    reports = {}
+    for api_key in api_keys:
+        tier = API_KEYS.get(api_key, "free")
+        reports[api_key] = {
+            "tier": tier,
+            "requests_used": -1,
+            "requests_limit": TIER_LIMITS.get(tier, 50),
+            "resets_at": auth._get_month_end(),
+            "stats": None,
+        }
+    if not auth._redis or not api_keys:
+        return reports
+
+    try:
+        async with auth._redis.pipeline(transaction=False) as pipe:
+            for api_key in api_keys:
+                pipe.get(f"usage:{api_key}:{month}")
+                pipe.hgetall(_stats_key(api_key, month))
+            results = await pipe.execute()
+    except Exception:
+        logger.error("Redis error during usage check")
+        REDIS_ERRORS.labels(operation="usage").inc()
+        return reports
+
+    for api_key, count, counters in zip(api_keys, results[::2], results[1::2]):
+        reports[api_key]["requests_used"] = int(count) if count else 0
+        reports[api_key]["stats"] = _stats(counters)
+    return reports
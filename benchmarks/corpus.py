@@ -0,0 +1,88 @@
+"""Fixture corpus of resumes in every supported format and several sizes.
+
+Usage:
+    python -m benchmarks.corpus DIR    # write the corpus to DIR
+"""
+import io
+import sys
+from pathlib import Path
+
+from docx import Document
+
+from tests.conftest import make_pdf
+
+SIZES = {"small": 1, "medium": 3, "large": 12}
+
+_HEADER = [
+    "Jane Roe",
+    "Berlin, Germany | jane.roe@example.com | +49 30 1234 5678",
+    "linkedin.com/in/janeroe | github.com/janeroe",
+    "",
+    "SUMMARY",
+    "Backend engineer focused on distributed systems and developer tooling.",
+    "",
+    "EXPERIENCE",
+]
+_JOB = [
+    "Acme Corp {n}, Staff Engineer, 2019 - present",
+    "Led the migration of the billing platform to an event-driven architecture.",
+    "Reduced p99 latency of the checkout API from 800ms to 120ms.",
+    "Mentored six engineers and ran the on-call rotation.",
+    "",
+]
+_FOOTER = [
+    "EDUCATION",
+    "MSc Computer Science, Technical University of Munich, 2014",
+    "",
+    "SKILLS",
+    "Python, Go, PostgreSQL, Kafka, Kubernetes, Terraform",
+]
+LINES_PER_PAGE = 45
+
+
+def resume_pages(pages: int) -> list[list[str]]:
+    """Resume text split into pages of LINES_PER_PAGE lines."""
+    jobs_needed = max(1, (pages * LINES_PER_PAGE - len(_HEADER) - len(_FOOTER)) // len(_JOB))
+    lines = list(_HEADER)
+    for n in range(jobs_needed):
+        lines += [line.format(n=n + 1) for line in _JOB]
+    lines += _FOOTER
+    return [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+
+
+def make_docx(lines: list[str]) -> bytes:
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def build_corpus() -> dict[str, tuple[bytes, str]]:
+    """Return {filename: (content, content_type)} for every format and size."""
+    corpus = {}
+    for size, pages in SIZES.items():
+        page_lines = resume_pages(pages)
+        lines = [line for page in page_lines for line in page]
+        corpus[f"{size}.pdf"] = (make_pdf(page_lines), "application/pdf")
+        corpus[f"{size}.docx"] = (
+            make_docx(lines),
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        )
+        corpus[f"{size}.txt"] = ("\n".join(lines).encode(), "text/plain")
+    return corpus
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit(__doc__)
+    directory = Path(sys.argv[1])
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, (content, _) in build_corpus().items():
+        (directory / name).write_bytes(content)
+        print(f"{directory / name} ({len(content) // 1024} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Compare DOCX text extraction engines.
+
+Usage:
+    python -m benchmarks.docx_engines [--corpus DIR] [--repeat N]
+
+Without --corpus, a synthetic corpus of resumes (plain paragraphs, and the
+same resumes laid out in a table) is generated. Reports, for each engine, the
+median time per document, the peak memory it added (measured in a fresh
+process, so imports are not counted; Linux only) and how many characters it
+extracted. Documents are read whole, without the early stop at
+PDF_TEXT_TARGET_CHARS. python-docx skips tables entirely, so its times on
+table layouts are for extracting nothing.
+"""
+import argparse
+import gc
+import io
+import multiprocessing
+import re
+import statistics
+import time
+from pathlib import Path
+
+from docx import Document
+
+from app.services.document_parser import _DOCX_ENGINES
+from benchmarks.corpus import make_docx, resume_pages
+
+
+def make_table_docx(lines: list[str]) -> bytes:
+    """The resume as a two-column layout table, as many templates do."""
+    doc = Document()
+    table = doc.add_table(rows=0, cols=2)
+    for line in lines:
+        row = table.add_row()
+        row.cells[0].text = line
+        row.cells[1].text = line.upper()
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def synthetic_corpus() -> dict[str, bytes]:
+    corpus = {}
+    for pages in (1, 3, 12, 60):
+        lines = [line for page in resume_pages(pages) for line in page]
+        corpus[f"synthetic-{pages}p.docx"] = make_docx(lines)
+        corpus[f"table-{pages}p.docx"] = make_table_docx(lines)
+    return corpus
+
+
+def load_corpus(directory: Path) -> dict[str, bytes]:
+    return {path.name: path.read_bytes() for path in sorted(directory.glob("*.docx"))}
+
+
+def bench(engine, docx: bytes, repeat: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        text = engine(io.BytesIO(docx), 0)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), len(text)
+
+
+def _memory_kb(field: str) -> int:
+    with open("/proc/self/status") as status:
+        return int(re.search(rf"{field}:\s+(\d+)", status.read()).group(1))
+
+
+def peak_memory_kb(engine_name: str, docx: bytes) -> int:
+    """Peak RSS added by one extraction, in a fresh process warmed up on a tiny document.
+
+    Uses the resettable high-water mark in /proc, so Linux only.
+    """
+    engine = _DOCX_ENGINES[engine_name]
+    engine(io.BytesIO(make_docx(["warm up"])), 0)
+    gc.collect()
+    with open("/proc/self/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+    before = _memory_kb("VmRSS")
+    engine(io.BytesIO(docx), 0)
+    return _memory_kb("VmHWM") - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, help="directory of DOCX files")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus()
+    engines = list(_DOCX_ENGINES)
+    spawn = multiprocessing.get_context("spawn")
+
+    header = f"{'document':<26}{'KB':>8}"
+    for engine in engines:
+        header += f"{engine + ' ms':>16}{'peak KB':>10}{'chars':>9}"
+    print(header + f"{'speedup':>10}")
+    for name, docx in corpus.items():
+        row = f"{name:<26}{len(docx) // 1024:>8}"
+        timings = {}
+        for engine in engines:
+            try:
+                timings[engine], chars = bench(_DOCX_ENGINES[engine], docx, args.repeat)
+                with spawn.Pool(1) as pool:
+                    peak = pool.apply(peak_memory_kb, (engine, docx))
+            except Exception as e:
+                print(f"{name}: {engine} failed ({e})")
+                row += f"{'-':>16}{'-':>10}{'-':>9}"
+                continue
+            row += f"{timings[engine] * 1000:>16.1f}{peak:>10}{chars:>9}"
+        if len(timings) == 2:
+            row += f"{timings['python-docx'] / timings['xml']:>9.1f}x"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Load driver: RPS and latency percentiles per endpoint and per pipeline stage.
+
+Against a running API (see the Benchmarks section of the README):
+    python -m benchmarks.load --url http://127.0.0.1:8000 --api-key KEY [--concurrency 32] [--duration 30]
+
+Fully in-process, with fakeredis and the mock LLM on a local port:
+    python -m benchmarks.load --in-process [--latency-ms 800]
+
+Stage percentiles are estimated from the resume_parser_stage_seconds histogram
+on /metrics, diffed over the run, so they cover every worker of the target.
+Use --unique to defeat the result cache for text bodies, or run the API with
+RESULT_CACHE_ENABLED=false to measure the LLM path for files too.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+from benchmarks.corpus import build_corpus
+
+ENDPOINTS = ("parse", "parse_fast", "parse_text", "stream")
+STAGE_METRIC = "resume_parser_stage_seconds"
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _unique(text: str, enabled: bool) -> str:
+    return f"{text}\nRef {uuid.uuid4().hex}" if enabled else text
+
+
+def make_request(endpoint: str, corpus: dict[str, tuple[bytes, str]], unique: bool) -> dict:
+    """Build httpx.request() arguments for one call to `endpoint`."""
+    name, (content, content_type) = random.choice(list(corpus.items()))
+    text_name = random.choice([name for name, (_, ctype) in corpus.items() if ctype == "text/plain"])
+    text = corpus[text_name][0].decode()
+
+    if endpoint == "parse_text":
+        return {"method": "POST", "url": "/parse/text", "params": {"text": _unique(text, unique)[:6000]}}
+    if endpoint == "stream":
+        return {"method": "POST", "url": "/parse/stream", "data": {"text": _unique(text, unique)}}
+    if content_type == "text/plain":
+        content = _unique(content.decode(), unique).encode()
+    request = {"method": "POST", "url": "/parse", "files": {"file": (name, content, content_type)}}
+    if endpoint == "parse_fast":
+        request["params"] = {"mode": "fast"}
+    return request
+
+
+async def _scrape_stage_buckets(client: httpx.AsyncClient) -> dict[str, dict[float, float]]:
+    """Return {stage: {upper_bound: cumulative count}} summed over all other labels."""
+    try:
+        response = await client.get("/metrics")
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return {}
+    buckets: dict[str, dict[float, float]] = defaultdict(lambda: defaultdict(float))
+    for family in text_string_to_metric_families(response.text):
+        if family.name != STAGE_METRIC:
+            continue
+        for sample in family.samples:
+            if sample.name == f"{STAGE_METRIC}_bucket":
+                buckets[sample.labels["stage"]][float(sample.labels["le"])] += sample.value
+    return buckets
+
+
+def _histogram_quantile(buckets: dict[float, float], q: float) -> float:
+    """Linear interpolation within cumulative buckets, like PromQL's histogram_quantile."""
+    bounds = sorted(buckets)
+    total = buckets[bounds[-1]]
+    rank = q * total
+    previous_bound, previous_count = 0.0, 0.0
+    for bound in bounds:
+        count = buckets[bound]
+        if count >= rank:
+            if bound == float("inf"):
+                return previous_bound
+            if count == previous_count:
+                return bound
+            return previous_bound + (bound - previous_bound) * (rank - previous_count) / (count - previous_count)
+        previous_bound, previous_count = bound, count
+    return previous_bound
+
+
+async def run_load(client: httpx.AsyncClient, args, corpus) -> tuple[dict, dict, float]:
+    latencies: dict[str, list[float]] = defaultdict(list)
+    statuses: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    endpoints = args.endpoints.split(",")
+    deadline = time.perf_counter() + args.duration
+    remaining = args.requests
+
+    async def worker():
+        nonlocal remaining
+        while time.perf_counter() < deadline and (remaining is None or remaining > 0):
+            if remaining is not None:
+                remaining -= 1
+            endpoint = random.choice(endpoints)
+            started = time.perf_counter()
+            try:
+                response = await client.request(**make_request(endpoint, corpus, args.unique))
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies[endpoint].append(time.perf_counter() - started)
+            statuses[endpoint][status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return latencies, statuses, time.perf_counter() - started
+
+
+def report(latencies, statuses, elapsed: float, before: dict, after: dict):
+    total = sum(len(values) for values in latencies.values())
+    print(f"\n{total} requests in {elapsed:.1f}s, {total / elapsed:.1f} RPS\n")
+    print(f"{'endpoint':<14}{'count':>8}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  statuses")
+    for endpoint, values in sorted(latencies.items()):
+        codes = ", ".join(f"{code}: {count}" for code, count in sorted(statuses[endpoint].items()))
+        print(
+            f"{endpoint:<14}{len(values):>8}{len(values) / elapsed:>8.1f}"
+            f"{_percentile(values, 0.50) * 1000:>10.1f}{_percentile(values, 0.95) * 1000:>10.1f}"
+            f"{_percentile(values, 0.99) * 1000:>10.1f}  {codes}"
+        )
+
+    stages = {}
+    for stage, buckets in after.items():
+        delta = {bound: count - before.get(stage, {}).get(bound, 0.0) for bound, count in buckets.items()}
+        if delta and max(delta.values()) > 0:
+            stages[stage] = delta
+    if not stages:
+        print("\nNo stage metrics (is /metrics reachable?)")
+        return
+    print(f"\n{'stage':<14}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, delta in sorted(stages.items()):
+        print(
+            f"{stage:<14}{int(delta[float('inf')]):>8}"
+            + "".join(f"{_histogram_quantile(delta, q) * 1000:>10.1f}" for q in (0.50, 0.95, 0.99))
+        )
+
+
+async def _run_in_process(args, corpus):
+    """Run the API in this process against fakeredis and the mock LLM."""
+    import uvicorn
+    from fakeredis.aioredis import FakeRedis
+
+    from benchmarks import mock_llm
+
+    mock_llm.settings.latency_ms = args.latency_ms
+    mock_llm.settings.jitter_ms = args.jitter_ms
+    mock_llm.settings.error_rate = args.error_rate
+    mock_server = uvicorn.Server(uvicorn.Config(mock_llm.app, port=args.mock_port, log_level="warning"))
+    mock_task = asyncio.create_task(mock_server.serve())
+    while not mock_server.started:
+        await asyncio.sleep(0.05)
+
+    # Settings are read at import time, so set them before the app is loaded
+    os.environ.update({
+        "AI_PROVIDER": "openai",
+        "OPENAI_API_KEY": "mock",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.mock_port}/v1",
+        "API_KEYS": f"{args.api_key}:mega",
+        "LOG_LEVEL": "WARNING",
+    })
+    from app.main import app
+    from app.middleware import auth
+
+    try:
+        async with app.router.lifespan_context(app):
+            auth._redis = FakeRedis(decode_responses=True)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench", headers={"X-API-Key": args.api_key}, timeout=120
+            ) as client:
+                before = await _scrape_stage_buckets(client)
+                latencies, statuses, elapsed = await run_load(client, args, corpus)
+                after = await _scrape_stage_buckets(client)
+    finally:
+        mock_server.should_exit = True
+        await mock_task
+    report(latencies, statuses, elapsed, before, after)
+
+
+async def _run_remote(args, corpus):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.url, headers={"X-API-Key": args.api_key}, timeout=120, limits=limits
+    ) as client:
+        before = await _scrape_stage_buckets(client)
+        latencies, statuses, elapsed = await run_load(client, args, corpus)
+        after = await _scrape_stage_buckets(client)
+    report(latencies, statuses, elapsed, before, after)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--api-key", default="bench-key")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument("--requests", type=int, help="stop after this many requests")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help=f"comma separated, from {ENDPOINTS}")
+    parser.add_argument("--unique", action="store_true", help="make text bodies unique to bypass the cache")
+    parser.add_argument("--in-process", action="store_true")
+    parser.add_argument("--mock-port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    unknown = set(args.endpoints.split(",")) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    corpus = build_corpus()
+    if args.in_process:
+        asyncio.run(_run_in_process(args, corpus))
+    else:
+        asyncio.run(_run_remote(args, corpus))
+
+
+if __name__ == "__main__":
+    main()
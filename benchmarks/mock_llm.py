@@ -0,0 +1,220 @@
+"""Local stand-in for the OpenAI and Anthropic APIs.
+
+Serves POST /v1/chat/completions and POST /v1/messages (streaming and not)
+with a canned resume, after a configurable latency. Point the API at it with
+OPENAI_BASE_URL=http://127.0.0.1:9100/v1 or ANTHROPIC_BASE_URL=http://127.0.0.1:9100.
+
+Usage:
+    python -m benchmarks.mock_llm [--port 9100] [--latency-ms 800] [--jitter-ms 200]
+                                  [--error-rate 0.0] [--tokens-per-second 150]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+RESUME = {
+    "contact": {
+        "name": "Jane Roe",
+        "email": None,
+        "phone": None,
+        "location": "Berlin, Germany",
+        "linkedin": None,
+        "github": None,
+        "website": None,
+    },
+    "summary": "Backend engineer focused on distributed systems.",
+    "skills": ["Python", "Go", "PostgreSQL", "Kafka", "Kubernetes"],
+    "experience": [
+        {
+            "company": "Acme Corp",
+            "title": "Staff Engineer",
+            "start_date": "2019-01",
+            "end_date": "Present",
+            "description": "Led the billing platform migration.",
+        }
+    ],
+    "education": [
+        {
+            "institution": "Technical University of Munich",
+            "degree": "Master's",
+            "field": "Computer Science",
+            "start_date": "2012",
+            "end_date": "2014",
+            "gpa": None,
+        }
+    ],
+    "certifications": [],
+    "languages": [{"name": "English", "proficiency": "Fluent"}],
+}
+CONTENT = json.dumps(RESUME)
+# Roughly what a real tokenizer would count for CONTENT
+OUTPUT_TOKENS = len(CONTENT) // 4
+STREAM_CHUNK_CHARS = 16
+
+
+@dataclass
+class MockSettings:
+    latency_ms: float = 800
+    jitter_ms: float = 200
+    error_rate: float = 0.0
+    tokens_per_second: float = 150
+
+
+settings = MockSettings()
+app = FastAPI(title="Mock LLM provider")
+
+
+def _input_tokens(body: dict) -> int:
+    chars = len(json.dumps(body.get("messages", ""))) + len(json.dumps(body.get("system", "")))
+    return max(1, chars // 4)
+
+
+async def _delay():
+    jitter = random.uniform(-settings.jitter_ms, settings.jitter_ms)
+    await asyncio.sleep(max(0.0, settings.latency_ms + jitter) / 1000)
+
+
+def _should_fail() -> bool:
+    return random.random() < settings.error_rate
+
+
+def _chunks():
+    return [CONTENT[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(CONTENT), STREAM_CHUNK_CHARS)]
+
+
+def _chunk_interval() -> float:
+    # Characters arrive at about 4 per token
+    return STREAM_CHUNK_CHARS / 4 / settings.tokens_per_second
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    await _delay()
+    if _should_fail():
+        return JSONResponse({"error": {"message": "mock overload", "type": "server_error"}}, status_code=503)
+
+    prompt_tokens = _input_tokens(body)
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": OUTPUT_TOKENS,
+        "total_tokens": prompt_tokens + OUTPUT_TOKENS,
+        "prompt_tokens_details": {"cached_tokens": 0},
+    }
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+
+    if not body.get("stream"):
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": CONTENT},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        }
+
+    def chunk(delta: dict, finish_reason=None, with_usage=False) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": body.get("model", "mock"),
+            "choices": [] if with_usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        if with_usage:
+            payload["usage"] = usage
+        return f"data: {json.dumps(payload)}\n\n"
+
+    async def events():
+        yield chunk({"role": "assistant", "content": ""})
+        for piece in _chunks():
+            await asyncio.sleep(_chunk_interval())
+            yield chunk({"content": piece})
+        yield chunk({}, finish_reason="stop")
+        if body.get("stream_options", {}).get("include_usage"):
+            yield chunk({}, with_usage=True)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/v1/messages")
+async def messages(request: Request):
+    body = await request.json()
+    await _delay()
+    if _should_fail():
+        return JSONResponse(
+            {"type": "error", "error": {"type": "overloaded_error", "message": "mock overload"}},
+            status_code=529,
+        )
+
+    message = {
+        "id": f"msg_{uuid.uuid4().hex}",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model", "mock"),
+        "content": [{"type": "text", "text": CONTENT}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": _input_tokens(body),
+            "output_tokens": OUTPUT_TOKENS,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        },
+    }
+    if not body.get("stream"):
+        return message
+
+    def event(name: str, data: dict) -> str:
+        return f"event: {name}\ndata: {json.dumps({'type': name, **data})}\n\n"
+
+    async def events():
+        start = {**message, "content": [], "stop_reason": None, "usage": {**message["usage"], "output_tokens": 1}}
+        yield event("message_start", {"message": start})
+        yield event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+        for piece in _chunks():
+            await asyncio.sleep(_chunk_interval())
+            yield event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": piece}})
+        yield event("content_block_stop", {"index": 0})
+        yield event("message_delta", {
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": OUTPUT_TOKENS},
+        })
+        yield event("message_stop", {})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=settings.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=settings.jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=settings.error_rate)
+    parser.add_argument("--tokens-per-second", type=float, default=settings.tokens_per_second)
+    args = parser.parse_args()
+
+    settings.latency_ms = args.latency_ms
+    settings.jitter_ms = args.jitter_ms
+    settings.error_rate = args.error_rate
+    settings.tokens_per_second = args.tokens_per_second
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare PDF text extraction engines.
+
+Usage:
+    python -m benchmarks.pdf_engines [--corpus DIR] [--repeat N]
+
+Without --corpus, a synthetic corpus of resumes and longer portfolios is
+generated. Reports the median time per document for each engine and how many
+pages were read before the early stop at PDF_TEXT_TARGET_CHARS.
+"""
+import argparse
+import io
+import statistics
+import time
+from pathlib import Path
+
+from app.services.document_parser import _PDF_ENGINES, _get_pdfium
+from benchmarks.corpus import resume_pages
+from tests.conftest import make_pdf
+
+
+def synthetic_corpus() -> dict[str, bytes]:
+    return {f"synthetic-{pages}p.pdf": make_pdf(resume_pages(pages)) for pages in (1, 2, 5, 20, 60)}
+
+
+def load_corpus(directory: Path) -> dict[str, bytes]:
+    return {path.name: path.read_bytes() for path in sorted(directory.glob("*.pdf"))}
+
+
+def bench(engine, pdf: bytes, repeat: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        texts, _ = engine(io.BytesIO(pdf), 0, 1 << 30)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), len(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, help="directory of PDF files")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus()
+    engines = [name for name in _PDF_ENGINES if name != "pdfium" or _get_pdfium() is not None]
+
+    print(f"{'document':<28}{'read':>7}" + "".join(f"{name + ' ms':>14}" for name in engines) + f"{'speedup':>10}")
+    for name, pdf in corpus.items():
+        results = {}
+        for engine in engines:
+            try:
+                results[engine] = bench(_PDF_ENGINES[engine], pdf, args.repeat)
+            except Exception as e:
+                print(f"{name}: {engine} failed ({e})")
+        if not results:
+            continue
+        pages_read = max(count for _, count in results.values())
+        row = f"{name:<28}{pages_read:>7}"
+        row += "".join(f"{results[engine][0] * 1000:>14.1f}" if engine in results else f"{'-':>14}" for engine in engines)
+        if "pdfium" in results and "pypdf2" in results:
+            row += f"{results['pypdf2'][0] / results['pdfium'][0]:>9.1f}x"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Startup time: import cost of the app and time until a new server answers.
+
+    python -m benchmarks.startup [--runs 5] [--top 15] [--server uvicorn|gunicorn]
+
+Reports the median cumulative `python -X importtime` cost of app.main with its
+slowest imports, then the median time from launching a server to its first
+200 on GET /. Redis does not need to be running; the API starts without it.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def import_times() -> dict[str, tuple[int, int]]:
+    """Return {module: (self us, cumulative us)} for a fresh `import app.main`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative, module = line.removeprefix("import time:").split("|")
+        times[module.strip()] = (int(self_us), int(cumulative))
+    return times
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_response(server: str) -> float:
+    port = _free_port()
+    if server == "gunicorn":
+        command = ["gunicorn", "app.main:app", "--bind", f"127.0.0.1:{port}", "--workers", "1"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+    env = {**os.environ, "LOG_LEVEL": "WARNING", "REDIS_URL": "redis://127.0.0.1:1/0"}
+
+    # One client for all polls; building one per attempt costs more than the poll interval
+    with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1) as client:
+        started = time.perf_counter()
+        process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            while True:
+                try:
+                    if client.get("/").status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.HTTPError:
+                    pass
+                if process.poll() is not None:
+                    raise RuntimeError(f"{server} exited with status {process.returncode}")
+                time.sleep(0.01)
+        finally:
+            process.terminate()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--server", choices=("uvicorn", "gunicorn"), default="uvicorn")
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    total = statistics.median(times["app.main"][1] for times in runs)
+    print(f"import app.main: {total / 1000:.0f}ms (median of {args.runs})\n")
+    print(f"{'self ms':>9}{'cumulative ms':>15}  module")
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    for module, (self_us, cumulative) in slowest:
+        print(f"{self_us / 1000:>9.1f}{cumulative / 1000:>15.1f}  {module}")
+
+    ready = [time_to_first_response(args.server) for _ in range(args.runs)]
+    print(f"\n{args.server} first 200 on GET /: {statistics.median(ready) * 1000:.0f}ms (median of {args.runs})")
+
+
+if __name__ == "__main__":
+    main()
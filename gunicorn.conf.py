@@ -0,0 +1,34 @@
+"""Preload/fork mode: gunicorn imports the app once, then forks uvicorn workers.
+
+Workers share the imported code copy-on-write and start serving as soon as
+they are forked. Each worker still runs the app lifespan, so Redis, provider
+clients and the extraction pool are created per process.
+
+    gunicorn app.main:app          # this file is picked up automatically
+"""
+import os
+
+from prometheus_client import multiprocess
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+# LLM calls can take a while; the app enforces its own provider timeouts
+timeout = 120
+graceful_timeout = 30
+# The app writes its own access log (app.access)
+accesslog = None
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before the first fork
+    from app.main import preload
+
+    preload()
+
+
+def child_exit(server, worker):
+    # Drop live gauges of workers that died without running their shutdown
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
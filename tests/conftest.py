@@ -4,6 +4,8 @@ from unittest.mock import AsyncMock, patch
 from httpx import AsyncClient, ASGITransport
 from fakeredis.aioredis import FakeRedis
 
+from app.models.schemas import TokenUsage
+
 
 MOCK_PARSED_DATA = {
     "contact": {"name": "John Doe", "email": "john@example.com"},
@@ -15,6 +17,35 @@ MOCK_PARSED_DATA = {
     "languages": [],
 }
 
+MOCK_TOKEN_USAGE = TokenUsage(provider="openai", input_tokens=400, output_tokens=100)
+
+
+def make_pdf(pages: list[list[str]]) -> bytes:
+    """Build a minimal text PDF with one line per string, one list per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        escaped = (line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines)
+        stream = "BT /F1 11 Tf 14 TL 50 780 Td " + " ".join(f"({line}) Tj T*" for line in escaped) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode("latin-1"))
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {len(objects)} 0 R "
+            f"/Resources << /Font << /F1 3 0 R >> >> >>".encode()
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
 
 @pytest.fixture
 async def fake_redis():
@@ -27,8 +58,8 @@ async def fake_redis():
 @pytest.fixture
 async def client(fake_redis):
     with patch("app.middleware.auth._redis", fake_redis):
-        mock_extract = AsyncMock(return_value=(MOCK_PARSED_DATA, 500))
-        with patch("app.services.ai_extractor.extract_resume_data", mock_extract):
+        mock_extract = AsyncMock(return_value=(MOCK_PARSED_DATA, MOCK_TOKEN_USAGE))
+        with patch("app.services.pipeline.extract_resume_data", mock_extract):
             with patch("app.services.ai_extractor.init_ai_clients"):
                 from app.main import app
                 transport = ASGITransport(app=app)
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from app.services import admission
+from app.services.admission import AdmissionController, Overloaded
+
+
+async def _wait_queued(controller: AdmissionController, count: int):
+    while controller.queued < count:
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_higher_tiers_are_served_first():
+    controller = AdmissionController(max_in_flight=1, max_queue=10, max_wait=5)
+    await controller.acquire("mega")
+    served = []
+
+    async def wait(tier: str):
+        await controller.acquire(tier)
+        served.append(tier)
+        controller.release(tier)
+
+    tasks = [asyncio.create_task(wait(tier)) for tier in ("free", "pro", "mega")]
+    await _wait_queued(controller, 3)
+    controller.release("mega")
+    await asyncio.gather(*tasks)
+    assert served == ["mega", "pro", "free"]
+
+
+@pytest.mark.asyncio
+async def test_tier_share_caps_in_flight_calls():
+    controller = AdmissionController(max_in_flight=8, max_queue=10, max_wait=0.05)
+    with patch.dict(admission.LLM_TIER_SHARES, {"free": 0.25}):
+        await controller.acquire("free")
+        await controller.acquire("free")
+        with pytest.raises(Overloaded) as exc:
+            await controller.acquire("free")
+        assert exc.value.reason == "timeout"
+        # Other tiers still get the remaining slots
+        await controller.acquire("mega")
+    assert controller.in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_full_queue_displaces_lower_tier():
+    controller = AdmissionController(max_in_flight=1, max_queue=1, max_wait=5)
+    await controller.acquire("pro")
+    free_waiter = asyncio.create_task(controller.acquire("free"))
+    await _wait_queued(controller, 1)
+
+    with pytest.raises(Overloaded):
+        await controller.acquire("free")  # no one worse to displace
+
+    mega_waiter = asyncio.create_task(controller.acquire("mega"))
+    with pytest.raises(Overloaded) as exc:
+        await free_waiter
+    assert exc.value.reason == "displaced"
+
+    controller.release("pro")
+    await mega_waiter
+    assert controller.tier_in_flight["mega"] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_queue_rejects_instead_of_waiting():
+    controller = AdmissionController(max_in_flight=1, max_queue=0, max_wait=5)
+    await controller.acquire("free")
+    with pytest.raises(Overloaded) as exc:
+        await controller.acquire("mega")
+    assert exc.value.reason == "queue_full"
+    assert controller.tier_cap("mega") == 1
+
+
+def test_limit_adapts_to_provider_feedback():
+    controller = AdmissionController(max_in_flight=8, max_queue=10, max_wait=1)
+    controller.observe_response(429, None, None, retry_after=0)
+    assert controller.limit == 4
+    controller.observe_response(200, remaining=5, limit=100, retry_after=None)
+    assert controller.limit == 3
+    for _ in range(3):
+        controller.observe_response(200, remaining=90, limit=100, retry_after=None)
+    assert controller.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_cluster_limit_shared_through_redis(fake_redis):
+    with patch("app.middleware.auth._redis", fake_redis), patch.object(admission, "LLM_CLUSTER_MAX_IN_FLIGHT", 1):
+        token = await admission._acquire_cluster_slot("mega", deadline=0)
+        assert token
+        with pytest.raises(Overloaded) as exc:
+            await admission._acquire_cluster_slot("mega", deadline=0)
+        assert exc.value.reason == "cluster_full"
+
+        await admission._release_cluster_slot(token)
+        assert await admission._acquire_cluster_slot("mega", deadline=0)
+
+
+@pytest.mark.asyncio
+async def test_overloaded_returns_503(client, api_headers):
+    async def overloaded(*args, **kwargs):
+        raise Overloaded("queue_full", retry_after=7)
+
+    with patch.object(admission.controller, "acquire", overloaded):
+        response = await client.post("/parse/text", headers=api_headers, params={"text": "Jane Roe\nEngineer"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
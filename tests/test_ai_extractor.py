@@ -0,0 +1,55 @@
+import json
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services import ai_extractor
+from tests.conftest import MOCK_PARSED_DATA
+
+
+def _openai_response(content: str, prompt_tokens: int, cached: int, completion_tokens: int):
+    usage = SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=cached),
+    )
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+@pytest.mark.asyncio
+async def test_openai_static_prompt_is_leading_system_message():
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(
+        return_value=_openai_response(json.dumps(MOCK_PARSED_DATA), 1500, 1024, 300)
+    )
+    with patch.object(ai_extractor, "_openai_client", client):
+        data, usage = await ai_extractor.extract_with_openai("Jane Roe")
+
+    messages = client.chat.completions.create.await_args.kwargs["messages"]
+    assert messages[0] == {"role": "system", "content": ai_extractor.EXTRACTION_PROMPT}
+    assert messages[1]["content"].endswith("Jane Roe")
+    assert data == MOCK_PARSED_DATA
+    assert (usage.input_tokens, usage.cached_input_tokens, usage.output_tokens) == (476, 1024, 300)
+    assert usage.total_tokens == 1800
+
+
+@pytest.mark.asyncio
+async def test_anthropic_static_prompt_marked_cacheable():
+    usage = SimpleNamespace(
+        input_tokens=120, output_tokens=300, cache_read_input_tokens=900, cache_creation_input_tokens=0
+    )
+    response = SimpleNamespace(content=[SimpleNamespace(text=json.dumps(MOCK_PARSED_DATA))], usage=usage)
+    client = MagicMock()
+    client.messages.create = AsyncMock(return_value=response)
+    with patch.object(ai_extractor, "_anthropic_client", client):
+        _, token_usage = await ai_extractor.extract_with_anthropic("Jane Roe")
+
+    kwargs = client.messages.create.await_args.kwargs
+    assert kwargs["system"] == [
+        {"type": "text", "text": ai_extractor.EXTRACTION_PROMPT, "cache_control": {"type": "ephemeral"}}
+    ]
+    assert ai_extractor.EXTRACTION_PROMPT not in kwargs["messages"][0]["content"]
+    assert token_usage.cached_input_tokens == 900
+    assert token_usage.total_tokens == 1320
@@ -0,0 +1,97 @@
+import io
+import zipfile
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.middleware.auth import _get_month_key
+from app.services.result_cache import clear_local_cache
+from tests.conftest import MOCK_PARSED_DATA, MOCK_TOKEN_USAGE
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_local_cache()
+    yield
+    clear_local_cache()
+
+
+def _make_zip(files: dict[str, bytes]) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return buf.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_batch_files_and_texts(client, fake_redis, api_headers):
+    mock_extract = AsyncMock(return_value=(MOCK_PARSED_DATA, MOCK_TOKEN_USAGE))
+    with patch("app.services.pipeline.extract_resume_data", mock_extract):
+        response = await client.post(
+            "/parse/batch",
+            headers=api_headers,
+            files=[
+                ("files", ("a.txt", b"Alice, Python developer", "text/plain")),
+                ("files", ("b.jpg", b"not a resume", "image/jpeg")),
+            ],
+            data={"texts": ["Bob, Go developer", "Carol, SRE"]},
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["success"] for item in data["results"]] == [True, False, True, True]
+    assert data["results"][1]["filename"] == "b.jpg"
+    assert "Unsupported file type" in data["results"][1]["error"]
+    assert data["tokens_used"] == 1500
+    assert mock_extract.await_count == 3
+    assert await fake_redis.get(f"usage:demo-key-123:{_get_month_key()}") == "4"
+
+
+@pytest.mark.asyncio
+async def test_batch_expands_zip(client, api_headers):
+    archive = _make_zip({"one.txt": b"Alice, Python", "two.txt": b"Bob, Java", "empty.txt": b""})
+    response = await client.post(
+        "/parse/batch",
+        headers=api_headers,
+        files={"files": ("resumes.zip", archive, "application/zip")},
+    )
+    results = response.json()["results"]
+    assert {item["filename"]: item["success"] for item in results} == {
+        "one.txt": True,
+        "two.txt": True,
+        "empty.txt": False,
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_zip_bomb(client, api_headers):
+    # 3 x 4MB of zeros compress to a few KB
+    bomb = _make_zip({f"{n}.txt": bytes(4 * 1024 * 1024) for n in range(3)})
+    assert len(bomb) < 100_000
+    with patch("app.main.BATCH_MAX_BODY_SIZE", 10 * 1024 * 1024):
+        response = await client.post(
+            "/parse/batch",
+            headers=api_headers,
+            files=[("files", ("bomb.zip", bomb, "application/zip")), ("files", ("a.txt", b"Alice", "text/plain"))],
+        )
+    results = response.json()["results"]
+    assert {item["filename"]: item["success"] for item in results} == {"a.txt": True, "bomb.zip": False}
+    assert "inflates to more than 10MB" in next(r["error"] for r in results if r["filename"] == "bomb.zip")
+
+
+@pytest.mark.asyncio
+async def test_batch_charges_quota_up_front(client, fake_redis, api_headers):
+    await fake_redis.set(f"usage:demo-key-123:{_get_month_key()}", 49)
+    response = await client.post(
+        "/parse/batch",
+        headers=api_headers,
+        data={"texts": ["Alice", "Bob"]},
+    )
+    assert response.status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_batch_requires_items(client, api_headers):
+    response = await client.post("/parse/batch", headers=api_headers, data={})
+    assert response.status_code == 400
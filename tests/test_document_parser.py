@@ -1,5 +1,13 @@
+import io
+import zipfile
+
 import pytest
-from app.services.document_parser import extract_text
+from unittest.mock import patch
+from docx import Document
+
+from app.services import document_parser
+from app.services.document_parser import DOCX_TYPE, PAGE_BREAK, extract_text
+from tests.conftest import make_pdf
 
 
 def test_extract_text_plain():
@@ -15,3 +23,80 @@ def test_extract_text_unsupported():
 def test_extract_text_utf8_errors():
     text = extract_text(b"\xff\xfe Hello", "text/plain")
     assert "Hello" in text
+
+
+PDF_PAGES = [["Jane Roe", "Senior Engineer"], ["Experience", "Acme Corp"], ["Education", "MIT"]]
+
+
+@pytest.mark.parametrize("engine", ["pdfium", "pypdf2"])
+def test_extract_pdf_pages_with_each_engine(engine):
+    with patch.object(document_parser, "PDF_ENGINE", engine):
+        text = extract_text(make_pdf(PDF_PAGES), "application/pdf")
+    pages = text.split(PAGE_BREAK)
+    assert len(pages) == 3
+    assert "Senior Engineer" in pages[0]
+    assert "MIT" in pages[2]
+
+
+def test_extract_pdf_respects_page_cap():
+    with patch.object(document_parser, "PDF_MAX_PAGES", 2):
+        text = extract_text(make_pdf(PDF_PAGES), "application/pdf")
+    assert "Acme Corp" in text
+    assert "MIT" not in text
+
+
+def test_extract_pdf_falls_back_to_pypdf2():
+    def broken_engine(stream, first, count):
+        raise RuntimeError("engine failure")
+
+    with patch.dict(document_parser._PDF_ENGINES, {"pdfium": broken_engine}):
+        text = extract_text(make_pdf(PDF_PAGES), "application/pdf")
+    assert "Jane Roe" in text
+
+
+def _templated_docx() -> bytes:
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Jane Roe | jane@example.com"
+    doc.add_paragraph("Experience")
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Acme Corp"
+    table.cell(0, 1).text = "Staff Engineer"
+    table.cell(1, 0).text = "Globex"
+    doc.add_paragraph("Skills")
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def _text_box_docx() -> bytes:
+    # A DrawingML text box plus the VML copy Word writes for older readers
+    box = '<w:txbxContent><w:p><w:r><w:t>Python, Go</w:t></w:r></w:p></w:txbxContent>'
+    body = (
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+        'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"><w:body>'
+        '<w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>'
+        '<w:r><w:t>Skills</w:t></w:r><w:r><mc:AlternateContent>'
+        f'<mc:Choice Requires="wps"><w:drawing>{box}</w:drawing></mc:Choice>'
+        f'<mc:Fallback><w:pict>{box}</w:pict></mc:Fallback>'
+        '</mc:AlternateContent></w:r></w:p></w:body></w:document>'
+    )
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        archive.writestr("word/document.xml", body)
+    return buf.getvalue()
+
+
+def test_extract_docx_reads_headers_tables_and_text_boxes():
+    lines = extract_text(_templated_docx(), DOCX_TYPE).split("\n")
+    assert lines == ["Jane Roe | jane@example.com", "Experience", "Acme Corp", "Staff Engineer", "Globex", "Skills"]
+
+    assert extract_text(_text_box_docx(), DOCX_TYPE).split("\n") == ["Python, Go", "Skills"]
+
+
+def test_extract_docx_falls_back_to_python_docx():
+    def broken_engine(stream, target_chars):
+        raise RuntimeError("engine failure")
+
+    with patch.dict(document_parser._DOCX_ENGINES, {"xml": broken_engine}):
+        text = extract_text(_templated_docx(), DOCX_TYPE)
+    assert text == "Experience\nSkills"
@@ -0,0 +1,121 @@
+import asyncio
+import io
+import multiprocessing
+import time
+
+import pytest
+from docx import Document
+from unittest.mock import patch
+
+from app.services import extraction_pool
+from app.services.document_parser import DOCX_TYPE
+from tests.conftest import make_pdf
+
+
+def _make_docx(*paragraphs: str) -> bytes:
+    doc = Document()
+    for text in paragraphs:
+        doc.add_paragraph(text)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_extract_docx_in_process_pool():
+    extraction_pool.init_extraction_pool()
+    try:
+        text = await extraction_pool.extract_text_async(
+            _make_docx("Jane Roe", "Senior Engineer"),
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        )
+    finally:
+        extraction_pool.shutdown_extraction_pool()
+    assert "Jane Roe" in text
+    assert "Senior Engineer" in text
+
+
+@pytest.mark.asyncio
+async def test_queue_full_returns_503(client, api_headers):
+    with patch.object(extraction_pool, "_pool", object()), patch.object(extraction_pool, "_pending", 10**6):
+        response = await client.post(
+            "/parse",
+            headers=api_headers,
+            files={"file": ("resume.pdf", b"%PDF-1.4 fake", "application/pdf")},
+        )
+    assert response.status_code == 503
+    assert "retry-after" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_plain_text_bypasses_pool(client, api_headers):
+    with patch.object(extraction_pool, "_pool", object()), patch.object(extraction_pool, "_pending", 10**6):
+        response = await client.post(
+            "/parse",
+            headers=api_headers,
+            files={"file": ("resume.txt", b"John Doe, Python Developer", "text/plain")},
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_pdf_page_ranges_extracted_in_parallel(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(make_pdf([[f"Page {n} content"] for n in range(1, 8)]))
+
+    extraction_pool.init_extraction_pool()
+    try:
+        with patch.object(extraction_pool, "PDF_PAGES_PER_TASK", 2):
+            text = await extraction_pool.extract_text_async(path, "application/pdf")
+    finally:
+        extraction_pool.shutdown_extraction_pool()
+    assert [page.strip() for page in text.split("\f")] == [f"Page {n} content" for n in range(1, 8)]
+
+
+def _hang(*args):
+    time.sleep(60)
+
+
+@pytest.mark.asyncio
+async def test_timeout_recycles_pool_and_kills_stuck_worker():
+    extraction_pool.init_extraction_pool()
+    try:
+        stuck_pool = extraction_pool._pool
+        with (
+            patch.object(extraction_pool, "extract_text", _hang),
+            patch.object(extraction_pool, "EXTRACTION_TIMEOUT", 0.5),
+        ):
+            with pytest.raises(TimeoutError):
+                await extraction_pool.extract_text_async(b"stuck", DOCX_TYPE)
+        # The fresh pool starts its workers on first use, so these are the old pool's
+        stuck_workers = multiprocessing.active_children()
+
+        # The slot is released right away and new work goes to a fresh pool
+        assert extraction_pool._pending == 0
+        assert extraction_pool._pool is not stuck_pool
+        assert await extraction_pool.extract_text_async(_make_docx("Jane Roe"), DOCX_TYPE) == "Jane Roe"
+
+        await asyncio.sleep(1)
+        assert stuck_workers and not any(process.is_alive() for process in stuck_workers)
+    finally:
+        extraction_pool.shutdown_extraction_pool()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_timeouts_recycle_the_pool_once():
+    extraction_pool.init_extraction_pool()
+    try:
+        with (
+            patch.object(extraction_pool, "extract_text", _hang),
+            patch.object(extraction_pool, "EXTRACTION_TIMEOUT", 0.5),
+            patch.object(extraction_pool, "_create_pool", wraps=extraction_pool._create_pool) as create_pool,
+        ):
+            results = await asyncio.gather(
+                *(extraction_pool.extract_text_async(b"stuck", DOCX_TYPE) for _ in range(3)),
+                return_exceptions=True,
+            )
+            assert all(isinstance(result, TimeoutError) for result in results)
+            assert create_pool.call_count == 1
+            await asyncio.sleep(1)  # lets the stuck workers be killed
+    finally:
+        extraction_pool.shutdown_extraction_pool()
@@ -14,3 +14,17 @@ async def test_health_endpoint(client):
 async def test_health_returns_request_id(client):
     response = await client.get("/")
     assert "x-request-id" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_client_request_id_is_echoed(client):
+    response = await client.get("/", headers={"X-Request-ID": "abc-123"})
+    assert response.headers["x-request-id"] == "abc-123"
+
+
+@pytest.mark.asyncio
+async def test_server_timing_lists_stages(client, api_headers):
+    response = await client.post("/parse/text", headers=api_headers, params={"text": "Jane Roe\nEngineer"})
+    timing = response.headers["server-timing"]
+    assert "llm;dur=" in timing
+    assert timing.split(", ")[-1].startswith("app;dur=")
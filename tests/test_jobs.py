@@ -0,0 +1,164 @@
+import asyncio
+import socket
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services import jobs
+from app.services.result_cache import clear_local_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_local_cache()
+    yield
+    clear_local_cache()
+
+
+def _resolves_to(address: str):
+    return patch("socket.getaddrinfo", return_value=[(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, 443))])
+
+
+@pytest.mark.asyncio
+async def test_create_and_poll_text_job(client, api_headers):
+    response = await client.post("/jobs", headers=api_headers, data={"text": "Jane Roe, SRE"})
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+
+    await jobs.process_job(job["job_id"])
+
+    response = await client.get(f"/jobs/{job['job_id']}", headers=api_headers)
+    data = response.json()
+    assert data["status"] == "done"
+    assert data["result"]["success"] is True
+    assert data["result"]["data"]["contact"]["name"] == "John Doe"
+
+
+@pytest.mark.asyncio
+async def test_file_job_processed_by_worker(client, fake_redis, api_headers):
+    response = await client.post(
+        "/jobs",
+        headers=api_headers,
+        files={"file": ("resume.txt", b"John Doe, Python Developer", "text/plain")},
+    )
+    job_id = response.json()["job_id"]
+
+    stop = asyncio.Event()
+    worker = asyncio.create_task(jobs.run_worker("test-worker", stop))
+    for _ in range(50):
+        if (await fake_redis.hget(f"job:{job_id}", "status")) == "done":
+            break
+        await asyncio.sleep(0.05)
+    stop.set()
+    await worker
+
+    data = (await client.get(f"/jobs/{job_id}", headers=api_headers)).json()
+    assert data["status"] == "done"
+    assert data["filename"] == "resume.txt"
+    assert not await fake_redis.exists(f"job:{job_id}:payload")
+    assert await fake_redis.xpending(jobs.JOB_STREAM, jobs.JOB_GROUP) == {
+        "pending": 0, "min": None, "max": None, "consumers": []
+    }
+
+
+@pytest.mark.asyncio
+async def test_webhook_delivered_on_completion(client, api_headers):
+    with _resolves_to("93.184.215.14"):
+        response = await client.post(
+            "/jobs",
+            headers=api_headers,
+            data={"text": "Jane Roe, SRE", "webhook_url": "https://example.com/hook"},
+        )
+    job_id = response.json()["job_id"]
+
+    with patch("app.services.jobs.deliver_webhook", AsyncMock()) as deliver:
+        await jobs.process_job(job_id)
+    deliver.assert_awaited_once()
+    assert deliver.await_args.args[:3] == ("https://example.com/hook", job_id, "done")
+
+
+@pytest.mark.asyncio
+async def test_job_requires_exactly_one_input(client, api_headers):
+    assert (await client.post("/jobs", headers=api_headers, data={})).status_code == 400
+    response = await client.post(
+        "/jobs",
+        headers=api_headers,
+        data={"text": "Jane"},
+        files={"file": ("resume.txt", b"Jane", "text/plain")},
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_job_hidden_from_other_keys(client, api_headers):
+    job_id = (await client.post("/jobs", headers=api_headers, data={"text": "Jane"})).json()["job_id"]
+    with patch.dict("app.middleware.auth.API_KEYS", {"other-key": "pro"}):
+        response = await client.get(f"/jobs/{job_id}", headers={"X-API-Key": "other-key"})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_webhook_to_internal_address_rejected(client, api_headers):
+    for url in ("http://127.0.0.1:8000/hook", "http://169.254.169.254/latest/meta-data", "ftp://example.com/"):
+        response = await client.post("/jobs", headers=api_headers, data={"text": "Jane", "webhook_url": url})
+        assert response.status_code == 400, url
+
+    # A public name resolving to a private address is refused when queued and on delivery
+    with _resolves_to("10.0.0.5"):
+        response = await client.post(
+            "/jobs", headers=api_headers, data={"text": "Jane", "webhook_url": "https://hooks.example.com/"}
+        )
+        assert response.status_code == 400
+        with pytest.raises(jobs.WebhookRejected):
+            await jobs.resolve_webhook("https://hooks.example.com/")
+
+    with _resolves_to("93.184.215.14"):
+        assert await jobs.resolve_webhook("https://hooks.example.com:8443/x?y=1") == (
+            "https://93.184.215.14:8443/x?y=1",
+            "hooks.example.com:8443",
+        )
+
+
+@pytest.mark.asyncio
+async def test_crashing_job_fails_after_max_attempts(client, fake_redis, api_headers):
+    job_id = (await client.post("/jobs", headers=api_headers, data={"text": "Jane"})).json()["job_id"]
+    await jobs._ensure_group()
+    entry_id, fields = (await fake_redis.xreadgroup(jobs.JOB_GROUP, "w1", {jobs.JOB_STREAM: ">"}))[0][1][0]
+
+    with patch("app.services.jobs.parse_text", AsyncMock(side_effect=RuntimeError("boom"))):
+        for _ in range(jobs.JOB_MAX_ATTEMPTS - 1):
+            await jobs._handle_entry(entry_id, fields)
+            assert (await fake_redis.xpending(jobs.JOB_STREAM, jobs.JOB_GROUP))["pending"] == 1
+        await jobs._handle_entry(entry_id, fields)
+
+    data = (await client.get(f"/jobs/{job_id}", headers=api_headers)).json()
+    assert data["status"] == "failed"
+    assert "attempts" in data["result"]["error"]
+    assert (await fake_redis.xpending(jobs.JOB_STREAM, jobs.JOB_GROUP))["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_redis_errors(client, fake_redis, api_headers):
+    job_id = (await client.post("/jobs", headers=api_headers, data={"text": "Jane"})).json()["job_id"]
+    original = fake_redis.xautoclaim
+    failures = []
+
+    async def flaky_claim(*args, **kwargs):
+        if not failures:
+            failures.append(1)
+            raise ConnectionError("redis down")
+        return await original(*args, **kwargs)
+
+    stop = asyncio.Event()
+    with patch.object(jobs, "READ_BACKOFF", 0.01), patch.object(fake_redis, "xautoclaim", flaky_claim):
+        worker = asyncio.create_task(jobs.run_worker("test-worker", stop))
+        for _ in range(50):
+            if (await fake_redis.hget(f"job:{job_id}", "status")) == "done":
+                break
+            await asyncio.sleep(0.05)
+        stop.set()
+        await worker
+
+    assert failures
+    assert (await fake_redis.hget(f"job:{job_id}", "status")) == "done"
@@ -0,0 +1,50 @@
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+from unittest.mock import patch
+
+from app.services import admission
+from app.services.admission import AdmissionController
+from app.services.llm_http import create_llm_http_client
+
+
+def _metric(name: str) -> float:
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+class _Body(httpx.AsyncByteStream):
+    """Streamed like a network response, so the connection is held until it is read."""
+
+    async def __aiter__(self):
+        yield b'{"ok": true}'
+
+
+@pytest.mark.asyncio
+async def test_shared_client_releases_connection_and_reports_rate_limits():
+    def handler(request):
+        headers = {"anthropic-ratelimit-requests-limit": "100", "anthropic-ratelimit-requests-remaining": "5"}
+        return httpx.Response(200, headers=headers, stream=_Body())
+
+    controller = AdmissionController(max_in_flight=8, max_queue=10, max_wait=1)
+    active = _metric("resume_parser_llm_http_active_requests")
+    with patch.object(admission, "controller", controller):
+        async with create_llm_http_client(httpx.MockTransport(handler)) as client:
+            response = await client.post("https://api.anthropic.com/v1/messages", json={})
+            assert response.json() == {"ok": True}
+    assert _metric("resume_parser_llm_http_active_requests") == active
+    # Under 10% of the provider's request budget left: back off by one
+    assert controller.limit == 7
+
+
+@pytest.mark.asyncio
+async def test_pool_timeout_is_counted():
+    def handler(request):
+        raise httpx.PoolTimeout("no free connection", request=request)
+
+    timeouts = _metric("resume_parser_llm_http_pool_timeouts_total")
+    active = _metric("resume_parser_llm_http_active_requests")
+    async with create_llm_http_client(httpx.MockTransport(handler)) as client:
+        with pytest.raises(httpx.PoolTimeout):
+            await client.get("https://api.openai.com/v1/models")
+    assert _metric("resume_parser_llm_http_pool_timeouts_total") == timeouts + 1
+    assert _metric("resume_parser_llm_http_active_requests") == active
@@ -0,0 +1,103 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.models.schemas import ContactInfo
+from app.services.local_extractor import extract_contact, extract_skills, find_sections, merge_contact, strip_for_llm
+from app.services.result_cache import clear_local_cache
+from tests.conftest import MOCK_PARSED_DATA, MOCK_TOKEN_USAGE
+
+RESUME = """Jane Roe
+Berlin, Germany | jane.roe@example.com | +49 30 1234 5678
+linkedin.com/in/janeroe | github.com/janeroe
+
+EXPERIENCE
+Acme Corp, Staff Engineer, 2019 - 2023
+
+Skills
+Languages: Python, Go
+• Kubernetes; Terraform
+
+References
+Available on request.
+"""
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_local_cache()
+    yield
+    clear_local_cache()
+
+
+def test_contact_and_skills_extracted_locally():
+    sections = find_sections(RESUME)
+    assert [name for name, _ in sections] == ["header", "experience", "skills", "unused"]
+
+    contact = extract_contact(sections)
+    assert contact.name == "Jane Roe"
+    assert contact.email == "jane.roe@example.com"
+    assert contact.phone == "+49 30 1234 5678"
+    assert contact.linkedin == "linkedin.com/in/janeroe"
+    assert contact.github == "github.com/janeroe"
+    assert extract_skills(sections) == ["Python", "Go", "Kubernetes", "Terraform"]
+
+
+@pytest.mark.parametrize("value", ["01.2019 - 03.2021", "123456789"])
+def test_dates_and_ids_are_not_phone_numbers(value):
+    sections = find_sections(f"Jane Roe\nACME GmbH, ID {value}")
+    assert extract_contact(sections).phone is None
+    assert value in strip_for_llm(sections)
+
+
+def test_phone_only_searched_in_the_header():
+    sections = find_sections("EXPERIENCE\nAcme Corp, hotline +1 555 123 4567")
+    assert extract_contact(sections).phone is None
+
+
+def test_local_phone_only_fills_a_missing_llm_phone():
+    local = ContactInfo(phone="+1 555 123 4567", email="jane@example.com")
+    merged = merge_contact(ContactInfo(phone="+49 30 1234 5678", email="j@example.com"), local)
+    assert merged.phone == "+49 30 1234 5678"
+    assert merged.email == "jane@example.com"
+    assert merge_contact(ContactInfo(), local).phone == "+1 555 123 4567"
+
+
+def test_llm_text_drops_extracted_contact_and_unused_sections():
+    llm_text = strip_for_llm(find_sections(RESUME))
+    assert "Berlin, Germany" in llm_text
+    assert "Acme Corp" in llm_text
+    assert "jane.roe@example.com" not in llm_text
+    assert "linkedin" not in llm_text
+    assert "Available on request" not in llm_text
+
+
+@pytest.mark.asyncio
+async def test_fast_mode_skips_llm(client, api_headers):
+    mock_extract = AsyncMock(return_value=(MOCK_PARSED_DATA, MOCK_TOKEN_USAGE))
+    with patch("app.services.pipeline.extract_resume_data", mock_extract):
+        response = await client.post(
+            "/parse",
+            headers=api_headers,
+            params={"mode": "fast"},
+            files={"file": ("resume.txt", RESUME.encode(), "text/plain")},
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["tokens_used"] == 0
+    assert data["data"]["contact"]["email"] == "jane.roe@example.com"
+    assert "Terraform" in data["data"]["skills"]
+    mock_extract.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_full_mode_merges_local_contact(client, api_headers):
+    mock_extract = AsyncMock(return_value=(MOCK_PARSED_DATA, MOCK_TOKEN_USAGE))
+    with patch("app.services.pipeline.extract_resume_data", mock_extract):
+        response = await client.post("/parse/text", headers=api_headers, params={"text": RESUME})
+
+    contact = response.json()["data"]["contact"]
+    assert contact["name"] == "John Doe"  # the LLM's name wins
+    assert contact["email"] == "jane.roe@example.com"  # pattern matches win
+    assert contact["github"] == "github.com/janeroe"
+    assert "jane.roe@example.com" not in mock_extract.await_args.args[0]
@@ -0,0 +1,41 @@
+import json
+import logging
+import queue
+from unittest.mock import patch
+
+from app import logging_config
+from app.logging_config import DroppingQueueHandler, JsonFormatter, SamplingFilter, request_fields_var
+
+
+def _record(msg: str, *args, level=logging.INFO, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_escapes_messages_and_keeps_extras():
+    line = JsonFormatter().format(_record('said "hi" %s', "twice", provider="openai", _private=1))
+    entry = json.loads(line)
+    assert entry["msg"] == 'said "hi" twice'
+    assert entry["provider"] == "openai"
+    assert "_private" not in entry
+
+
+def test_unsampled_requests_keep_only_warnings():
+    token = request_fields_var.set({})
+    try:
+        with patch.dict(logging_config.LOG_SAMPLE_RATES, {"heavy-key": 0.0}):
+            logging_config.sample_request("heavy-key", "mega")
+        sampling = SamplingFilter()
+        assert not sampling.filter(_record("access line"))
+        assert sampling.filter(_record("provider failed", level=logging.WARNING))
+    finally:
+        request_fields_var.reset(token)
+
+
+def test_full_log_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(1))
+    handler.emit(_record("first"))
+    handler.emit(_record("second"))
+    assert handler.queue.get_nowait().msg == "first"
+    assert handler.queue.empty()
@@ -0,0 +1,41 @@
+import pytest
+
+from app.services.result_cache import clear_local_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_local_cache()
+    yield
+    clear_local_cache()
+
+
+def _sample(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+@pytest.mark.asyncio
+async def test_metrics_record_pipeline_stages(client, api_headers):
+    before = (await client.get("/metrics")).text
+    await client.post(
+        "/parse",
+        headers=api_headers,
+        files={"file": ("resume.txt", b"Jane Roe, Rust developer", "text/plain")},
+    )
+    await client.post("/parse/text", params={"text": "Jane Roe, Rust developer"}, headers=api_headers)
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    after = response.text
+    for stage, outcome in [("upload", "ok"), ("extract_text", "ok"), ("llm", "ok"), ("cache_lookup", "hit")]:
+        provider = "openai" if stage == "llm" else "none"
+        prefix = (
+            f'resume_parser_stage_seconds_count{{content_type="txt",outcome="{outcome}",'
+            f'provider="{provider}",stage="{stage}"}}'
+        )
+        assert _sample(after, prefix) == _sample(before, prefix) + 1, stage
+    assert _sample(after, 'resume_parser_cache_lookups_total{result="hit_local"}') > 0
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from app.middleware import auth
+from app.services import ocr
+from tests.conftest import make_pdf
+
+TEXT_PAGE = "Jane Roe\njane@example.com\nBackend engineer with ten years of Python experience"
+
+
+@pytest.fixture(autouse=True)
+def thread_pool():
+    # Threads instead of processes so the patched page functions are used
+    with ThreadPoolExecutor(max_workers=2) as pool, patch.object(ocr, "_pool", pool):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_only_sparse_pages_are_ocred_and_cached(fake_redis):
+    texts = [TEXT_PAGE, "", " 2 "]
+    fake_ocr = MagicMock(side_effect=lambda source, index, timeout: f"scanned page {index + 1}")
+    with (
+        patch.object(auth, "_redis", fake_redis),
+        patch.object(ocr, "page_digests", lambda source, indexes: [f"digest-{i}" for i in indexes]),
+        patch.object(ocr, "ocr_page", fake_ocr),
+    ):
+        first = await ocr.ocr_sparse_pages(b"%PDF", texts)
+        second = await ocr.ocr_sparse_pages(b"%PDF", texts)
+
+    assert first == second == [TEXT_PAGE, "scanned page 2", "scanned page 3"]
+    assert sorted(call.args[1] for call in fake_ocr.call_args_list) == [1, 2]
+    assert await fake_redis.get("ocr_cache:digest-1") == "scanned page 2"
+    assert ocr._pending == 0
+
+
+@pytest.mark.asyncio
+async def test_pages_without_images_or_over_queue_are_left_alone():
+    pdf = make_pdf([TEXT_PAGE.split("\n"), ["p. 2"]])
+    assert ocr.page_digests(pdf, [0, 1]) == [None, None]
+
+    fake_ocr = MagicMock(return_value="scanned")
+    with patch.object(ocr, "ocr_page", fake_ocr):
+        assert await ocr.ocr_sparse_pages(pdf, [TEXT_PAGE, "p. 2"]) == [TEXT_PAGE, "p. 2"]
+        with patch.object(ocr, "OCR_MAX_QUEUE", 0):
+            assert await ocr.ocr_sparse_pages(pdf, ["", ""]) == ["", ""]
+    fake_ocr.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_page_still_being_read_counts_until_its_worker_is_done():
+    release = threading.Event()
+    with (
+        patch.object(ocr, "OCR_TIMEOUT", 0.1),
+        patch.object(ocr, "page_digests", lambda source, indexes: [f"digest-{i}" for i in indexes]),
+        patch.object(ocr, "ocr_page", lambda source, index, timeout: release.wait(5) and "scanned"),
+    ):
+        assert await ocr.ocr_sparse_pages(b"%PDF", [""]) == [""]
+        await asyncio.sleep(0.05)
+        # The budget ran out but the worker is still busy with the page
+        assert ocr._pending == 1
+        release.set()
+        for _ in range(50):
+            if ocr._pending == 0:
+                break
+            await asyncio.sleep(0.01)
+    assert ocr._pending == 0
@@ -0,0 +1,150 @@
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from app.services import ai_extractor
+from app.services.provider_health import ProviderStats
+from tests.conftest import MOCK_PARSED_DATA, MOCK_TOKEN_USAGE
+
+
+@pytest.fixture
+def providers():
+    stats = {"openai": ProviderStats("openai"), "anthropic": ProviderStats("anthropic")}
+    calls = []
+
+    def make(name, delay=0.0, fail=False):
+        async def extract(text):
+            calls.append(name)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                calls.append(f"{name}-cancelled")
+                raise
+            if fail:
+                raise RuntimeError(f"{name} down")
+            return MOCK_PARSED_DATA, MOCK_TOKEN_USAGE.model_copy(update={"provider": name})
+        return extract
+
+    def configure(openai=None, anthropic=None, **overrides):
+        extractors = {"openai": make("openai", **(openai or {})), "anthropic": make("anthropic", **(anthropic or {}))}
+        return [
+            patch.object(ai_extractor, "_openai_client", object()),
+            patch.object(ai_extractor, "_anthropic_client", object()),
+            patch.object(ai_extractor, "provider_stats", stats),
+            patch.dict(ai_extractor._EXTRACTORS, extractors),
+            *(patch.object(ai_extractor, key, value) for key, value in overrides.items()),
+        ]
+
+    return configure, stats, calls
+
+
+async def _run(patches):
+    for p in patches:
+        p.start()
+    try:
+        return await ai_extractor.extract_resume_data("resume")
+    finally:
+        for p in reversed(patches):
+            p.stop()
+
+
+@pytest.mark.asyncio
+async def test_hedge_fires_secondary_and_cancels_slow_primary(providers):
+    configure, _, calls = providers
+    patches = configure(
+        openai={"delay": 5}, HEDGE_ENABLED=True, HEDGE_DEFAULT_DELAY=0.05, HEDGE_MIN_DELAY=0.01
+    )
+    _, usage = await asyncio.wait_for(_run(patches), timeout=1)
+    assert usage.provider == "anthropic"
+    await asyncio.sleep(0)
+    assert calls == ["openai", "anthropic", "openai-cancelled"]
+
+
+@pytest.mark.asyncio
+async def test_hedge_not_needed_when_primary_is_fast(providers):
+    configure, _, calls = providers
+    patches = configure(HEDGE_ENABLED=True, HEDGE_DEFAULT_DELAY=0.5)
+    _, usage = await _run(patches)
+    assert usage.provider == "openai"
+    assert calls == ["openai"]
+
+
+@pytest.mark.asyncio
+async def test_timeout_falls_back(providers):
+    configure, _, _ = providers
+    patches = configure(openai={"delay": 5}, _TIMEOUTS={"openai": 0.05, "anthropic": 1})
+    _, usage = await asyncio.wait_for(_run(patches), timeout=1)
+    assert usage.provider == "anthropic"
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_skips_failing_provider(providers):
+    configure, stats, calls = providers
+    with patch("app.services.provider_health.CIRCUIT_BREAKER_THRESHOLD", 3):
+        for _ in range(3):
+            await _run(configure(openai={"fail": True}))
+        assert not stats["openai"].is_available()
+
+        calls.clear()
+        _, usage = await _run(configure(openai={"fail": True}))
+    assert usage.provider == "anthropic"
+    assert calls == ["anthropic"]
+
+
+@pytest.mark.asyncio
+async def test_half_open_secondary_keeps_its_probe_until_it_is_called(providers):
+    configure, stats, calls = providers
+    with patch("app.services.provider_health.CIRCUIT_BREAKER_THRESHOLD", 3):
+        for _ in range(3):
+            stats["anthropic"].record_failure()
+        stats["anthropic"].open_until = 0.0  # cooldown over
+
+        _, usage = await _run(configure())
+        assert usage.provider == "openai"
+        assert stats["anthropic"].is_available()
+
+        calls.clear()
+        _, usage = await _run(configure(openai={"fail": True}))
+    assert usage.provider == "anthropic"
+    assert calls == ["openai", "anthropic"]
+    assert stats["anthropic"].consecutive_failures == 0
+
+
+def test_latency_percentile_needs_samples():
+    stats = ProviderStats("openai")
+    for latency in range(1, 11):
+        stats.record_success(float(latency))
+    assert stats.latency_percentile(0.95) is None
+    for latency in range(11, 101):
+        stats.record_success(float(latency))
+    assert stats.latency_percentile(0.95) == 96.0
+
+
+def test_half_open_circuit_lets_one_probe_through():
+    stats = ProviderStats("openai")
+    with (
+        patch("app.services.provider_health.CIRCUIT_BREAKER_THRESHOLD", 2),
+        patch("app.services.provider_health.CIRCUIT_BREAKER_COOLDOWN", 30),
+        patch("app.services.provider_health.time.monotonic") as clock,
+    ):
+        clock.return_value = 100.0
+        stats.record_failure()
+        stats.record_failure()
+        assert not stats.is_available()
+
+        clock.return_value = 131.0
+        assert stats.is_available()
+        assert stats.try_acquire_probe()
+        assert not stats.try_acquire_probe()
+        assert not stats.is_available()
+
+        stats.record_failure()
+        clock.return_value = 140.0
+        assert not stats.try_acquire_probe()
+
+        clock.return_value = 171.0
+        assert stats.try_acquire_probe()
+        stats.record_success(1.0)
+        assert stats.try_acquire_probe()
+        assert stats.try_acquire_probe()
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from unittest.mock import patch
+
+from app.middleware import auth
+
+
+@pytest.fixture
+def redis(fake_redis):
+    with patch.object(auth, "_redis", fake_redis):
+        yield fake_redis
+    auth._leases.clear()
+
+
+async def _try(api_key: str, cost: int = 1) -> bool:
+    try:
+        await auth.check_rate_limit(api_key, cost)
+        return True
+    except HTTPException as e:
+        assert e.status_code == 429
+        return False
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_never_overshoot(redis):
+    results = await asyncio.gather(*(_try("demo-key-123") for _ in range(60)))
+    assert results.count(True) == 50
+    assert await redis.get(f"usage:demo-key-123:{auth._get_month_key()}") == "50"
+    assert await redis.ttl(f"usage:demo-key-123:{auth._get_month_key()}") > 0
+
+
+@pytest.mark.asyncio
+async def test_cost_larger_than_remaining_is_rejected(redis):
+    await redis.set(f"usage:demo-key-123:{auth._get_month_key()}", 48)
+    assert await _try("demo-key-123", cost=3) is False
+    assert await _try("demo-key-123", cost=2) is True
+
+
+@pytest.mark.asyncio
+async def test_lease_mode_serves_locally_and_releases(redis):
+    redis_key = f"usage:mega-key:{auth._get_month_key()}"
+    with patch.dict(auth.API_KEYS, {"mega-key": "mega"}), patch.object(auth, "RATE_LIMIT_LEASE_SIZE", 20):
+        for _ in range(25):
+            assert await _try("mega-key")
+        assert await redis.get(redis_key) == "40"
+
+        await auth.release_leases()
+        assert await redis.get(redis_key) == "25"
+
+
+@pytest.mark.asyncio
+async def test_lease_never_exceeds_limit(redis):
+    redis_key = f"usage:mega-key:{auth._get_month_key()}"
+    await redis.set(redis_key, 100000 - 5)
+    with patch.dict(auth.API_KEYS, {"mega-key": "mega"}), patch.object(auth, "RATE_LIMIT_LEASE_SIZE", 20):
+        results = [await _try("mega-key") for _ in range(8)]
+    assert results.count(True) == 5
+    assert await redis.get(redis_key) == "100000"
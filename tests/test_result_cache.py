@@ -0,0 +1,46 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.result_cache import make_cache_key, clear_local_cache
+from tests.conftest import MOCK_PARSED_DATA, MOCK_TOKEN_USAGE
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_local_cache()
+    yield
+    clear_local_cache()
+
+
+def test_cache_key_ignores_whitespace():
+    assert make_cache_key("John  Doe\n\nPython") == make_cache_key(" John Doe Python ")
+    assert make_cache_key("John Doe") != make_cache_key("Jane Doe")
+
+
+@pytest.mark.asyncio
+async def test_repeated_text_served_from_cache(client, api_headers):
+    mock_extract = AsyncMock(return_value=(MOCK_PARSED_DATA, MOCK_TOKEN_USAGE))
+    with patch("app.services.pipeline.extract_resume_data", mock_extract):
+        first = await client.post("/parse/text", params={"text": "John Doe, Go developer"}, headers=api_headers)
+        second = await client.post("/parse/text", params={"text": "John Doe,  Go developer"}, headers=api_headers)
+
+    assert first.headers["x-cache"] == "MISS"
+    assert first.json()["cached"] is False
+    assert second.headers["x-cache"] == "HIT"
+    assert second.json()["cached"] is True
+    assert second.json()["tokens_used"] == 0
+    assert second.json()["data"]["contact"]["name"] == "John Doe"
+    mock_extract.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cache_shared_through_redis(client, fake_redis, api_headers):
+    mock_extract = AsyncMock(return_value=(MOCK_PARSED_DATA, MOCK_TOKEN_USAGE))
+    with patch("app.services.pipeline.extract_resume_data", mock_extract):
+        await client.post("/parse/text", params={"text": "Jane Roe, Rust"}, headers=api_headers)
+        clear_local_cache()  # simulate another worker
+        response = await client.post("/parse/text", params={"text": "Jane Roe, Rust"}, headers=api_headers)
+
+    assert response.json()["cached"] is True
+    assert await fake_redis.exists(make_cache_key("Jane Roe, Rust"))
+    mock_extract.assert_awaited_once()
@@ -0,0 +1,90 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.result_cache import clear_local_cache
+from app.services.similarity import minhash, similarity
+from tests.conftest import MOCK_TOKEN_USAGE
+
+RESUME = """Jane Roe
+Berlin, Germany | jane.roe@example.com | +49 30 1234 5678
+
+SUMMARY
+Backend engineer focused on distributed systems and developer tooling.
+
+EXPERIENCE
+Acme Corp, Staff Engineer, 2019 - present
+Led the migration of the billing platform to an event-driven architecture.
+Reduced p99 latency of the checkout API from 800ms to 120ms.
+Mentored six engineers and ran the on-call rotation.
+Globex, Senior Engineer, 2015 - 2019
+Built the internal deployment pipeline used by forty services.
+Replaced nightly batch reports with a streaming analytics job.
+
+EDUCATION
+MSc Computer Science, Technical University of Munich, 2014
+
+SKILLS
+Python, Go, PostgreSQL, Kafka, Kubernetes, Terraform
+"""
+NEW_BULLET = "Introduced contract testing between the payment services."
+UPDATED = RESUME.replace("+49 30 1234 5678", "+49 30 8765 4321").replace(
+    "Mentored six engineers", f"{NEW_BULLET}\nMentored six engineers"
+)
+
+FIRST_PARSE = {
+    "contact": {"name": "Jane Roe"},
+    "summary": "Backend engineer",
+    "skills": ["Python", "Go"],
+    "experience": [{"company": "Acme Corp"}, {"company": "Globex"}],
+    "education": [{"institution": "Technical University of Munich"}],
+}
+PARTIAL_PARSE = {"experience": [{"company": "Acme Corp", "description": NEW_BULLET}, {"company": "Globex"}]}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_local_cache()
+    yield
+    clear_local_cache()
+
+
+def test_minhash_separates_edits_from_other_resumes():
+    # Same layout and skills, different person and history
+    header = RESUME.split("EXPERIENCE")[0]
+    other = header.replace("Jane Roe", "John Smith") + """EXPERIENCE
+Initech, Data Engineer, 2017 - present
+Designed the warehouse schema for marketing attribution.
+Cut the cost of the nightly ETL jobs in half.
+Hooli, Analyst, 2013 - 2017
+Maintained revenue dashboards for the sales team.
+
+EDUCATION
+BSc Statistics, University of Vienna, 2012
+
+SKILLS
+Python, Go, PostgreSQL, Kafka, Kubernetes, Terraform
+"""
+
+    assert similarity(minhash(RESUME), minhash(UPDATED)) >= 0.8
+    assert similarity(minhash(RESUME), minhash(other)) < 0.8
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_reuses_earlier_result(client, api_headers):
+    mock_extract = AsyncMock(side_effect=[(FIRST_PARSE, MOCK_TOKEN_USAGE), (PARTIAL_PARSE, MOCK_TOKEN_USAGE)])
+    with patch("app.services.pipeline.extract_resume_data", mock_extract):
+        first = (await client.post("/parse/text", headers=api_headers, params={"text": RESUME})).json()
+        second = (
+            await client.post("/parse/text", headers=api_headers, params={"text": UPDATED, "reuse_similar": "true"})
+        ).json()
+
+    assert first["similar_to"] is None
+    assert second["similar_to"]["resume_id"] == first["resume_id"]
+    assert second["similar_to"]["reparsed_sections"] == ["experience"]
+    # Only the changed section was sent to the LLM
+    llm_input = mock_extract.await_args_list[1].args[0]
+    assert NEW_BULLET in llm_input and "Technical University" not in llm_input
+    data = second["data"]
+    assert data["experience"][0]["description"] == NEW_BULLET
+    assert data["education"] == first["data"]["education"]
+    assert data["contact"]["phone"] == "+49 30 8765 4321"
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.middleware.auth import _get_month_key
+from app.services import admission
+from app.services.admission import AdmissionController
+from app.services.document_parser import PAGE_BREAK
+from app.services.result_cache import clear_local_cache
+from app.services.splitter import split_candidates
+from tests.conftest import MOCK_PARSED_DATA, MOCK_TOKEN_USAGE, make_pdf
+
+ALICE = ["Alice Martin", "alice@example.com | +1 555 010 2030", "Experience", "Acme Corp, Engineer"]
+ALICE_PAGE_2 = ["Alice Martin", "alice@example.com", "Education", "MIT"]
+BOB = ["Bob Stone", "bob@example.org", "Summary", "Data engineer"]
+BOB_PAGE_2 = ["Globex Inc", "Senior Analyst", "Skills", "SQL, Spark"]
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_local_cache()
+    yield
+    clear_local_cache()
+
+
+def test_split_on_new_contact_block_only():
+    pages = [ALICE, ALICE_PAGE_2, BOB, BOB_PAGE_2]
+    text = PAGE_BREAK.join("\n".join(lines) for lines in pages)
+
+    candidates = split_candidates(text)
+    assert len(candidates) == 2
+    assert "MIT" in candidates[0] and "Bob Stone" not in candidates[0]
+    assert candidates[1].count(PAGE_BREAK) == 1
+
+
+@pytest.mark.asyncio
+async def test_parse_split_returns_one_result_per_candidate(client, fake_redis, api_headers):
+    mock_extract = AsyncMock(return_value=(MOCK_PARSED_DATA, MOCK_TOKEN_USAGE))
+    pdf = make_pdf([ALICE, ALICE_PAGE_2, BOB, BOB_PAGE_2])
+    with patch("app.services.pipeline.extract_resume_data", mock_extract):
+        response = await client.post(
+            "/parse",
+            headers=api_headers,
+            params={"split": "true"},
+            files={"file": ("fair.pdf", pdf, "application/pdf")},
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [candidate["pages"] for candidate in data["candidates"]] == [2, 2]
+    assert [candidate["data"]["contact"]["email"] for candidate in data["candidates"]] == [
+        "alice@example.com",
+        "bob@example.org",
+    ]
+    assert mock_extract.await_count == 2
+    assert await fake_redis.get(f"usage:demo-key-123:{_get_month_key()}") == "2"
+
+
+@pytest.mark.asyncio
+async def test_split_waits_for_the_tiers_llm_slots(client, api_headers):
+    names = ["Alice Martin", "Bob Stone", "Carol White", "Dan Brown", "Eve Adams", "Frank Moore"]
+    pages = [[name, f"{name.split()[0].lower()}@example.com", "Skills", "Python"] for name in names]
+    in_flight = peak = 0
+
+    async def slow_extract(text):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return MOCK_PARSED_DATA, MOCK_TOKEN_USAGE
+
+    # Two free-tier slots, and waiting for one times out long before six calls finish
+    controller = AdmissionController(max_in_flight=8, max_queue=10, max_wait=0.08)
+    with (
+        patch.object(admission, "controller", controller),
+        patch.dict(admission.LLM_TIER_SHARES, {"free": 0.25}),
+        patch("app.services.pipeline.extract_resume_data", slow_extract),
+    ):
+        response = await client.post(
+            "/parse",
+            headers=api_headers,
+            params={"split": "true"},
+            files={"file": ("fair.pdf", make_pdf(pages), "application/pdf")},
+        )
+
+    candidates = response.json()["candidates"]
+    assert len(candidates) == 6
+    assert all(candidate["success"] for candidate in candidates)
+    assert peak == 2
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+# Libraries only needed once a request arrives; importing them at startup
+# slows down every new worker
+LAZY_MODULES = ("openai", "anthropic", "PyPDF2", "docx", "lxml", "pypdfium2", "httpx")
+# Cumulative import time of app.main, generous enough for slow CI machines
+IMPORT_BUDGET_US = int(os.getenv("IMPORT_TIME_BUDGET_MS", "1500")) * 1000
+
+
+def _import_times() -> dict[str, int]:
+    """Run `python -X importtime -c "import app.main"` and return cumulative microseconds per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_app_import_is_lazy_and_within_budget():
+    times = _import_times()
+    eager = [module for module in LAZY_MODULES if module in times]
+    assert not eager, f"imported at startup: {eager}"
+    assert times["app.main"] < IMPORT_BUDGET_US, f"app.main took {times['app.main'] / 1000:.0f}ms to import"
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.models.schemas import TokenUsage
+from app.services.result_cache import clear_local_cache
+from app.services.stream_parser import IncrementalJSONParser
+from tests.conftest import MOCK_PARSED_DATA, MOCK_TOKEN_USAGE
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_local_cache()
+    yield
+    clear_local_cache()
+
+
+RESUME = "Jane Roe\njane.roe@corp.example | +1 555 123 4567\nEXPERIENCE\nAcme, SRE"
+
+STREAMED_DOCUMENT = json.dumps({
+    "contact": {"name": "Jane Roe", "email": "jane@example.com"},
+    "summary": 'SRE, "reliability" first',
+    "skills": ["Go", "Kubernetes"],
+    "experience": [{"company": "Acme", "title": "SRE"}, {"company": "Initech"}],
+    "education": [],
+    "certifications": [],
+    "languages": [],
+}, indent=2)
+
+
+def _fake_stream(document: str, chunk_size: int = 7, inputs: list | None = None):
+    async def stream(text):
+        if inputs is not None:
+            inputs.append(text)
+        for i in range(0, len(document), chunk_size):
+            yield "text", document[i:i + chunk_size]
+        yield "usage", TokenUsage(input_tokens=300, cached_input_tokens=20, output_tokens=1)
+    return stream
+
+
+def test_parser_emits_fields_as_they_close():
+    parser = IncrementalJSONParser()
+    events = []
+    for i in range(0, len(STREAMED_DOCUMENT), 3):
+        events.extend(parser.feed(STREAMED_DOCUMENT[i:i + 3]))
+
+    assert [key for key, _ in events] == ["contact", "summary", "skills", "skills", "experience", "experience"]
+    assert events[1] == ("summary", 'SRE, "reliability" first')
+    assert parser.done
+    assert parser.document == json.loads(STREAMED_DOCUMENT)
+
+
+def test_parser_skips_markdown_fence():
+    parser = IncrementalJSONParser()
+    events = parser.feed('```json\n{"skills": ["Go"], "summary": null}\n```')
+    assert events == [("skills", "Go"), ("summary", None)]
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_sse(client, api_headers):
+    with patch("app.services.streaming.stream_resume_data", _fake_stream(STREAMED_DOCUMENT)):
+        response = await client.post("/parse/stream", headers=api_headers, data={"text": "Jane Roe, SRE"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [line.split(": ", 1)[1] for line in response.text.splitlines() if line.startswith("event: ")]
+    assert events == ["contact", "summary", "skills", "skills", "experience", "experience", "done"]
+    assert '"tokens_used": 321' in response.text
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_ndjson_uses_cache(client, api_headers):
+    headers = {**api_headers, "Accept": "application/x-ndjson"}
+    with patch("app.services.streaming.stream_resume_data", _fake_stream(STREAMED_DOCUMENT)):
+        await client.post("/parse/stream", headers=headers, data={"text": "Jane Roe, SRE"})
+        response = await client.post("/parse/stream", headers=headers, data={"text": "Jane Roe, SRE"})
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {"event": "contact", "data": {
+        "name": "Jane Roe", "email": "jane@example.com", "phone": None, "location": None,
+        "linkedin": None, "github": None, "website": None,
+    }}
+    assert lines[-1]["event"] == "done"
+    assert lines[-1]["data"]["tokens_used"] == 0
+    assert lines[-1]["data"]["cached"] is True
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_truncated_output(client, api_headers):
+    with patch("app.services.streaming.stream_resume_data", _fake_stream(STREAMED_DOCUMENT[:60])):
+        response = await client.post("/parse/stream", headers=api_headers, data={"text": "Jane"})
+    assert "event: error" in response.text
+
+
+@pytest.mark.asyncio
+async def test_stream_reads_the_same_text_as_parse_and_merges_local_contact(client, api_headers):
+    headers = {**api_headers, "Accept": "application/x-ndjson"}
+    inputs = []
+    with patch("app.services.streaming.stream_resume_data", _fake_stream(STREAMED_DOCUMENT, inputs=inputs)):
+        response = await client.post("/parse/stream", headers=headers, data={"text": RESUME})
+
+    contact = next(json.loads(line)["data"] for line in response.text.splitlines() if '"contact"' in line)
+    assert contact["name"] == "Jane Roe"
+    assert contact["email"] == "jane.roe@corp.example"  # pattern matches win
+    assert contact["phone"] == "+1 555 123 4567"  # fills the gap the LLM left
+    assert "jane.roe@corp.example" not in inputs[0]
+
+
+@pytest.mark.asyncio
+async def test_stream_and_parse_share_cache_entries(client, api_headers):
+    mock_extract = AsyncMock(return_value=(MOCK_PARSED_DATA, MOCK_TOKEN_USAGE))
+    with patch("app.services.pipeline.extract_resume_data", mock_extract):
+        await client.post("/parse/text", headers=api_headers, params={"text": RESUME})
+
+    headers = {**api_headers, "Accept": "application/x-ndjson"}
+    response = await client.post("/parse/stream", headers=headers, data={"text": RESUME})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0]["data"]["email"] == "jane.roe@corp.example"
+    assert lines[-1]["data"]["cached"] is True
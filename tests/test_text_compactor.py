@@ -0,0 +1,67 @@
+from unittest.mock import patch
+
+from app.services import text_compactor
+from app.services.document_parser import PAGE_BREAK
+from app.services.local_extractor import find_name
+from app.services.text_compactor import compact_text, count_tokens, split_sections
+
+
+def _page(body: str, number: int) -> str:
+    return f"ACME Resume Services\n{body}\nPage {number} of 3"
+
+
+def test_whitespace_normalized():
+    text, stats = compact_text("John   Doe\t\tEngineer\n\n\n\nPython,   Go\n   \n")
+    assert text == "John Doe Engineer\n\nPython, Go"
+    assert stats.original_chars > stats.compacted_chars
+    assert stats.truncated is False
+
+
+def test_repeated_headers_and_page_numbers_removed():
+    pages = [_page("Experience\nAcme Corp", 1), _page("Globex", 2), _page("Education\nMIT", 3)]
+    text, _ = compact_text(f"\n{PAGE_BREAK}\n".join(pages))
+    assert "Page" not in text
+    assert text.splitlines() == ["ACME Resume Services", "Experience", "Acme Corp", "Globex", "Education", "MIT"]
+
+
+def test_date_lines_are_not_page_numbers():
+    resume = "Jane Roe\nEducation\nMIT, BSc\n2019\nExperience\nAcme Corp\n06/2019\n2021\n- 2 -"
+    text, _ = compact_text(resume)
+    assert text.splitlines() == ["Jane Roe", "Education", "MIT, BSc", "2019", "Experience", "Acme Corp", "06/2019", "2021"]
+
+
+def test_name_repeated_in_page_headers_kept_once():
+    pages = ["Jane Roe\njane@example.com\nExperience\nAcme Corp", "Jane Roe\njane@example.com\nEducation\nMIT"]
+    text, _ = compact_text(PAGE_BREAK.join(pages))
+    assert text.count("Jane Roe") == 1
+    assert text.count("jane@example.com") == 1
+    assert find_name(text.splitlines()) == "Jane Roe"
+
+
+def test_truncation_keeps_every_section():
+    experience = "\n".join(f"- Did important thing number {i} at a company" for i in range(400))
+    resume = f"Jane Roe\njane@example.com\nEXPERIENCE\n{experience}\nEDUCATION\nMIT, BSc\nSKILLS\nPython, Go"
+    text, stats = compact_text(resume, max_tokens=500)
+
+    assert stats.truncated is True
+    assert count_tokens(text) <= 500
+    assert "jane@example.com" in text
+    assert "MIT, BSc" in text
+    assert "Python, Go" in text
+    assert "number 0 " in text
+    assert "number 399" not in text
+
+
+def test_split_sections_on_headings():
+    sections = split_sections(["Jane Roe", "Experience", "Acme", "SKILLS", "Go"])
+    assert sections == [["Jane Roe"], ["Experience", "Acme"], ["SKILLS", "Go"]]
+
+
+def test_non_ascii_text_estimated_at_a_token_per_character():
+    with (
+        patch.object(text_compactor, "AI_PROVIDER", "openai"),
+        patch.object(text_compactor, "_encoder_loaded", True),
+        patch.object(text_compactor, "_encoder", None),
+    ):
+        assert count_tokens("Иван Петров, инженер") == 17 + 1
+        assert count_tokens("a" * 40) == 10
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI, Request
+from httpx import AsyncClient, ASGITransport
+from unittest.mock import AsyncMock, patch
+
+from app.config import MAX_FILE_SIZE
+from app.middleware.body_limit import BodySizeLimitMiddleware
+
+
+@pytest.mark.asyncio
+async def test_declared_length_over_limit_is_rejected(client, api_headers):
+    response = await client.post(
+        "/parse",
+        headers=api_headers,
+        files={"file": ("resume.txt", b"x" * (MAX_FILE_SIZE + 1), "text/plain")},
+    )
+    assert response.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_streamed_body_stops_at_limit():
+    received = []
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        async for chunk in request.stream():
+            received.append(chunk)
+        return {"ok": True}
+
+    limited = BodySizeLimitMiddleware(app, max_size=100)
+
+    async def body():
+        for _ in range(10):
+            yield b"x" * 40
+
+    async with AsyncClient(transport=ASGITransport(app=limited), base_url="http://test") as ac:
+        response = await ac.post("/upload", content=body())
+
+    assert response.status_code == 413
+    assert sum(len(chunk) for chunk in received) <= 100
+
+
+@pytest.mark.asyncio
+async def test_type_sniffed_from_content(client, api_headers):
+    mock_extract = AsyncMock(return_value="Jane Roe, Python developer")
+    with patch("app.main.extract_text_async", mock_extract):
+        response = await client.post(
+            "/parse",
+            headers=api_headers,
+            files={"file": ("resume", b"%PDF-1.4 fake", "application/octet-stream")},
+        )
+
+    assert response.status_code == 200
+    path, content_type = mock_extract.await_args.args
+    assert content_type == "application/pdf"
+    assert isinstance(path, Path)
+    assert not path.exists()  # spooled upload is removed after the request
+
+
+@pytest.mark.asyncio
+async def test_content_not_matching_type_is_rejected(client, api_headers):
+    response = await client.post(
+        "/parse",
+        headers=api_headers,
+        files={"file": ("resume.pdf", b"definitely not a pdf", "application/pdf")},
+    )
+    assert response.status_code == 400
+    assert "does not match" in response.json()["detail"]
@@ -0,0 +1,56 @@
+import pytest
+from unittest.mock import patch
+
+from app.middleware import auth
+from app.models.schemas import TokenUsage
+from app.services import usage
+from app.services.result_cache import clear_local_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer():
+    usage._buffer.clear()
+    clear_local_cache()
+    yield
+    usage._buffer.clear()
+    clear_local_cache()
+
+
+@pytest.mark.asyncio
+async def test_buffered_counters_flush_to_redis(fake_redis):
+    tokens = TokenUsage(provider="anthropic", input_tokens=300, cached_input_tokens=1000, output_tokens=200)
+    with patch.object(auth, "_redis", fake_redis):
+        usage.record_usage("demo-key-123", tokens, 1.5)
+        usage.record_usage("demo-key-123", None, 0.2, success=False)
+        assert await fake_redis.keys("usage_stats:*") == []
+
+        await usage.flush_usage()
+        assert not usage._buffer
+        report = (await usage.get_usage(["demo-key-123"]))["demo-key-123"]
+
+    stats = report["stats"]
+    assert stats["parses"] == 2 and stats["failed"] == 1
+    assert stats["tokens_used"] == 1500
+    assert stats["token_usage"]["cached_input_tokens"] == 1000
+    assert stats["providers"] == {"anthropic": 1}
+    assert stats["latency_buckets"] == {"le_1": 1, "le_2": 1}
+    assert stats["latency_avg_ms"] == 850
+
+
+@pytest.mark.asyncio
+async def test_usage_endpoints_report_tokens(client, api_headers):
+    await client.post("/parse/text", headers=api_headers, params={"text": "Jane Roe\nPython developer"})
+    await usage.flush_usage()
+
+    response = await client.get("/usage", headers=api_headers)
+    assert response.json()["requests_used"] == 1
+    assert response.json()["stats"]["tokens_used"] == 500
+
+    with patch.object(auth, "ADMIN_API_KEY", "admin-secret"):
+        assert (await client.get("/admin/usage", headers={"X-Admin-Key": "wrong"})).status_code == 403
+        response = await client.get(
+            "/admin/usage", headers={"X-Admin-Key": "admin-secret"}, params={"keys": ["demo-key-123", "other"]}
+        )
+    assert response.status_code == 200
+    assert response.json()["usage"]["demo-key-123"]["stats"]["parses"] == 1
+    assert response.json()["usage"]["other"]["requests_used"] == 0
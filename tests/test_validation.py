@@ -0,0 +1,35 @@
+from app.services.pipeline import build_resume, validate_resume
+
+
+def test_malformed_entry_drops_only_that_entry():
+    resume = validate_resume({
+        "contact": {"name": "Jane Roe", "email": ["jane@example.com", "x@example.com"]},
+        "experience": [
+            {"company": "Acme", "title": "Engineer"},
+            {"company": ["not", "a", "string"]},
+            {"company": "Initech", "title": "Lead"},
+        ],
+        "languages": [{"proficiency": "Fluent"}, {"name": "German"}],
+    })
+    assert [job.company for job in resume.experience] == ["Acme", "Initech"]
+    assert [language.name for language in resume.languages] == ["German"]
+    assert resume.contact.name == "Jane Roe"
+    assert resume.contact.email is None
+
+
+def test_numbers_are_coerced_and_nulls_become_defaults():
+    resume = validate_resume({
+        "education": [{"institution": "TUM", "start_date": 2012, "gpa": 3.8}],
+        "skills": None,
+        "summary": "Engineer",
+    })
+    assert resume.education[0].start_date == "2012"
+    assert resume.education[0].gpa == "3.8"
+    assert resume.skills == []
+    assert resume.summary == "Engineer"
+
+
+def test_non_object_output_gives_empty_resume():
+    resume = build_resume(["not", "a", "resume"], "Jane Roe")
+    assert resume.experience == []
+    assert resume.raw_text == "Jane Roe"
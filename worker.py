@@ -0,0 +1,45 @@
+import asyncio
+import logging
+import os
+import signal
+import socket
+
+from app.logging_config import setup_logging, shutdown_logging
+from app.middleware import auth
+from app.services.ai_extractor import init_ai_clients, close_ai_clients
+from app.services.extraction_pool import init_extraction_pool, shutdown_extraction_pool
+from app.services.ocr import init_ocr_pool, shutdown_ocr_pool
+from app.services.usage import start_usage_flusher, stop_usage_flusher
+from app.services.jobs import run_worker
+
+logger = logging.getLogger("worker")
+
+
+async def main():
+    setup_logging()
+    await auth.init_redis()
+    if not auth._redis:
+        raise SystemExit("Redis is required to run the job worker")
+    init_ai_clients()
+    init_extraction_pool()
+    init_ocr_pool()
+    start_usage_flusher()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await run_worker(f"{socket.gethostname()}-{os.getpid()}", stop)
+    finally:
+        shutdown_extraction_pool()
+        shutdown_ocr_pool()
+        await close_ai_clients()
+        await stop_usage_flusher()
+        await auth.close_redis()
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())